@@ -0,0 +1,144 @@
+"""
+apps/cart/anonymous.py
+
+Carrito anónimo: visitantes sin sesión agregan productos sin escribir en la
+base de datos.
+
+El carrito viaja completo en un token firmado (django.core.signing, con
+fecha): un id del carrito y {product_id: cantidad}. El servidor no guarda
+nada, así que el carrito sobrevive a reinicios y sirve en cualquier worker.
+El cliente recibe el token en la cookie `cart_token` y en el cuerpo de cada
+respuesta que cambia el carrito; puede reenviarlo en la cookie o en el
+header X-Cart-Token. Un token alterado o con más de ANONYMOUS_CART_TIMEOUT
+segundos se trata como carrito vacío.
+
+Al iniciar sesión (login, guest-login) o en el checkout rápido, el carrito
+anónimo se fusiona con el Cart del usuario en un solo upsert
+(bulk_create con update_conflicts). El Cart recuerda el id del último
+carrito fusionado: reenviar ese token no vuelve a sumar sus cantidades.
+"""
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+
+from .models import Cart, CartItem
+from .totals import cart_change
+
+COOKIE_NAME = 'cart_token'
+HEADER_NAME = 'HTTP_X_CART_TOKEN'
+SIGNING_SALT = 'cellhub.cart.anonymous'
+
+
+class AnonymousCart:
+    """
+    Carrito de un visitante sin sesión, contenido en su token firmado.
+
+    Cada cambio emite un token nuevo: dos pestañas que agregan a la vez con
+    el mismo token pueden perder una de las dos adiciones (aceptable para
+    un carrito sin compra; el checkout siempre valida el stock real).
+    """
+
+    def __init__(self, key: str, items: dict[int, int] | None = None, created: bool = False):
+        self.key = key
+        self.items: dict[int, int] = items or {}   # {product_id: cantidad}
+        self.created = created
+
+    @classmethod
+    def from_request(cls, request, create: bool = False) -> 'AnonymousCart | None':
+        """Carrito del token de la petición (header o cookie); uno nuevo si create=True."""
+        token = request.META.get(HEADER_NAME) or request.COOKIES.get(COOKIE_NAME)
+        if token:
+            try:
+                data = signing.loads(token, salt=SIGNING_SALT, max_age=settings.ANONYMOUS_CART_TIMEOUT)
+                # Un token emitido antes de validar la cantidad puede traer cantidades <= 0
+                return cls(data['k'], {int(pk): quantity for pk, quantity in data['i'].items() if quantity > 0})
+            except (signing.BadSignature, KeyError, TypeError, ValueError, AttributeError):
+                pass
+        return cls(uuid.uuid4().hex, created=True) if create else None
+
+    @property
+    def token(self) -> str:
+        return signing.dumps({'k': self.key, 'i': self.items}, salt=SIGNING_SALT, compress=True)
+
+    def add(self, product_id: int, quantity: int) -> None:
+        if quantity <= 0:
+            raise ValueError('La cantidad debe ser mayor a 0')
+        if product_id not in self.items and len(self.items) >= settings.ANONYMOUS_CART_MAX_ITEMS:
+            raise ValueError(f'El carrito admite como máximo {settings.ANONYMOUS_CART_MAX_ITEMS} productos')
+        self.items[product_id] = self.items.get(product_id, 0) + quantity
+
+    def remove(self, product_id: int) -> bool:
+        return self.items.pop(product_id, None) is not None
+
+    def summary(self) -> dict:
+        """Ítems con nombre y precio (un SELECT de productos), total y conteo."""
+        from apps.products.models import Product
+
+        products = Product.objects.filter(pk__in=self.items, is_active=True).only(
+            'id', 'brand', 'model_name', 'price',
+        )
+        items, total = [], Decimal('0')
+        for product in products:
+            quantity = self.items[product.id]
+            subtotal = product.price * quantity
+            total += subtotal
+            items.append({
+                'id': product.id,   # el carrito anónimo se indexa por producto
+                'product_id': product.id,
+                'name': f'{product.brand} {product.model_name}',
+                'price': float(product.price),
+                'quantity': quantity,
+                'subtotal': float(subtotal),
+            })
+        return {'items': items, 'total': float(total), 'count': len(items)}
+
+    def attach(self, response) -> None:
+        """Entrega el token con el contenido actual: cookie firmada y campo cart_token."""
+        token = self.token
+        response.set_cookie(COOKIE_NAME, token, max_age=settings.ANONYMOUS_CART_TIMEOUT,
+                            httponly=True, samesite='Lax')
+        if isinstance(response.data, dict):
+            response.data['cart_token'] = token
+
+
+def merge_into(user, anonymous: AnonymousCart) -> int:
+    """
+    Fusiona el carrito anónimo con el Cart del usuario: suma cantidades de
+    los productos que ya estaban y agrega los nuevos en un solo upsert.
+    Ignora cantidades no positivas, productos inactivos o eliminados y un
+    carrito anónimo que ya se fusionó (token reenviado). Retorna los productos fusionados.
+    """
+    from apps.products.models import Product
+
+    items = {pk: quantity for pk, quantity in anonymous.items.items() if quantity > 0}
+    if not items:
+        return 0
+    cart, _ = Cart.objects.get_or_create(user=user)
+    with cart_change(cart.pk) as change:
+        # La fila ya está bloqueada: dos fusiones del mismo token no se cruzan
+        if Cart.objects.filter(pk=cart.pk, merged_anonymous=anonymous.key).exists():
+            change.discard()
+            return 0
+        Cart.objects.filter(pk=cart.pk).update(merged_anonymous=anonymous.key)
+        product_ids = list(Product.objects.filter(pk__in=items, is_active=True).values_list('pk', flat=True))
+        current = dict(cart.items.filter(product_id__in=product_ids).values_list('product_id', 'quantity'))
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product_id=pk, quantity=current.get(pk, 0) + items[pk],
+                      updated_version=change.version) for pk in product_ids],
+            update_conflicts=True, unique_fields=['cart', 'product'], update_fields=['quantity', 'updated_version'],
+        )
+        # bulk_create no pasa por CartItem.save(): cart_change recalcula los totales al salir
+    return len(product_ids)
+
+
+def merge_request_cart(request, user, response=None) -> int:
+    """Fusiona el carrito anónimo de la petición, si lo hay, y borra su cookie."""
+    anonymous = AnonymousCart.from_request(request)
+    if anonymous is None:
+        return 0
+    merged = merge_into(user, anonymous)
+    if response is not None:
+        response.delete_cookie(COOKIE_NAME, samesite='Lax')
+    return merged
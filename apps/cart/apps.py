@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.cart'
+
+    def ready(self):
+        # Revalidar los totales de los carritos ante cambios de productos
+        from . import signals  # noqa: F401
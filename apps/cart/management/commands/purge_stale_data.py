@@ -0,0 +1,49 @@
+"""
+apps/cart/management/commands/purge_stale_data.py
+
+Purga por lotes los carritos abandonados (apps/cart/tasks.py) y las
+direcciones provisionales huérfanas (apps/shipping/tasks.py). Cada lote se
+confirma por separado; se reportan filas por segundo.
+
+Uso:
+    python manage.py purge_stale_data
+    python manage.py purge_stale_data --only carts --batch-size 5000 -v 2
+"""
+from django.core.management.base import BaseCommand
+
+from apps.cart.tasks import purge_stale_carts
+from apps.shipping.tasks import purge_provisional_addresses
+from core.purge import DEFAULT_BATCH_SIZE
+
+TARGETS = {
+    'carts':     ('carritos abandonados', purge_stale_carts),
+    'addresses': ('direcciones provisionales', purge_provisional_addresses),
+}
+
+
+class Command(BaseCommand):
+    help = 'Borra carritos abandonados y direcciones provisionales sin orden, por lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(TARGETS), help='Purgar solo este tipo de filas')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Filas principales por transacción')
+
+    def handle(self, *args, **options):
+        for name, (label, purge) in TARGETS.items():
+            if options['only'] and name != options['only']:
+                continue
+            rows = batches = 0
+            seconds = 0.0
+            for batch in purge(batch_size=options['batch_size']):
+                rows += batch.rows
+                seconds += batch.seconds
+                batches += 1
+                if options['verbosity'] >= 2:
+                    detail = ', '.join(f'{model}: {count}' for model, count in batch.per_model.items())
+                    self.stdout.write(f'  lote {batches}: {batch.rows} filas ({detail}) '
+                                      f'en {batch.seconds:.2f}s, {batch.rows_per_second:.0f} filas/s')
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: {rows} filas en {batches} lotes, {seconds:.2f}s '
+                f'({rows / seconds if seconds else 0:.0f} filas/s)'
+            ))
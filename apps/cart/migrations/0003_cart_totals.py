@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:50
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    # Un UPDATE con subconsultas por carrito (mismo cálculo que apps/cart/totals.py)
+    Cart = apps.get_model('cart', 'Cart')
+    CartItem = apps.get_model('cart', 'CartItem')
+    money = DecimalField(max_digits=12, decimal_places=2)
+    items = CartItem.objects.filter(cart_id=OuterRef('pk')).values('cart_id')
+    subtotal = ExpressionWrapper(F('quantity') * F('product__price'), output_field=money)
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(items.annotate(value=Count('id')).values('value')[:1]), Value(0)),
+        total=Coalesce(Subquery(items.annotate(value=Sum(subtotal)).values('value')[:1], output_field=money),
+                       Value(0, output_field=money)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_initial'),
+        ('products', '0006_catalog_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Ítems'),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Total'),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_cart_totals'),
+        ('products', '0006_catalog_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='removals',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='updated_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['cart', 'updated_version'], name='cart_item_version_idx'),
+        ),
+    ]
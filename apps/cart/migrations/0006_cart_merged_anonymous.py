@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0005_cart_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='merged_anonymous',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -10,33 +10,83 @@ class Cart(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Totales desnormalizados: se recalculan en la misma transacción que cada
+    # escritura de CartItem y al cambiar el precio de un producto
+    # (ver apps/cart/totals.py)
+    item_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Ítems')
+    total      = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False, verbose_name='Total')
+
+    # Versión: crece con cada cambio (ETag y respuestas ?since=); removals es
+    # el registro acotado de líneas eliminadas por versión
+    version    = models.PositiveBigIntegerField(default=0, editable=False)
+    removals   = models.JSONField(default=dict, editable=False)
+
+    # Id del último carrito anónimo fusionado (apps/cart/anonymous.py): su
+    # token reenviado no vuelve a sumarse
+    merged_anonymous = models.CharField(max_length=32, blank=True, editable=False)
+
     class Meta:
         verbose_name = 'Carrito'
+        indexes = [
+            # Purga de carritos abandonados (apps/cart/tasks.py)
+            models.Index(fields=['updated_at'], name='cart_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Carrito de {self.user.username}"
 
-    def get_total(self) -> float:
-        """Calcula el total del carrito."""
-        return sum(item.get_subtotal() for item in self.items.all())
+    def get_total(self):
+        """Total del carrito (valor almacenado, sin recorrer los ítems)."""
+        return self.total
+
+    def refresh_totals(self) -> None:
+        """Recalcula item_count y total desde los ítems y recarga los valores."""
+        from .totals import cart_change
+        with cart_change(self.pk):
+            pass
+        self.refresh_from_db(fields=['item_count', 'total', 'version', 'removals', 'updated_at'])
 
     def clear(self) -> None:
         """Vacía el carrito después de una compra."""
-        self.items.all().delete()
+        from .totals import cart_change
+        with cart_change(self.pk) as change:
+            self.items.all().delete()
+            change.reset()
+        self.refresh_from_db(fields=['item_count', 'total', 'version', 'removals', 'updated_at'])
 
 
 class CartItem(models.Model):
-    cart      = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
-    product   = models.ForeignKey('products.Product', on_delete=models.CASCADE)
-    quantity  = models.PositiveIntegerField(default=1)
-    added_at  = models.DateTimeField(auto_now_add=True)
+    cart            = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
+    product         = models.ForeignKey('products.Product', on_delete=models.CASCADE)
+    quantity        = models.PositiveIntegerField(default=1)
+    added_at        = models.DateTimeField(auto_now_add=True)
+    updated_version = models.PositiveBigIntegerField(default=0, editable=False)   # Cart.version de la última escritura
 
     class Meta:
         unique_together = ['cart', 'product']
         verbose_name = 'Ítem de carrito'
+        indexes = [
+            # Líneas cambiadas desde una versión (?since=)
+            models.Index(fields=['cart', 'updated_version'], name='cart_item_version_idx'),
+        ]
 
     def __str__(self):
         return f"{self.quantity}x {self.product}"
 
+    def save(self, *args, **kwargs):
+        """Versión y totales del carrito se actualizan en la misma transacción."""
+        from .totals import cart_change
+        with cart_change(self.cart_id) as change:
+            self.updated_version = change.version
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_version'}
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from .totals import cart_change
+        with cart_change(self.cart_id) as change:
+            change.removed([(self.pk, self.product_id)])
+            return super().delete(*args, **kwargs)
+
     def get_subtotal(self) -> float:
         return self.product.price * self.quantity
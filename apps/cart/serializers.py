@@ -1,4 +1,5 @@
 """apps/cart/serializers.py"""
+from django.conf import settings
 from rest_framework import serializers
 from .models import Cart, CartItem
 from apps.products.serializers import ProductSerializer
@@ -21,6 +22,30 @@ class AddToCartSerializer(serializers.Serializer):
     quantity   = serializers.IntegerField(min_value=1, default=1)
 
 
+class CartOperationSerializer(serializers.Serializer):
+    """Una operación del lote: add suma, set fija (0 elimina), remove elimina."""
+    op         = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product_id = serializers.IntegerField()
+    quantity   = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add' and not attrs.get('quantity'):
+            raise serializers.ValidationError({'quantity': 'add requiere una cantidad mayor a 0'})
+        if attrs['op'] == 'set' and attrs.get('quantity') is None:
+            raise serializers.ValidationError({'quantity': 'set requiere una cantidad'})
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        limit = settings.CART_BATCH_MAX_OPERATIONS
+        if len(value) > limit:
+            raise serializers.ValidationError(f'Máximo {limit} operaciones por lote')
+        return value
+
+
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total = serializers.SerializerMethodField()
@@ -28,10 +53,11 @@ class CartSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Cart
-        fields = ['id', 'items', 'total', 'item_count', 'updated_at']
+        fields = ['id', 'items', 'total', 'item_count', 'version', 'updated_at']
 
+    # Totales almacenados en la fila del carrito (ver apps/cart/totals.py)
     def get_total(self, obj):
-        return float(obj.get_total())
+        return float(obj.total)
 
     def get_item_count(self, obj):
-        return obj.items.count()
+        return obj.item_count
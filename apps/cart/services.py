@@ -0,0 +1,119 @@
+"""
+apps/cart/services.py
+
+Principio SRP: Cambios del carrito por lotes, separados de las vistas.
+
+Un lote de operaciones (add/set/remove) se aplica en una transacción con un
+número fijo de consultas, sin importar cuántas líneas toque:
+
+  1. bloquea la fila del carrito y lee las líneas afectadas (una consulta);
+  2. pliega las operaciones en orden para obtener la cantidad final por
+     producto;
+  3. valida producto activo y stock de todos los productos con cantidad
+     final en una consulta (Product JOIN Inventory);
+  4. escribe con bulk_create, bulk_update y un DELETE, y actualiza versión
+     y totales del carrito una vez (apps/cart/totals.py).
+
+Si una línea no es válida no se aplica ninguna.
+"""
+from apps.inventory import stripes
+from apps.products.models import Product
+
+from .models import Cart, CartItem
+from .totals import cart_change
+
+
+class CartBatchError(ValueError):
+    """Operaciones del lote que no se pueden aplicar: {product_id: mensaje}."""
+
+    def __init__(self, errors: dict[int, str]):
+        self.errors = errors
+        super().__init__('; '.join(f'{pk}: {message}' for pk, message in errors.items()))
+
+
+class CartBatchService:
+    """
+    Uso:
+        cart = CartBatchService().apply(user, [
+            {'op': 'add', 'product_id': 1, 'quantity': 2},
+            {'op': 'set', 'product_id': 2, 'quantity': 5},
+            {'op': 'remove', 'product_id': 3},
+        ])
+    """
+
+    def apply(self, user, operations: list[dict]) -> Cart:
+        """Aplica todas las operaciones o ninguna. Lanza CartBatchError."""
+        cart, _ = Cart.objects.get_or_create(user=user)
+        # cart_change bloquea la fila: dos lotes del mismo usuario se aplican uno tras otro
+        with cart_change(cart.pk) as change:
+            product_ids = {operation['product_id'] for operation in operations}
+            current = {item.product_id: item for item in cart.items.filter(product_id__in=product_ids)}
+            final = self._fold(operations, {pk: item.quantity for pk, item in current.items()})
+
+            self._validate({pk: quantity for pk, quantity in final.items() if quantity})
+
+            to_create, to_update, to_delete = [], [], []
+            for product_id, quantity in final.items():
+                item = current.get(product_id)
+                if item is None:
+                    if quantity:
+                        to_create.append(CartItem(cart=cart, product_id=product_id, quantity=quantity,
+                                                  updated_version=change.version))
+                elif not quantity:
+                    to_delete.append(item)
+                elif item.quantity != quantity:
+                    item.quantity = quantity
+                    item.updated_version = change.version
+                    to_update.append(item)
+
+            # bulk_* no pasa por CartItem.save(): cart_change recalcula los totales una vez al salir
+            CartItem.objects.bulk_create(to_create)
+            CartItem.objects.bulk_update(to_update, ['quantity', 'updated_version'])
+            if to_delete:
+                CartItem.objects.filter(pk__in=[item.pk for item in to_delete]).delete()
+                change.removed((item.pk, item.product_id) for item in to_delete)
+            if not (to_create or to_update or to_delete):
+                change.discard()
+        cart.refresh_from_db()
+        return cart
+
+    @staticmethod
+    def _fold(operations: list[dict], quantities: dict[int, int]) -> dict[int, int]:
+        """Cantidad final por producto tras aplicar las operaciones en orden."""
+        final = {pk: quantities.get(pk, 0) for pk in (operation['product_id'] for operation in operations)}
+        for operation in operations:
+            product_id = operation['product_id']
+            if operation['op'] == 'add':
+                final[product_id] += operation['quantity']
+            elif operation['op'] == 'set':
+                final[product_id] = operation['quantity']
+            else:
+                final[product_id] = 0
+        return final
+
+    @staticmethod
+    def _validate(quantities: dict[int, int]) -> None:
+        """Producto activo con inventario suficiente para la cantidad final de cada línea."""
+        if not quantities:
+            return
+        rows = {
+            pk: (available, is_striped)
+            for pk, available, is_striped in Product.objects.filter(pk__in=quantities, is_active=True)
+            .values_list('pk', 'inventory__stock_available', 'inventory__is_striped')
+        }
+        striped = [pk for pk, (_, is_striped) in rows.items() if is_striped]
+        if striped:
+            # Modo franjas: la copia en Inventory puede atrasarse, se suman las franjas
+            for pk, (available, _) in stripes.exact_stock(striped).items():
+                rows[pk] = (available, True)
+
+        errors = {}
+        for product_id, quantity in quantities.items():
+            if product_id not in rows:
+                errors[product_id] = 'Producto no encontrado'
+            elif rows[product_id][0] is None:
+                errors[product_id] = 'Producto sin inventario registrado'
+            elif rows[product_id][0] < quantity:
+                errors[product_id] = f'Stock insuficiente. Disponible: {rows[product_id][0]}'
+        if errors:
+            raise CartBatchError(errors)
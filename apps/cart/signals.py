@@ -0,0 +1,43 @@
+"""
+apps/cart/signals.py
+
+Revalida los totales desnormalizados de los carritos (apps/cart/totals.py)
+cuando cambia el precio de un producto o cuando se elimina un producto y
+sus CartItem caen en cascada (el borrado en cascada no pasa por
+CartItem.delete). Cualquier cambio registrado del catálogo da versión nueva
+(y ETag nuevo) a los carritos que contienen esos productos.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.products.changes import catalog_changed
+
+from .models import CartItem
+from .totals import cart_change, refresh_totals_for_products
+
+
+@receiver(post_save, sender='products.Product')
+def product_price_changed(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields is not None and 'price' not in update_fields):
+        return
+    refresh_totals_for_products([instance.pk])
+
+
+@receiver(catalog_changed)
+def catalog_products_changed(sender, product_ids, **kwargs):
+    # Stock, nombre o estado que muestran las respuestas del carrito (incluye
+    # escrituras por .update() e importaciones, que no emiten post_save)
+    refresh_totals_for_products(product_ids)
+
+
+@receiver(pre_delete, sender='products.Product')
+def product_deleting(sender, instance, **kwargs):
+    instance._cart_items = list(CartItem.objects.filter(product_id=instance.pk)
+                                .values_list('cart_id', 'pk'))
+
+
+@receiver(post_delete, sender='products.Product')
+def product_deleted(sender, instance, **kwargs):
+    for cart_id, item_id in getattr(instance, '_cart_items', []):
+        with cart_change(cart_id, touch=False) as change:
+            change.removed([(item_id, instance.pk)])
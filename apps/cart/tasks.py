@@ -0,0 +1,32 @@
+"""
+apps/cart/tasks.py
+
+Tareas periódicas del carrito (ver core/scheduler.py): purga de carritos
+abandonados, sin actividad (Cart.updated_at) hace más de
+CART_STALE_AFTER_DAYS días. Los ítems se borran en cascada con su carrito.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.purge import DEFAULT_BATCH_SIZE, delete_in_batches, summarize
+from core.scheduler import register
+
+from .models import Cart
+
+
+def stale_carts(now=None):
+    """Carritos sin actividad, los más antiguos primero (índice cart_updated_idx)."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.CART_STALE_AFTER_DAYS)
+    return Cart.objects.filter(updated_at__lt=cutoff).order_by('updated_at')
+
+
+def purge_stale_carts(now=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Genera un PurgeBatch por lote de carritos borrado."""
+    return delete_in_batches(stale_carts(now), batch_size)
+
+
+@register('purge-stale-carts', interval=lambda: settings.MAINTENANCE_PURGE_INTERVAL)
+def purge_stale_carts_task():
+    return summarize(purge_stale_carts())
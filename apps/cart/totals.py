@@ -0,0 +1,147 @@
+"""
+apps/cart/totals.py
+
+Totales desnormalizados (Cart.item_count y Cart.total) y versión del
+carrito (Cart.version, CartItem.updated_version y Cart.removals).
+
+Los totales se recalculan con un solo UPDATE con subconsultas correlacionadas:
+
+    UPDATE cart_cart
+       SET item_count = (SELECT COUNT(*) FROM cart_cartitem WHERE cart_id = cart_cart.id),
+           total      = (SELECT SUM(quantity * price) FROM cart_cartitem JOIN products_product ...),
+           version    = ?
+     WHERE id = ?
+
+dentro de la misma transacción que la escritura de CartItem que los
+cambió. Recalcular (en lugar de sumar deltas) deja el valor correcto aunque
+dos escrituras del mismo carrito se crucen: el último UPDATE ve las filas
+vigentes. Un cambio de precio recalcula los carritos que contienen el
+producto; las lecturas del resumen son un solo SELECT de la fila de Cart.
+
+Cada cambio incrementa Cart.version (ETag de los endpoints del carrito),
+marca las líneas escritas con esa versión (updated_version) y anota las
+eliminadas en Cart.removals, un registro acotado a CART_REMOVALS_LOG_SIZE
+entradas: {'floor': versión, 'entries': [[versión, item_id, product_id], ...]}.
+Las respuestas incluyen datos vivos del producto (nombre, stock, estado):
+cualquier cambio registrado de un producto (apps/products/changes.py) da
+también versión nueva a los carritos que lo contienen y a esas líneas.
+Con ?since=<v> se devuelven solo las líneas con updated_version > v y las
+eliminaciones posteriores a v; si v < floor (el registro ya descartó
+eliminaciones posteriores a v) el cliente recibe el carrito completo.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from .models import Cart, CartItem
+
+TOTAL_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _per_cart(aggregate, output_field):
+    """Subconsulta: agregado de los ítems de cada carrito (0 si está vacío)."""
+    return Coalesce(
+        Subquery(
+            CartItem.objects.filter(cart_id=OuterRef('pk'))
+            .values('cart_id').annotate(value=aggregate).values('value')[:1],
+            output_field=output_field,
+        ),
+        Value(0, output_field=output_field),
+    )
+
+
+def totals_expressions() -> dict:
+    """Expresiones de item_count y total para .update() o .annotate()."""
+    subtotal = ExpressionWrapper(F('quantity') * F('product__price'), output_field=TOTAL_FIELD)
+    return {
+        'item_count': _per_cart(Count('id'), Cart._meta.get_field('item_count')),
+        'total':      _per_cart(Sum(subtotal), TOTAL_FIELD),
+    }
+
+
+def cart_etag(cart) -> str:
+    """ETag fuerte de los endpoints del carrito: cambia con cada versión."""
+    return quote_etag(f'cart-{cart.pk}-{cart.version}')
+
+
+class CartChange:
+    """Cambio en curso de un carrito: versión nueva y líneas eliminadas (ver cart_change)."""
+
+    def __init__(self, cart_id: int, version: int, removals: dict):
+        self.cart_id = cart_id
+        self.version = version
+        self._floor = removals.get('floor', 0)
+        self._entries = list(removals.get('entries', []))
+        self.discarded = False
+
+    def removed(self, items) -> None:
+        """Anota líneas eliminadas: pares (item_id, product_id)."""
+        self._entries.extend([self.version, item_id, product_id] for item_id, product_id in items)
+
+    def discard(self) -> None:
+        """Nada cambió: la versión no avanza (el ETag sigue vigente)."""
+        self.discarded = True
+
+    def reset(self) -> None:
+        """Carrito vaciado: ?since anterior a esta versión recibe el carrito completo."""
+        self._floor, self._entries = self.version, []
+
+    def removals(self) -> dict:
+        size = settings.CART_REMOVALS_LOG_SIZE
+        floor, entries = self._floor, self._entries
+        if len(entries) > size:
+            floor = max(floor, entries[-size - 1][0])
+            entries = entries[-size:]
+        return {'floor': floor, 'entries': entries}
+
+
+@contextmanager
+def cart_change(cart_id: int, touch: bool = True):
+    """
+    Transacción de un cambio del carrito. Bloquea la fila (dos cambios del
+    mismo carrito no comparten versión) y, al salir, guarda versión,
+    registro de eliminaciones y totales en un UPDATE. Con touch=True
+    también marca updated_at (actividad del usuario).
+
+        with cart_change(cart.pk) as change:
+            item.updated_version = change.version
+            ...
+    """
+    with transaction.atomic():
+        version, removals = (Cart.objects.select_for_update()
+                             .values_list('version', 'removals').get(pk=cart_id))
+        change = CartChange(cart_id, version + 1, removals or {})
+        yield change
+        if change.discarded:
+            return
+        changes = {'version': change.version, 'removals': change.removals(), **totals_expressions()}
+        if touch:
+            changes['updated_at'] = timezone.now()
+        Cart.objects.filter(pk=cart_id).update(**changes)
+
+
+def refresh_totals_for_products(product_ids) -> int:
+    """
+    Revalida los carritos que contienen alguno de los productos (cambio de
+    precio, stock o datos): totales y versión de cada carrito, y
+    updated_version de sus líneas con esos productos. Dos UPDATE en total.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+    items = CartItem.objects.filter(product_id__in=product_ids)
+    with transaction.atomic():
+        # No es actividad del usuario: updated_at no cambia
+        updated = Cart.objects.filter(pk__in=items.values('cart_id')).update(
+            version=F('version') + 1, **totals_expressions(),
+        )
+        if updated:
+            items.update(updated_version=Subquery(
+                Cart.objects.filter(pk=OuterRef('cart_id')).values('version')[:1],
+            ))
+    return updated
@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import CartView, CartItemView, CartItemDeleteView
+from .views import CartView, CartItemView, CartItemBatchView, CartItemDeleteView
 from apps.orders.quick_checkout import AddToCartAPIView, GetCartAPIView, RemoveCartItemAPIView
 
 urlpatterns = [
     path('',                      CartView.as_view(),           name='cart-detail'),
     path('items/',                CartItemView.as_view(),       name='cart-item-add'),
+    path('items/batch/',          CartItemBatchView.as_view(),  name='cart-item-batch'),
     path('items/<int:item_id>/',  CartItemDeleteView.as_view(), name='cart-item-delete'),
     # Endpoints simples para el frontend
     path('add/',                  AddToCartAPIView.as_view(),   name='cart-add'),
@@ -3,20 +3,38 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Prefetch, prefetch_related_objects
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from apps.products.models import Product
 from apps.inventory.models import Inventory
 from .models import Cart, CartItem
-from .serializers import CartSerializer, AddToCartSerializer, CartItemSerializer
+from .serializers import CartSerializer, AddToCartSerializer, CartItemSerializer, CartBatchSerializer
+from .services import CartBatchError, CartBatchService
+from .totals import cart_etag
+
+
+def _serialize_cart(cart) -> dict:
+    # Ítems con producto e inventario en una consulta (el serializer anida ProductSerializer)
+    prefetch_related_objects(
+        [cart], Prefetch('items', queryset=CartItem.objects.select_related('product__inventory'))
+    )
+    return CartSerializer(cart).data
 
 
 class CartView(APIView):
-    """GET /api/v1/cart/ — Ver carrito del usuario."""
+    """GET /api/v1/cart/ — Ver carrito del usuario (ETag por versión, 304 si no cambió)."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         cart, _ = Cart.objects.get_or_create(user=request.user)
-        return Response(CartSerializer(cart).data)
+        etag = cart_etag(cart)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(_serialize_cart(cart))
+        response['ETag'] = etag
+        return response
 
 
 class CartItemView(APIView):
@@ -42,13 +60,11 @@ class CartItemView(APIView):
             return Response({'error': 'Producto sin inventario registrado'}, status=400)
 
         cart, _ = Cart.objects.get_or_create(user=request.user)
-        item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-
+        # Una sola escritura (y una versión del carrito) por adición
+        item, created = CartItem.objects.get_or_create(cart=cart, product=product, defaults={'quantity': quantity})
         if not created:
             item.quantity += quantity
-        else:
-            item.quantity = quantity
-        item.save()
+            item.save(update_fields=['quantity'])
 
         return Response(
             CartItemSerializer(item).data,
@@ -56,6 +72,36 @@ class CartItemView(APIView):
         )
 
 
+class CartItemBatchView(APIView):
+    """
+    PATCH /api/v1/cart/items/batch/ — Varios cambios del carrito en una transacción.
+
+    Body:
+    {
+        "operations": [
+            {"op": "add",    "product_id": 1, "quantity": 2},
+            {"op": "set",    "product_id": 2, "quantity": 5},
+            {"op": "remove", "product_id": 3}
+        ]
+    }
+    Las operaciones se aplican en orden; si alguna línea no es válida (stock,
+    producto inactivo) no se aplica ninguna. Devuelve el carrito completo.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            cart = CartBatchService().apply(request.user, serializer.validated_data['operations'])
+        except CartBatchError as e:
+            return Response({'error': 'No se aplicó ningún cambio', 'items': e.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        response = Response(_serialize_cart(cart))
+        response['ETag'] = cart_etag(cart)
+        return response
+
+
 class CartItemDeleteView(APIView):
     """DELETE /api/v1/cart/items/{id}/ — Eliminar ítem del carrito."""
     permission_classes = [IsAuthenticated]
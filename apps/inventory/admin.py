@@ -1,14 +1,35 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
-from .models import Inventory
+from . import stripes
+from .models import Inventory, StockMovement
 
 
 @admin.register(Inventory)
 class InventoryAdmin(admin.ModelAdmin):
-    list_display  = ['product', 'stock_bar', 'stock_available', 'stock_reserved', 'updated_at']
+    list_display  = ['product', 'stock_bar', 'stock_available', 'stock_reserved', 'is_striped', 'updated_at']
+    list_filter   = ['is_striped']
     search_fields = ['product__brand', 'product__model_name']
     ordering      = ['stock_available']
-    readonly_fields = ['updated_at']
+    readonly_fields = ['updated_at', 'is_striped', 'stripe_count']
+    actions       = ['enable_striping', 'disable_striping']
+
+    def get_readonly_fields(self, request, obj=None):
+        # En modo franjas los campos son una copia de la suma de las franjas
+        if obj is not None and obj.is_striped:
+            return [*self.readonly_fields, 'stock_available', 'stock_reserved']
+        return self.readonly_fields
+
+    @admin.action(description='Activar stock por franjas (productos muy demandados)')
+    def enable_striping(self, request, queryset):
+        for inventory in queryset.filter(is_striped=False):
+            stripes.enable(inventory)
+        self.message_user(request, 'Stock por franjas activado.', messages.SUCCESS)
+
+    @admin.action(description='Desactivar stock por franjas')
+    def disable_striping(self, request, queryset):
+        for inventory in queryset.filter(is_striped=True):
+            stripes.disable(inventory)
+        self.message_user(request, 'Stock por franjas desactivado.', messages.SUCCESS)
 
     def stock_bar(self, obj):
         pct = min(100, int((obj.stock_available / 30) * 100))
@@ -19,3 +40,21 @@ class InventoryAdmin(admin.ModelAdmin):
             pct, color
         )
     stock_bar.short_description = 'Disponibilidad'
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """Libro de movimientos: solo lectura (las filas nunca se editan)."""
+    list_display  = ['id', 'product', 'kind', 'available_delta', 'reserved_delta', 'reference', 'created_at']
+    list_filter   = ['kind']
+    search_fields = ['reference', 'product__brand', 'product__model_name']
+    raw_id_fields = ['product']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,128 @@
+"""
+apps/inventory/ledger.py
+
+Libro de movimientos de stock (StockMovement) y su compactación en
+StockSnapshot.
+
+Cada cambio de stock inserta sus deltas en el libro dentro de la misma
+transacción que actualiza Inventory (un bulk INSERT por operación, nunca
+un UPDATE). El stock según el libro es:
+
+    snapshot (movimientos ya compactados) + suma de la cola del libro
+
+compact() pliega periódicamente los movimientos viejos en los snapshots y
+los elimina, así la cola por producto se mantiene corta. Inventory sigue
+siendo el contador de la reserva condicional (UPDATE ... WHERE
+stock_available >= n); el libro es el historial contra el que se concilia
+(ledger_drift).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .models import StockMovement, StockSnapshot
+
+COMPACT_BATCH_SIZE = 5000   # movimientos por transacción de compactación
+
+
+def movement(product_id: int, kind: str, available: int = 0, reserved: int = 0,
+             reference: str = '') -> StockMovement:
+    return StockMovement(product_id=product_id, kind=kind, available_delta=available,
+                         reserved_delta=reserved, reference=reference)
+
+
+def append(movements: list[StockMovement]) -> None:
+    """Asienta los movimientos en un solo INSERT."""
+    if movements:
+        StockMovement.objects.bulk_create(movements)
+
+
+def record_adjustments(changes, reference: str = '') -> None:
+    """
+    Ajustes por escrituras directas del stock.
+    `changes`: (product_id, (disponible, reservado) anterior, (disponible, reservado) nuevo).
+    """
+    append([
+        movement(product_id, 'adjust', new[0] - old[0], new[1] - old[1], reference)
+        for product_id, old, new in changes
+        if new != old
+    ])
+
+
+def ledger_stock(product_ids) -> dict[int, tuple[int, int]]:
+    """{product_id: (disponible, reservado)} según snapshot + cola del libro (dos consultas)."""
+    stock = {
+        pk: (available, reserved)
+        for pk, available, reserved in StockSnapshot.objects.filter(product_id__in=product_ids)
+        .values_list('product_id', 'stock_available', 'stock_reserved')
+    }
+    tail = (StockMovement.objects.filter(product_id__in=product_ids)
+            .values_list('product_id').annotate(Sum('available_delta'), Sum('reserved_delta')).order_by())
+    for pk, available, reserved in tail:
+        base = stock.get(pk, (0, 0))
+        stock[pk] = (base[0] + available, base[1] + reserved)
+    return stock
+
+
+def ledger_drift(product_ids) -> dict[int, tuple[tuple[int, int], tuple[int, int]]]:
+    """Productos cuyo Inventory no coincide con el libro: {id: (inventario, libro)}."""
+    from .stripes import exact_stock
+
+    ledger = ledger_stock(product_ids)
+    drift = {}
+    for pk, stock in exact_stock(product_ids).items():
+        expected = ledger.get(pk, (0, 0))
+        if stock != expected:
+            drift[pk] = (stock, expected)
+    return drift
+
+
+def compact(older_than: timedelta = timedelta(minutes=5), batch_size: int = COMPACT_BATCH_SIZE):
+    """
+    Pliega en StockSnapshot los movimientos con más de `older_than` de
+    antigüedad, por rangos de id de `batch_size` filas (una transacción por
+    rango: agregado por producto, upsert de snapshots y DELETE del rango).
+    La antigüedad mínima evita plegar ids de transacciones aún abiertas.
+    Genera (movimientos plegados, snapshots actualizados) por rango.
+    """
+    bounds = (StockMovement.objects.filter(created_at__lte=timezone.now() - older_than)
+              .aggregate(first=Min('id'), last=Max('id')))
+    if bounds['last'] is None:
+        return
+
+    low = bounds['first']
+    while low <= bounds['last']:
+        high = min(low + batch_size - 1, bounds['last'])
+        rows = snapshots = 0
+        with transaction.atomic():
+            folded = list(
+                StockMovement.objects.filter(id__gte=low, id__lte=high)
+                .values('product_id')
+                .annotate(available=Sum('available_delta'), reserved=Sum('reserved_delta'),
+                          last=Max('id'), rows=Count('id'))
+                .order_by('product_id')
+            )
+            if folded:
+                current = StockSnapshot.objects.in_bulk([row['product_id'] for row in folded])
+                updated = []
+                for row in folded:
+                    snapshot = current.get(row['product_id']) or StockSnapshot(product_id=row['product_id'])
+                    snapshot.stock_available += row['available']
+                    snapshot.stock_reserved += row['reserved']
+                    snapshot.last_movement_id = row['last']
+                    updated.append(snapshot)
+                StockSnapshot.objects.bulk_create(
+                    updated, update_conflicts=True, unique_fields=['product'],
+                    update_fields=['stock_available', 'stock_reserved', 'last_movement_id', 'updated_at'],
+                )
+                rows = sum(row['rows'] for row in folded)
+                deleted, _ = StockMovement.objects.filter(id__gte=low, id__lte=high).delete()
+                if deleted != rows:
+                    # Otro proceso compactó el mismo rango: se descarta este lote
+                    raise RuntimeError(f'El rango {low}-{high} cambió durante la compactación')
+                snapshots = len(updated)
+        if rows:
+            yield rows, snapshots
+        low = high + 1
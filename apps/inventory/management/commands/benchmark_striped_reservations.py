@@ -0,0 +1,104 @@
+"""
+apps/inventory/management/commands/benchmark_striped_reservations.py
+
+Prueba de carga de reservas concurrentes sobre un mismo producto, con el
+inventario en una sola fila y en modo franjas.
+
+Cada hilo (una conexión a la base de datos) repite reservar 1 unidad y
+liberarla, así el stock del producto queda igual al terminar. Una
+operación que choca con un bloqueo (OperationalError) se reintenta y se
+cuenta como conflicto. Se reportan reservas por segundo y conflictos de
+cada modo. El producto vuelve a su modo original al final.
+
+En SQLite todas las escrituras se serializan a nivel de archivo: la mejora
+que se mide ahí viene de que una reserva en franjas no reescribe la fila de
+Inventory ni la del catálogo. Con PostgreSQL/MySQL (bloqueo por fila) se
+suma que los hilos ya no esperan todos por la misma fila.
+
+Uso:
+    python manage.py benchmark_striped_reservations --product 1 --threads 16 --ops 200
+"""
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from apps.inventory import stripes
+from apps.inventory.models import Inventory
+from apps.inventory.services import InsufficientStock, StockReservationService
+
+
+class Command(BaseCommand):
+    help = 'Compara el throughput de reservas concurrentes con y sin stock por franjas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', type=int, required=True, help='ID del producto a estresar')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--ops', type=int, default=100, help='Reservas por hilo')
+
+    def handle(self, *args, **options):
+        try:
+            inventory = Inventory.objects.get(product_id=options['product'])
+        except Inventory.DoesNotExist:
+            raise CommandError('El producto no tiene inventario.')
+        if stripes.exact_stock([inventory.product_id])[inventory.product_id][0] < options['threads']:
+            raise CommandError('El producto necesita al menos una unidad disponible por hilo.')
+
+        was_striped = inventory.is_striped
+        results = {}
+        try:
+            for mode in ('una fila', 'franjas'):
+                if mode == 'franjas':
+                    stripes.enable(inventory)
+                else:
+                    stripes.disable(inventory)
+                results[mode] = self._run(inventory.product_id, options['threads'], options['ops'])
+        finally:
+            (stripes.enable if was_striped else stripes.disable)(inventory)
+
+        for mode, (rate, conflicts, elapsed) in results.items():
+            self.stdout.write(f'{mode:>9}: {rate:8.0f} reservas/s  ({conflicts} conflictos, {elapsed:.2f}s)')
+        base, striped = results['una fila'][0], results['franjas'][0]
+        self.stdout.write(self.style.SUCCESS(f'Franjas / una fila: {striped / base if base else 0:.2f}x ({connection.vendor})'))
+
+    @staticmethod
+    def _run(product_id: int, threads: int, ops: int) -> tuple[float, int, float]:
+        service = StockReservationService()
+        totals, lock = {'ok': 0, 'conflicts': 0}, threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def retry(operation) -> int:
+            """Ejecuta hasta que no choque con un bloqueo; retorna los reintentos."""
+            conflicts = 0
+            while True:
+                try:
+                    operation()
+                    return conflicts
+                except OperationalError:
+                    conflicts += 1
+
+        def worker():
+            from django.db import connection as thread_connection
+            barrier.wait()
+            ok = conflicts = 0
+            for _ in range(ops):
+                try:
+                    conflicts += retry(lambda: service.reserve({product_id: 1}, reference='benchmark'))
+                except InsufficientStock:
+                    continue
+                conflicts += retry(lambda: service.release({product_id: 1}, reference='benchmark'))
+                ok += 1
+            thread_connection.close()
+            with lock:
+                totals['ok'] += ok
+                totals['conflicts'] += conflicts
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return totals['ok'] / elapsed, totals['conflicts'], elapsed
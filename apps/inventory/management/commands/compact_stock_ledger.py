@@ -0,0 +1,59 @@
+"""
+apps/inventory/management/commands/compact_stock_ledger.py
+
+Pliega los movimientos de stock viejos en StockSnapshot (ver
+apps/inventory/ledger.py) y, con --check, concilia Inventory contra el libro.
+
+Uso:
+    python manage.py compact_stock_ledger
+    python manage.py compact_stock_ledger --older-than 600 --batch-size 10000 --check
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.ledger import COMPACT_BATCH_SIZE, compact, ledger_drift
+from apps.inventory.models import Inventory
+
+CHECK_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Compacta el libro de movimientos de stock en snapshots por producto.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=300, metavar='SEGUNDOS',
+                            help='Solo movimientos con al menos esta antigüedad (por defecto 300)')
+        parser.add_argument('--batch-size', type=int, default=COMPACT_BATCH_SIZE,
+                            help='Movimientos por transacción')
+        parser.add_argument('--check', action='store_true',
+                            help='Verificar que Inventory coincide con snapshot + libro')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        folded = snapshots = 0
+        for rows, updated in compact(timedelta(seconds=options['older_than']), options['batch_size']):
+            folded += rows
+            snapshots += updated
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {rows} movimientos → {updated} snapshots')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{folded} movimientos compactados en {snapshots} snapshots en {elapsed:.1f}s '
+            f'({folded / elapsed if elapsed else 0:.0f} movimientos/s)'
+        ))
+
+        if options['check']:
+            self._check()
+
+    def _check(self) -> None:
+        product_ids = list(Inventory.objects.order_by('product_id').values_list('product_id', flat=True))
+        drift = {}
+        for start in range(0, len(product_ids), CHECK_BATCH_SIZE):
+            drift.update(ledger_drift(product_ids[start:start + CHECK_BATCH_SIZE]))
+        if drift:
+            lines = [f'producto {pk}: inventario {inv} ≠ libro {led}' for pk, (inv, led) in list(drift.items())[:20]]
+            raise CommandError(f'{len(drift)} inventarios no coinciden con el libro:\n  ' + '\n  '.join(lines))
+        self.stdout.write(self.style.SUCCESS(f'{len(product_ids)} inventarios coinciden con el libro.'))
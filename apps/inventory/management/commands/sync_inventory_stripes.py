@@ -0,0 +1,36 @@
+"""
+apps/inventory/management/commands/sync_inventory_stripes.py
+
+Copia en Inventory (y en el read-model del catálogo) la suma de las franjas
+de los inventarios en modo franjas. Tras cada reserva la copia se hace con
+límite de frecuencia; esta pasada cubre la última que se haya omitido.
+
+Uso:
+    python manage.py sync_inventory_stripes
+    python manage.py sync_inventory_stripes --loop 5
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.inventory.models import Inventory
+from apps.inventory.stripes import sync_totals
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza los totales de los inventarios en modo franjas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=float, metavar='SEGUNDOS',
+                            help='Repetir cada SEGUNDOS hasta interrumpir el proceso')
+
+    def handle(self, *args, **options):
+        while True:
+            product_ids = list(Inventory.objects.filter(is_striped=True).values_list('product_id', flat=True))
+            if product_ids:
+                sync_totals(product_ids)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'{len(product_ids)} inventarios en franjas sincronizados')
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
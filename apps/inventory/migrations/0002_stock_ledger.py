@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_current_stock(apps, schema_editor):
+    # El libro arranca con el stock actual como snapshot inicial
+    Inventory = apps.get_model('inventory', 'Inventory')
+    StockSnapshot = apps.get_model('inventory', 'StockSnapshot')
+    batch = []
+    for product_id, available, reserved in (Inventory.objects.order_by('product_id')
+                                            .values_list('product_id', 'stock_available', 'stock_reserved')
+                                            .iterator(chunk_size=2000)):
+        batch.append(StockSnapshot(product_id=product_id, stock_available=available, stock_reserved=reserved))
+        if len(batch) >= 2000:
+            StockSnapshot.objects.bulk_create(batch)
+            batch = []
+    StockSnapshot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+        ('products', '0006_catalog_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_snapshot', serialize=False, to='products.product')),
+                ('stock_available', models.IntegerField(default=0)),
+                ('stock_reserved', models.IntegerField(default=0)),
+                ('last_movement_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Snapshot de stock',
+                'verbose_name_plural': 'Snapshots de stock',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('reserve', 'Reserva'), ('release', 'Liberación'), ('restock', 'Reposición'), ('adjust', 'Ajuste')], max_length=10)),
+                ('available_delta', models.IntegerField(default=0)),
+                ('reserved_delta', models.IntegerField(default=0)),
+                ('reference', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de stock',
+                'verbose_name_plural': 'Movimientos de stock',
+                'indexes': [models.Index(fields=['product', 'id'], name='stock_movement_product_idx')],
+            },
+        ),
+        migrations.RunPython(snapshot_current_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='is_striped',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Stock por franjas'),
+        ),
+        migrations.CreateModel(
+            name='InventoryStripe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('stock_available', models.PositiveIntegerField(default=0)),
+                ('stock_reserved', models.PositiveIntegerField(default=0)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stripes', to='inventory.inventory')),
+            ],
+            options={
+                'verbose_name': 'Franja de inventario',
+                'verbose_name_plural': 'Franjas de inventario',
+                'constraints': [models.UniqueConstraint(fields=('inventory', 'index'), name='inventory_stripe_unique')],
+            },
+        ),
+    ]
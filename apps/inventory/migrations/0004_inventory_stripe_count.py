@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def count_existing_stripes(apps, schema_editor):
+    # Los inventarios que ya estaban en franjas: la cantidad son sus filas
+    Inventory = apps.get_model('inventory', 'Inventory')
+    InventoryStripe = apps.get_model('inventory', 'InventoryStripe')
+    stripes = (InventoryStripe.objects.filter(inventory_id=OuterRef('pk'))
+               .values('inventory_id').annotate(count=Count('pk')).values('count'))
+    Inventory.objects.filter(is_striped=True).update(stripe_count=Subquery(stripes))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_inventory_stripes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='stripe_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Franjas'),
+        ),
+        migrations.RunPython(count_existing_stripes, migrations.RunPython.noop),
+    ]
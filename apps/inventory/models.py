@@ -2,7 +2,7 @@
 apps/inventory/models.py
 Principio SRP: Solo maneja el stock de productos.
 """
-from django.db import models
+from django.db import models, transaction
 
 
 class Inventory(models.Model):
@@ -11,6 +11,13 @@ class Inventory(models.Model):
     stock_reserved  = models.PositiveIntegerField(default=0, verbose_name='Stock reservado')
     updated_at      = models.DateTimeField(auto_now=True)
 
+    # Modo franjas (productos muy demandados): el stock vive repartido en
+    # InventoryStripe y los dos campos de arriba son una copia periódica de
+    # la suma (ver apps/inventory/stripes.py). stripe_count es la cantidad de
+    # franjas con que se activó, aunque INVENTORY_STRIPE_COUNT cambie después
+    is_striped      = models.BooleanField(default=False, editable=False, verbose_name='Stock por franjas')
+    stripe_count    = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Franjas')
+
     class Meta:
         verbose_name = 'Inventario'
         verbose_name_plural = 'Inventarios'
@@ -18,25 +25,122 @@ class Inventory(models.Model):
     def __str__(self):
         return f"Inventario: {self.product} ({self.stock_available} disponibles)"
 
+    def save(self, *args, **kwargs):
+        """
+        Escritura directa (admin, seed): se asienta en el libro de movimientos
+        como ajuste por la diferencia con el valor guardado.
+        """
+        from .ledger import record_adjustments
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (Inventory.objects.filter(pk=self.pk)
+                            .values_list('stock_available', 'stock_reserved').first())
+            super().save(*args, **kwargs)
+            record_adjustments([(self.product_id, previous or (0, 0), (self.stock_available, self.stock_reserved))])
+
+    def available_stock(self) -> int:
+        """Stock disponible exacto: en modo franjas, la suma de las franjas."""
+        if not self.is_striped:
+            return self.stock_available
+        from .stripes import exact_stock
+        return exact_stock([self.product_id]).get(self.product_id, (0, 0))[0]
+
     def check_availability(self, quantity: int) -> bool:
         """Verifica si hay stock suficiente."""
-        return self.stock_available >= quantity
+        return self.available_stock() >= quantity
 
-    def reserve_stock(self, quantity: int) -> None:
-        """Reserva stock al confirmar una orden."""
-        if not self.check_availability(quantity):
-            raise ValueError(f"Stock insuficiente. Disponible: {self.stock_available}")
-        self.stock_available -= quantity
-        self.stock_reserved += quantity
-        self.save(update_fields=['stock_available', 'stock_reserved'])
+    def reserve_stock(self, quantity: int, reference: str = '') -> None:
+        """
+        Reserva stock al confirmar una orden. UPDATE condicional atómico
+        (ver apps/inventory/services.py): no hay sobreventa entre la
+        verificación y el descuento.
+        """
+        from .services import StockReservationService
+        StockReservationService().reserve({self.product_id: quantity}, reference=reference)
+        self.refresh_from_db(fields=['stock_available', 'stock_reserved', 'updated_at', 'is_striped'])
 
-    def release_stock(self, quantity: int) -> None:
+    def release_stock(self, quantity: int, reference: str = '') -> None:
         """Libera stock reservado (ej: orden cancelada)."""
-        self.stock_reserved -= quantity
-        self.stock_available += quantity
-        self.save(update_fields=['stock_available', 'stock_reserved'])
+        from .services import StockReservationService
+        StockReservationService().release({self.product_id: quantity}, reference=reference)
+        self.refresh_from_db(fields=['stock_available', 'stock_reserved', 'updated_at', 'is_striped'])
 
-    def add_stock(self, quantity: int) -> None:
+    def add_stock(self, quantity: int, reference: str = '') -> None:
         """Agrega stock (nueva mercancía)."""
-        self.stock_available += quantity
-        self.save(update_fields=['stock_available'])
+        from .services import StockReservationService
+        StockReservationService().restock(self.product_id, quantity, reference=reference)
+        self.refresh_from_db(fields=['stock_available', 'stock_reserved', 'updated_at', 'is_striped'])
+
+
+class InventoryStripe(models.Model):
+    """
+    Subcontador de un inventario en modo franjas. Cada reserva actualiza una
+    sola franja (elegida al azar), así los checkouts concurrentes de un mismo
+    producto no se bloquean todos sobre la misma fila.
+    """
+    inventory       = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name='stripes')
+    index           = models.PositiveSmallIntegerField()
+    stock_available = models.PositiveIntegerField(default=0)
+    stock_reserved  = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Franja de inventario'
+        verbose_name_plural = 'Franjas de inventario'
+        constraints = [
+            models.UniqueConstraint(fields=['inventory', 'index'], name='inventory_stripe_unique'),
+        ]
+
+    def __str__(self):
+        return f"Franja {self.index} de {self.inventory_id}: {self.stock_available} disponibles"
+
+
+class StockMovement(models.Model):
+    """
+    Libro de movimientos de stock: solo INSERT (nunca se actualiza una fila).
+
+    Cada cambio de Inventory deja aquí su delta. El stock según el libro es
+    StockSnapshot + suma de los movimientos aún no compactados
+    (ver apps/inventory/ledger.py).
+    """
+    KIND_CHOICES = [
+        ('reserve', 'Reserva'),
+        ('release', 'Liberación'),
+        ('restock', 'Reposición'),
+        ('adjust',  'Ajuste'),
+    ]
+
+    product         = models.ForeignKey('products.Product', on_delete=models.CASCADE, related_name='stock_movements')
+    kind            = models.CharField(max_length=10, choices=KIND_CHOICES)
+    available_delta = models.IntegerField(default=0)
+    reserved_delta  = models.IntegerField(default=0)
+    reference       = models.CharField(max_length=50, blank=True)   # ej: 'order:42', 'purchase:7'
+    created_at      = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Movimiento de stock'
+        verbose_name_plural = 'Movimientos de stock'
+        indexes = [
+            # Cola del libro por producto (stock actual = snapshot + cola)
+            models.Index(fields=['product', 'id'], name='stock_movement_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.product_id}: {self.available_delta:+d} / {self.reserved_delta:+d}"
+
+
+class StockSnapshot(models.Model):
+    """Stock de un producto con todos los movimientos hasta `last_movement_id` ya sumados."""
+    product          = models.OneToOneField('products.Product', on_delete=models.CASCADE, primary_key=True,
+                                            related_name='stock_snapshot')
+    stock_available  = models.IntegerField(default=0)
+    stock_reserved   = models.IntegerField(default=0)
+    last_movement_id = models.BigIntegerField(default=0)
+    updated_at       = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Snapshot de stock'
+        verbose_name_plural = 'Snapshots de stock'
+
+    def __str__(self):
+        return f"Snapshot {self.product_id}: {self.stock_available} / {self.stock_reserved}"
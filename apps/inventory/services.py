@@ -0,0 +1,287 @@
+"""
+apps/inventory/services.py
+
+Principio SRP: Movimientos de stock (reservar, liberar, reponer) sin carreras
+y consulta de stock por lotes.
+Principio DIP: Órdenes, compras y vistas dependen de estos servicios, no del
+read-modify-write sobre el modelo Inventory.
+
+Cada movimiento es un UPDATE condicional con expresiones F:
+
+    UPDATE inventory_inventory
+       SET stock_available = stock_available - n, stock_reserved = stock_reserved + n
+     WHERE product_id = ? AND stock_available >= n
+
+La base de datos evalúa la condición y el descuento sobre la fila vigente,
+así que dos checkouts simultáneos nunca venden la misma unidad: si la fila
+ya no alcanza, el UPDATE afecta 0 filas y la reserva falla. Todos los items
+de una operación van en una transacción: si uno falla, ninguno queda
+reservado. Las filas se bloquean en orden de product_id para que dos
+órdenes con los mismos productos no se bloqueen mutuamente (deadlock).
+
+Con varios productos, reserve() y release() intentan primero un solo
+UPDATE para todas las filas, con la cantidad de cada una en un CASE:
+
+    UPDATE inventory_inventory
+       SET stock_available = stock_available - CASE product_id WHEN 1 THEN 2 WHEN 5 THEN 1 END, ...
+     WHERE (product_id = 1 AND stock_available >= 2) OR (product_id = 5 AND stock_available >= 1)
+
+Un UPDATE de varias filas las bloquea en el orden en que el planificador
+las recorre, no por product_id; por eso, en motores con bloqueo por fila
+(PostgreSQL, MySQL), antes se toman los bloqueos con SELECT ... FOR UPDATE
+ORDER BY product_id. En SQLite, que serializa las escrituras, ese paso se
+omite. El camino producto por producto recorre los ids en orden.
+
+Si el UPDATE afecta todas las filas, la operación cuesta una sentencia
+(dos con el SELECT de bloqueo) sin importar cuántos productos tenga; si no
+(falta stock o una fila pasó a modo franjas) se revierte ese UPDATE y se
+repite producto por producto, que identifica cuál no alcanza.
+"""
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from . import ledger, stripes
+from .models import Inventory
+
+
+class InsufficientStock(ValueError):
+    """No hay stock disponible para reservar la cantidad pedida de un producto."""
+
+    def __init__(self, product_id: int, requested: int, available: int | None):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Stock insuficiente. Disponible: {available or 0}")
+
+
+class _PartialMove(Exception):
+    """El UPDATE por lotes no alcanzó todas las filas: revierte el savepoint."""
+
+
+def merge_quantities(items) -> dict[int, int]:
+    """Suma las cantidades por producto de pares (product_id, cantidad)."""
+    quantities: dict[int, int] = {}
+    for product_id, quantity in items:
+        if quantity <= 0:
+            raise ValueError("La cantidad debe ser mayor a 0")
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+class StockReservationService:
+    """
+    Reserva y libera stock con UPDATE condicionales atómicos. Cada operación
+    asienta sus movimientos en el libro (apps/inventory/ledger.py) en la
+    misma transacción.
+
+    Uso:
+        StockReservationService().reserve({product_id: 2, other_id: 1}, reference='order:42')
+    """
+
+    def reserve(self, quantities: dict[int, int], reference: str = '') -> None:
+        """
+        Reserva todas las cantidades o ninguna.
+        Lanza InsufficientStock con el primer producto que no alcanza.
+        """
+        with transaction.atomic():
+            striped = stripes.striped_inventories(quantities)
+            pending = self._move_many(quantities, 'stock_available', 'stock_reserved', striped)
+            for product_id in sorted(pending):
+                quantity = quantities[product_id]
+                if not self._move(product_id, quantity, 'stock_available', 'stock_reserved', striped):
+                    available = stripes.exact_stock([product_id]).get(product_id, (None, 0))[0]
+                    # La excepción revierte las reservas ya hechas en este bloque
+                    raise InsufficientStock(product_id, quantity, available)
+            ledger.append([
+                ledger.movement(product_id, 'reserve', -quantity, quantity, reference)
+                for product_id, quantity in quantities.items()
+            ])
+            self._stock_changed(quantities, striped)
+
+    def release(self, quantities: dict[int, int], strict: bool = True, reference: str = '') -> None:
+        """
+        Devuelve al stock disponible unidades reservadas (ej: orden cancelada).
+        Con strict=False libera como máximo lo que esté reservado en lugar de
+        fallar (barridos automáticos sobre datos que pudieron corregirse a mano).
+        """
+        released = {}
+        with transaction.atomic():
+            striped = stripes.striped_inventories(quantities)
+            if not strict:
+                # Todas las reservas vigentes en una consulta (dos con franjas)
+                reserved = stripes.exact_stock(quantities)
+                quantities = {pk: min(quantity, reserved.get(pk, (0, 0))[1]) for pk, quantity in quantities.items()}
+                quantities = {pk: quantity for pk, quantity in quantities.items() if quantity}
+            pending = self._move_many(quantities, 'stock_reserved', 'stock_available', striped)
+            released.update((pk, quantity) for pk, quantity in quantities.items() if pk not in pending)
+            for product_id in sorted(pending):
+                quantity = quantities[product_id]
+                if not strict:
+                    quantity = self._release_up_to(product_id, quantity, striped)
+                elif not self._move(product_id, quantity, 'stock_reserved', 'stock_available', striped):
+                    raise ValueError(f"No hay {quantity} unidades reservadas del producto {product_id}")
+                if quantity:
+                    released[product_id] = quantity
+            ledger.append([
+                ledger.movement(product_id, 'release', quantity, -quantity, reference)
+                for product_id, quantity in released.items()
+            ])
+            self._stock_changed(released, striped)
+
+    def restock(self, product_id: int, quantity: int, reference: str = '') -> None:
+        """Agrega stock disponible (nueva mercancía) sin pisar reservas concurrentes."""
+        if quantity <= 0:
+            raise ValueError("La cantidad debe ser mayor a 0")
+        with transaction.atomic():
+            striped = stripes.striped_inventories([product_id])
+            if product_id in striped:
+                updated = stripes.add(striped[product_id], quantity)
+            else:
+                updated = Inventory.objects.filter(product_id=product_id, is_striped=False).update(
+                    stock_available=F('stock_available') + quantity,
+                    updated_at=timezone.now(),
+                )
+            if updated:
+                ledger.append([ledger.movement(product_id, 'restock', quantity, 0, reference)])
+            self._stock_changed([product_id], striped)
+
+    @classmethod
+    def _release_up_to(cls, product_id: int, quantity: int, striped: dict) -> int:
+        """
+        Libera como máximo `quantity` unidades reservadas (release con
+        strict=False). Si una liberación concurrente achica la reserva entre
+        la lectura y el UPDATE condicional, se vuelve a leer en lugar de
+        fallar: lo que ya no está reservado ya fue liberado. Retorna las
+        unidades liberadas.
+        """
+        while True:
+            reserved = stripes.exact_stock([product_id]).get(product_id, (0, 0))[1]
+            amount = min(quantity, reserved)
+            # Cada reintento implica que otra transacción liberó unidades antes
+            if not amount or cls._move(product_id, amount, 'stock_reserved', 'stock_available', striped):
+                return amount
+
+    @staticmethod
+    def _move_many(quantities: dict[int, int], source: str, target: str, striped: dict) -> dict[int, int]:
+        """
+        Mueve las cantidades de todos los productos sin franjas con un solo
+        UPDATE condicional (CASE por product_id). Todo o nada: si alguna
+        fila no alcanza, revierte el UPDATE. Retorna las cantidades que
+        quedan por mover una a una (las de productos en franjas, o todas si
+        el UPDATE no afectó todas las filas).
+        """
+        rows = {pk: quantity for pk, quantity in quantities.items() if pk not in striped}
+        if len(rows) < 2:
+            return quantities
+        amount = Case(*[When(product_id=pk, then=Value(quantity)) for pk, quantity in rows.items()],
+                      output_field=IntegerField())
+        condition = Q()
+        for pk, quantity in rows.items():
+            condition |= Q(product_id=pk, **{f'{source}__gte': quantity})
+        try:
+            with transaction.atomic():
+                if connection.features.has_select_for_update:
+                    # Bloqueos en orden de product_id: el UPDATE los toma en el orden del plan
+                    list(Inventory.objects.select_for_update().filter(product_id__in=rows)
+                         .order_by('product_id').values_list('pk', flat=True))
+                updated = Inventory.objects.filter(condition, is_striped=False).update(
+                    **{source: F(source) - amount, target: F(target) + amount},
+                    updated_at=timezone.now(),
+                )
+                if updated != len(rows):
+                    raise _PartialMove
+        except _PartialMove:
+            return quantities
+        return {pk: quantity for pk, quantity in quantities.items() if pk in striped}
+
+    @staticmethod
+    def _move(product_id: int, quantity: int, source: str, target: str, striped: dict) -> bool:
+        """
+        Mueve `quantity` unidades de `source` a `target` con un UPDATE
+        condicional: sobre la fila de Inventory o, en modo franjas, sobre una
+        franja (apps/inventory/stripes.py). False si no alcanzan.
+        """
+        if product_id not in striped:
+            updated = Inventory.objects.filter(
+                product_id=product_id, is_striped=False, **{f'{source}__gte': quantity},
+            ).update(
+                **{source: F(source) - quantity, target: F(target) + quantity},
+                updated_at=timezone.now(),
+            )
+            if updated:
+                return True
+            # Pudo pasar a modo franjas entre la consulta y el UPDATE
+            striped.update(stripes.striped_inventories([product_id]))
+            if product_id not in striped:
+                return False
+        return stripes.move(striped[product_id], quantity, source, target)
+
+    @staticmethod
+    def _stock_changed(product_ids, striped: dict) -> None:
+        """
+        .update() no emite señales: el read-model del catálogo se actualiza
+        en la misma transacción y el cambio se registra tras el commit. Los
+        productos en franjas no tocan la fila de Inventory ni la del catálogo
+        en cada reserva: se sincronizan tras el commit, con límite de frecuencia.
+        """
+        from apps.products.catalog_entries import refresh_entries
+        from apps.products.changes import record_change
+
+        product_ids = [pk for pk in product_ids if pk not in striped]
+        if product_ids:
+            refresh_entries(product_ids)
+            transaction.on_commit(partial(record_change, product_ids))
+        stripes.schedule_sync(striped)
+
+
+STOCK_CACHE_KEY = 'inventory:stock:{}'
+
+
+def stock_etag(product_id: int, stock_available: int) -> str:
+    """ETag de un item: cambia solo cuando cambia su stock."""
+    return hashlib.sha1(f'{product_id}:{stock_available}'.encode()).hexdigest()[:16]
+
+
+class StockLookupService:
+    """
+    Stock de muchos productos en una consulta.
+
+    Cada producto se cachea INVENTORY_STOCK_CACHE_TIMEOUT segundos (TTL
+    corto, sin invalidación: la disponibilidad mostrada puede atrasarse ese
+    tiempo; la reserva real siempre la valida StockReservationService).
+    """
+
+    def get_stock(self, product_ids: list[int]) -> dict[int, dict]:
+        """
+        {product_id: {'product_id', 'stock_available', 'in_stock', 'etag'}}
+        para los productos con inventario; los que no tienen no aparecen.
+        """
+        keys = {pk: STOCK_CACHE_KEY.format(pk) for pk in product_ids}
+        cached = cache.get_many(keys.values())
+        stock = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+        missing = [pk for pk in product_ids if pk not in stock]
+        if missing:
+            # Una consulta por el índice único de product_id (dos si hay productos en franjas)
+            fetched = {pk: available for pk, (available, _) in stripes.exact_stock(missing).items()}
+            # Los productos sin inventario también se cachean (como None)
+            fetched = {pk: fetched.get(pk) for pk in missing}
+            cache.set_many({keys[pk]: value for pk, value in fetched.items()},
+                           settings.INVENTORY_STOCK_CACHE_TIMEOUT)
+            stock.update(fetched)
+
+        return {
+            pk: {
+                'product_id': pk,
+                'stock_available': stock[pk],
+                'in_stock': stock[pk] > 0,
+                'etag': stock_etag(pk, stock[pk]),
+            }
+            for pk in product_ids if stock[pk] is not None
+        }
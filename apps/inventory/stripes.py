@@ -0,0 +1,197 @@
+"""
+apps/inventory/stripes.py
+
+Inventario por franjas para productos muy demandados (lanzamientos, flash
+sales).
+
+Con una sola fila de Inventory, cada checkout de un producto hace UPDATE
+sobre esa fila y la base de datos los serializa. En modo franjas el stock
+se reparte en filas InventoryStripe (INVENTORY_STRIPE_COUNT al activarlo;
+la cantidad queda en Inventory.stripe_count):
+
+- una reserva intenta una franja al azar (UPDATE condicional) y, si no
+  alcanza, las vecinas; solo si ninguna alcanza sola, toma unidades de
+  varias franjas con las filas bloqueadas;
+- Inventory.stock_available/stock_reserved pasan a ser una copia de la
+  suma: se sincronizan tras el commit como máximo una vez cada
+  INVENTORY_STRIPE_SYNC_INTERVAL segundos por producto (junto con el
+  read-model del catálogo), y el comando sync_inventory_stripes cubre la
+  última sincronización omitida;
+- las lecturas exactas (StockCheckView, ProductSerializer.get_stock,
+  stock por lotes, conciliación del libro) suman las franjas.
+"""
+import logging
+import random
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import F, Sum
+
+from .models import Inventory, InventoryStripe
+
+logger = logging.getLogger(__name__)
+
+SYNC_LOCK_KEY = 'inventory:stripe-sync:{}'
+
+
+class _Shortage(Exception):
+    """Las franjas no alcanzan: revierte los movimientos parciales."""
+
+
+def striped_inventories(product_ids) -> dict[int, tuple[int, int]]:
+    """{product_id: (inventory_id, franjas)} de los productos en modo franjas."""
+    return {
+        product_id: (inventory_id, count)
+        for product_id, inventory_id, count in Inventory.objects.filter(product_id__in=product_ids, is_striped=True)
+        .values_list('product_id', 'id', 'stripe_count')
+    }
+
+
+def enable(inventory: Inventory, count: int | None = None) -> None:
+    """Reparte el stock (disponible y reservado) del inventario en `count` franjas."""
+    count = count or settings.INVENTORY_STRIPE_COUNT
+    with transaction.atomic():
+        inventory = Inventory.objects.select_for_update().get(pk=inventory.pk)
+        if inventory.is_striped:
+            return
+        InventoryStripe.objects.bulk_create([
+            InventoryStripe(
+                inventory=inventory, index=index,
+                stock_available=inventory.stock_available // count + (index < inventory.stock_available % count),
+                stock_reserved=inventory.stock_reserved // count + (index < inventory.stock_reserved % count),
+            )
+            for index in range(count)
+        ])
+        Inventory.objects.filter(pk=inventory.pk).update(is_striped=True, stripe_count=count)
+
+
+def disable(inventory: Inventory) -> None:
+    """Vuelve a una sola fila: suma las franjas en Inventory y las elimina."""
+    with transaction.atomic():
+        inventory = Inventory.objects.select_for_update().get(pk=inventory.pk)
+        if not inventory.is_striped:
+            return
+        # Las franjas bloqueadas: ninguna reserva en curso queda fuera de la suma
+        stripes = list(InventoryStripe.objects.select_for_update().filter(inventory_id=inventory.pk))
+        Inventory.objects.filter(pk=inventory.pk).update(
+            stock_available=sum(stripe.stock_available for stripe in stripes),
+            stock_reserved=sum(stripe.stock_reserved for stripe in stripes),
+            is_striped=False,
+            stripe_count=0,
+        )
+        InventoryStripe.objects.filter(inventory_id=inventory.pk).delete()
+
+
+def move(inventory: tuple[int, int], quantity: int, source: str, target: str) -> bool:
+    """
+    Mueve `quantity` unidades del campo `source` al `target` de las franjas
+    del inventario (reserva: disponible → reservado; liberación: al revés).
+    `inventory` es (inventory_id, franjas), como en striped_inventories().
+    Retorna False, sin cambios, si las franjas no alcanzan (o ya no existen:
+    disable() las bloquea antes de eliminarlas).
+    """
+    inventory_id, count = inventory
+    stripes = InventoryStripe.objects.filter(inventory_id=inventory_id)
+    changes = {source: F(source) - quantity, target: F(target) + quantity}
+
+    start = random.randrange(count)
+    for offset in range(count):
+        index = (start + offset) % count
+        if stripes.filter(index=index, **{f'{source}__gte': quantity}).update(**changes):
+            return True
+
+    # Ninguna franja alcanza sola: se toma de varias, con las filas bloqueadas
+    try:
+        with transaction.atomic():
+            rows = list(stripes.select_for_update().order_by('index').values_list('index', source))
+            if sum(value for _, value in rows) < quantity:
+                raise _Shortage
+            remaining = quantity
+            for index, value in rows:
+                take = min(value, remaining)
+                if not take:
+                    continue
+                updated = stripes.filter(index=index, **{f'{source}__gte': take}).update(
+                    **{source: F(source) - take, target: F(target) + take},
+                )
+                if not updated:
+                    raise _Shortage
+                remaining -= take
+                if not remaining:
+                    break
+    except _Shortage:
+        return False
+    return True
+
+
+def add(inventory: tuple[int, int], quantity: int) -> bool:
+    """Suma stock disponible a una franja al azar. False si el inventario no tiene franjas."""
+    inventory_id, count = inventory
+    stripes = InventoryStripe.objects.filter(inventory_id=inventory_id)
+    index = random.randrange(count)
+    if stripes.filter(index=index).update(stock_available=F('stock_available') + quantity):
+        return True
+    first = stripes.order_by('index').values_list('index', flat=True).first()
+    return first is not None and bool(
+        stripes.filter(index=first).update(stock_available=F('stock_available') + quantity)
+    )
+
+
+def exact_stock(product_ids) -> dict[int, tuple[int, int]]:
+    """{product_id: (disponible, reservado)} exactos: Inventory o la suma de sus franjas."""
+    stock, striped = {}, []
+    for product_id, available, reserved, is_striped in (
+        Inventory.objects.filter(product_id__in=product_ids)
+        .values_list('product_id', 'stock_available', 'stock_reserved', 'is_striped')
+    ):
+        stock[product_id] = (available, reserved)
+        if is_striped:
+            striped.append(product_id)
+    if striped:
+        for product_id, available, reserved in (
+            InventoryStripe.objects.filter(inventory__product_id__in=striped)
+            .values_list('inventory__product_id')
+            .annotate(Sum('stock_available'), Sum('stock_reserved')).order_by()
+        ):
+            stock[product_id] = (available, reserved)
+    return stock
+
+
+def sync_totals(product_ids) -> None:
+    """Copia la suma de las franjas en Inventory y actualiza el read-model del catálogo."""
+    from apps.products.catalog_entries import refresh_entries
+    from apps.products.changes import record_change
+
+    product_ids = list(product_ids)
+    with transaction.atomic():
+        totals = exact_stock(product_ids)
+        for product_id in product_ids:
+            if product_id in totals:
+                available, reserved = totals[product_id]
+                Inventory.objects.filter(product_id=product_id, is_striped=True).update(
+                    stock_available=available, stock_reserved=reserved,
+                )
+        refresh_entries(product_ids)
+        transaction.on_commit(partial(record_change, product_ids))
+
+
+def _sync_throttled(product_ids) -> None:
+    due = [pk for pk in product_ids
+           if cache.add(SYNC_LOCK_KEY.format(pk), True, settings.INVENTORY_STRIPE_SYNC_INTERVAL)]
+    if not due:
+        return
+    try:
+        sync_totals(due)
+    except DatabaseError as error:
+        # La reserva ya se confirmó: un fallo de la copia no debe propagarse.
+        # La próxima reserva (o sync_inventory_stripes) la reintenta
+        cache.delete_many([SYNC_LOCK_KEY.format(pk) for pk in due])
+        logger.warning('No se pudieron sincronizar las franjas de %s: %s', due, error)
+
+
+def schedule_sync(product_ids) -> None:
+    """Tras el commit, sincroniza los totales de los productos que no se sincronizaron hace poco."""
+    if product_ids:
+        transaction.on_commit(partial(_sync_throttled, list(product_ids)))
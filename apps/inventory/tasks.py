@@ -0,0 +1,30 @@
+"""
+apps/inventory/tasks.py
+
+Tareas periódicas de inventario (ver core/scheduler.py): compactación del
+libro de movimientos y sincronización de los inventarios en modo franjas.
+"""
+from django.conf import settings
+
+from core.scheduler import register
+
+from .ledger import compact
+from .models import Inventory
+from .stripes import sync_totals
+
+
+@register('compact-stock-ledger', interval=300)
+def compact_stock_ledger_task():
+    folded = snapshots = 0
+    for rows, updated in compact():
+        folded += rows
+        snapshots += updated
+    return folded, snapshots
+
+
+@register('sync-inventory-stripes', interval=lambda: settings.INVENTORY_STRIPE_SYNC_INTERVAL)
+def sync_inventory_stripes_task():
+    product_ids = list(Inventory.objects.filter(is_striped=True).values_list('product_id', flat=True))
+    if product_ids:
+        sync_totals(product_ids)
+    return len(product_ids)
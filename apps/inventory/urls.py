@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import StockCheckView
+from .views import BatchStockView, StockCheckView
 
 urlpatterns = [
+    path('stock/', BatchStockView.as_view(), name='stock-batch'),
     path('<int:product_id>/stock/', StockCheckView.as_view(), name='stock-check'),
 ]
@@ -1,20 +1,85 @@
 """apps/inventory/views.py"""
+import hashlib
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from apps.products.changes import catalog_conditional
 from .models import Inventory
+from .services import StockLookupService
 
 
+@method_decorator(catalog_conditional, name='dispatch')
 class StockCheckView(APIView):
     """GET /api/v1/inventory/{product_id}/stock/"""
     permission_classes = [AllowAny]
 
     def get(self, request, product_id):
         inventory = get_object_or_404(Inventory, product_id=product_id)
+        stock_available = inventory.available_stock()
         return Response({
             'product_id': product_id,
-            'stock_available': inventory.stock_available,
-            'in_stock': inventory.stock_available > 0,
+            'stock_available': stock_available,
+            'in_stock': stock_available > 0,
         })
+
+
+class BatchStockView(APIView):
+    """
+    GET /api/v1/inventory/stock/?ids=1,2,3
+
+    Stock de varios productos en una petición (una consulta + caché de TTL
+    corto). Cada item lleva su `etag`; el cliente puede enviarlos en
+    If-None-Match y los items sin cambios se devuelven como
+    {"product_id", "etag", "not_modified": true}. Si ninguno cambió, o
+    coincide el ETag de la respuesta completa, responde 304.
+    """
+    permission_classes = [AllowAny]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service = StockLookupService()
+
+    @extend_schema(parameters=[
+        OpenApiParameter('ids', str, description='IDs de producto separados por coma: 1,2,3'),
+    ])
+    def get(self, request):
+        max_ids = settings.INVENTORY_STOCK_BATCH_MAX_IDS
+        try:
+            product_ids = list(dict.fromkeys(
+                int(i) for i in request.query_params.get('ids', '').split(',') if i.strip()
+            ))
+        except ValueError:
+            return Response({'error': 'IDs inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+        if not product_ids:
+            return Response({'error': 'Proporciona al menos un ID'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(product_ids) > max_ids:
+            return Response({'error': f'Máximo {max_ids} IDs por petición'}, status=status.HTTP_400_BAD_REQUEST)
+
+        stock = self.service.get_stock(product_ids)
+        etag = quote_etag(hashlib.sha1(
+            ','.join(f'{pk}:{item["etag"]}' for pk, item in stock.items()).encode()
+        ).hexdigest()[:16])
+
+        known = set(parse_etags(request.headers.get('If-None-Match', '')))
+        unchanged = {pk for pk, item in stock.items() if quote_etag(item['etag']) in known}
+        if etag in known or '*' in known or (stock and len(unchanged) == len(stock)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({
+                'results': [
+                    {'product_id': pk, 'etag': item['etag'], 'not_modified': True} if pk in unchanged else item
+                    for pk, item in stock.items()
+                ],
+                'missing': [pk for pk in product_ids if pk not in stock],
+            })
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
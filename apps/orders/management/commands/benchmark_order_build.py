@@ -0,0 +1,97 @@
+"""
+apps/orders/management/commands/benchmark_order_build.py
+
+Mide las sentencias SQL (round-trips a la base de datos) y el tiempo de
+OrderBuilder.build según la cantidad de líneas de la orden, junto a la
+construcción línea por línea (una reserva y un INSERT por item, como antes
+del UPDATE por lotes).
+
+Cada orden se construye dentro de una transacción que se revierte al
+final: stock, libro de movimientos, catálogo y órdenes quedan iguales.
+
+Uso:
+    python manage.py benchmark_order_build
+    python manage.py benchmark_order_build --lines 1 10 30 60 --repeat 5
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.inventory.models import Inventory
+from apps.inventory.services import StockReservationService
+from apps.orders.models import Order, OrderItem
+from apps.shipping.models import Address
+from core.builders.order_builder import OrderBuilder
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Sentencias SQL y tiempo de OrderBuilder.build según la cantidad de líneas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[1, 5, 10, 30, 60],
+                            help='Cantidades de líneas a medir')
+        parser.add_argument('--repeat', type=int, default=3, help='Órdenes por medición (se toma la mediana)')
+
+    def handle(self, *args, **options):
+        address = Address.objects.select_related('user').first()
+        if address is None:
+            raise CommandError('Se necesita al menos una dirección de envío (python seed_data.py).')
+        inventories = list(
+            Inventory.objects.select_related('product')
+            .filter(product__is_active=True, is_striped=False, stock_available__gte=1)
+            .order_by('product_id')[:max(options['lines'])]
+        )
+        if len(inventories) < max(options['lines']):
+            raise CommandError(f'Solo hay {len(inventories)} productos con stock para armar las órdenes.')
+
+        self.stdout.write(f'{"líneas":>7} {"build (SQL)":>12} {"build (ms)":>11} '
+                          f'{"por línea (SQL)":>16} {"por línea (ms)":>15}')
+        for lines in options['lines']:
+            products = [inventory.product for inventory in inventories[:lines]]
+            batched = self._measure(self._build, address, products, options['repeat'])
+            per_line = self._measure(self._build_per_line, address, products, options['repeat'])
+            self.stdout.write(f'{lines:>7} {batched[0]:>12} {batched[1]:>11.1f} '
+                              f'{per_line[0]:>16} {per_line[1]:>15.1f}')
+
+    @staticmethod
+    def _measure(build, address, products, repeat) -> tuple[int, float]:
+        """(sentencias, ms) medianos de construir la orden `repeat` veces, revirtiendo cada una."""
+        queries, elapsed = [], []
+        for _ in range(repeat):
+            try:
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        build(address, products)
+                        elapsed.append((time.perf_counter() - started) * 1000)
+                    queries.append(len(captured))
+                    raise _Rollback
+            except _Rollback:
+                pass
+        return int(statistics.median(queries)), statistics.median(elapsed)
+
+    @staticmethod
+    def _build(address, products) -> None:
+        builder = OrderBuilder(user=address.user)
+        for product in products:
+            builder.add_item(product, quantity=1, price=float(product.price))
+        builder.set_shipping_address(address).set_payment_method('pse').build()
+
+    @staticmethod
+    def _build_per_line(address, products) -> None:
+        """Referencia: una reserva y un INSERT por línea."""
+        order = Order.objects.create(
+            user=address.user, shipping_address=address, payment_method='pse',
+            total=sum(product.price for product in products), status='pending',
+        )
+        service = StockReservationService()
+        for product in products:
+            service.reserve({product.pk: 1}, reference=f'order:{order.pk}')
+            OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
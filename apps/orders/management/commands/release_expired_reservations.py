@@ -0,0 +1,38 @@
+"""
+apps/orders/management/commands/release_expired_reservations.py
+
+Cancela las órdenes (y rechaza las compras) pendientes con la reserva de
+stock vencida y devuelve las unidades al inventario (ver
+apps/orders/reservations.py).
+
+Uso:
+    python manage.py release_expired_reservations               # una pasada (cron)
+    python manage.py release_expired_reservations --loop 60     # proceso continuo, cada 60 s
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.reservations import DEFAULT_BATCH_SIZE, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Libera el stock de las órdenes y compras pendientes cuya reserva venció.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Órdenes o compras por transacción')
+        parser.add_argument('--loop', type=float, metavar='SEGUNDOS',
+                            help='Repetir el barrido cada SEGUNDOS hasta interrumpir el proceso')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            orders, purchases, units = release_expired_reservations(batch_size=options['batch_size'])
+            if orders or purchases or options['verbosity'] >= 2:
+                self.stdout.write(
+                    f'{orders} órdenes canceladas, {purchases} compras rechazadas, {units} unidades liberadas '
+                    f'en {time.perf_counter() - started:.2f}s'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
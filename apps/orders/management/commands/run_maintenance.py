@@ -0,0 +1,54 @@
+"""
+apps/orders/management/commands/run_maintenance.py
+
+Ejecuta las tareas periódicas registradas en core/scheduler.py (módulos
+tasks.py de las apps) que ya vencieron: vencimiento de reservas,
+compactación del libro de stock, sincronización de franjas y purgas.
+
+Uso:
+    python manage.py run_maintenance                      # una pasada (cron cada minuto)
+    python manage.py run_maintenance --loop 5             # proceso continuo
+    python manage.py run_maintenance --task purge-stale-carts
+    python manage.py run_maintenance --list
+
+Con el caché en memoria local (desarrollo) el intervalo de cada tarea solo
+se respeta dentro de un mismo proceso (--loop); desde cron, cada pasada
+ejecuta todas las tareas.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas de mantenimiento periódicas que vencieron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', action='append', dest='tasks', metavar='NOMBRE',
+                            help='Solo estas tareas (repetible)')
+        parser.add_argument('--loop', type=float, metavar='SEGUNDOS',
+                            help='Revisar las tareas vencidas cada SEGUNDOS hasta interrumpir el proceso')
+        parser.add_argument('--list', action='store_true', help='Listar las tareas registradas')
+
+    def handle(self, *args, **options):
+        registered = scheduler.tasks()
+        if options['list']:
+            for name, task in sorted(registered.items()):
+                self.stdout.write(f'{name:32} cada {task.interval():g}s')
+            return
+        unknown = set(options['tasks'] or []) - set(registered)
+        if unknown:
+            raise CommandError(f'Tareas desconocidas: {", ".join(sorted(unknown))}')
+
+        while True:
+            for name, outcome in scheduler.run_due(options['tasks']).items():
+                if isinstance(outcome, Exception):
+                    self.stderr.write(f'{name}: falló ({outcome})')
+                elif options['verbosity'] >= 2 or not options['loop']:
+                    result, seconds = outcome
+                    self.stdout.write(f'{name}: {result} en {seconds:.2f}s')
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_reservation_expiry'),
+        ('products', '0007_catalog_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='reservation_expires_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['status', 'reservation_expires_at'], name='purchase_reservation_idx'),
+        ),
+    ]
@@ -2,7 +2,11 @@
 apps/orders/models.py
 Modelos: Order, OrderItem, Purchase (Compra rápida con Factory)
 """
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Order(models.Model):
@@ -31,10 +35,20 @@ class Order(models.Model):
     created_at       = models.DateTimeField(auto_now_add=True)
     updated_at       = models.DateTimeField(auto_now=True)
 
+    # Vencimiento de la reserva de stock de una orden pendiente (None al salir
+    # de 'pending'). Ver apps/orders/reservations.py
+    reservation_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Orden'
         verbose_name_plural = 'Ordenes'
+        indexes = [
+            # Historial del usuario (-created_at, -id) y su paginación keyset
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+            # Barrido de reservas vencidas: status = 'pending' AND expires <= now
+            models.Index(fields=['status', 'reservation_expires_at'], name='order_reservation_expiry_idx'),
+        ]
 
     def __str__(self):
         return f"Orden #{self.id} — {self.user.username} — ${self.total:,.0f} — {self.get_status_display()}"
@@ -44,7 +58,9 @@ class Order(models.Model):
         if new_status not in allowed:
             raise ValueError(f"Transicion invalida: {self.status} → {new_status}. Permitidas: {allowed}")
         self.status = new_status
-        self.save(update_fields=['status', 'updated_at'])
+        # Pagada o cancelada, la reserva ya no vence
+        self.reservation_expires_at = None
+        self.save(update_fields=['status', 'reservation_expires_at', 'updated_at'])
 
 
 class OrderItem(models.Model):
@@ -97,10 +113,18 @@ class Purchase(models.Model):
     transaction_id = models.CharField(max_length=100, blank=True, editable=False, verbose_name='ID Transaccion')
     purchased_at   = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de compra')
 
+    # Vencimiento de la reserva de una compra pendiente (PSE/Nequi), igual
+    # que en Order. Ver apps/orders/reservations.py
+    reservation_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['-purchased_at']
         verbose_name = 'Compra'
         verbose_name_plural = 'Compras'
+        indexes = [
+            # Barrido de reservas vencidas: status = 'pending' AND expires <= now
+            models.Index(fields=['status', 'reservation_expires_at'], name='purchase_reservation_idx'),
+        ]
 
     def __str__(self):
         return f"Compra #{self.id} — {self.user.username} — {self.product} x{self.quantity} — {self.get_status_display()}"
@@ -137,6 +161,9 @@ class Purchase(models.Model):
             self.transaction_id = result.get('transaction_id', '')
 
             if self.status in ('approved', 'pending'):
-                inventory.reserve_stock(self.quantity)
+                inventory.reserve_stock(self.quantity, reference=f'purchase:{self.transaction_id}')
+            if self.status == 'pending':
+                # Si el pago no llega a tiempo, release_expired_reservations la rechaza y libera el stock
+                self.reservation_expires_at = timezone.now() + timedelta(seconds=settings.ORDER_RESERVATION_TIMEOUT)
 
         super().save(*args, **kwargs)
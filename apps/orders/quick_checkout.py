@@ -4,15 +4,23 @@ apps/orders/quick_checkout.py
 Endpoint de checkout rápido para el frontend.
 Crea dirección temporal + orden en un solo paso.
 No requiere dirección previa guardada.
+
+Los endpoints simples del carrito (add, summary, remove) también atienden
+visitantes sin sesión con el carrito anónimo (apps/cart/anonymous.py), que
+se fusiona con el del usuario al iniciar sesión o en el checkout.
 """
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import authenticate
+from django.utils.http import parse_etags
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.cart.anonymous import AnonymousCart, merge_request_cart
 from apps.cart.models import Cart
+from apps.cart.serializers import AddToCartSerializer
+from apps.cart.totals import cart_etag
 from apps.shipping.models import Address
 from apps.products.models import Product
 from core.builders.order_builder import OrderBuilder
@@ -49,6 +57,9 @@ class QuickCheckoutView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Un carrito anónimo armado antes de iniciar sesión se suma al del usuario
+        merge_request_cart(request, user)
+
         # Obtener o crear carrito
         try:
             cart = Cart.objects.prefetch_related('items__product').get(user=user)
@@ -69,6 +80,7 @@ class QuickCheckoutView(APIView):
             reference=data.get('reference', ''),
             phone=data['phone'],
             is_default=False,
+            is_provisional=True,
         )
 
         # Construir orden con el Builder Pattern
@@ -121,7 +133,7 @@ class GuestLoginView(APIView):
             return Response({'error': 'Credenciales incorrectas'}, status=401)
 
         refresh = RefreshToken.for_user(user)
-        return Response({
+        response = Response({
             'access': str(refresh.access_token),
             'refresh': str(refresh),
             'user': {
@@ -130,19 +142,79 @@ class GuestLoginView(APIView):
                 'email': user.email,
             }
         })
+        merge_request_cart(request, user, response)
+        return response
+
+
+def _cart_items(cart, items=None) -> list[dict]:
+    """Ítems del carrito para el frontend: una consulta con el producto unido."""
+    items = cart.items.all() if items is None else items
+    return [
+        {
+            'id': i.id,
+            'product_id': i.product.id,
+            'name': f'{i.product.brand} {i.product.model_name}',
+            'price': float(i.product.price),
+            'quantity': i.quantity,
+            'subtotal': float(i.product.price * i.quantity),
+        }
+        for i in items.select_related('product')
+    ]
+
+
+def _since(request) -> int | None:
+    try:
+        return int(request.query_params['since'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _cart_payload(cart, since: int | None = None) -> dict:
+    """
+    Resumen del carrito (versión, total y conteo de la fila de Cart). Con
+    `since` cubierto por el registro de eliminaciones, solo las líneas
+    cambiadas después de esa versión y las eliminadas (`removed`, aplicar
+    primero); si no, todas las líneas.
+    """
+    payload = {'version': cart.version, 'total': float(cart.total), 'count': cart.item_count}
+    removals = cart.removals or {}
+    if since is not None and removals.get('floor', 0) <= since <= cart.version:
+        payload['since'] = since
+        payload['items'] = (_cart_items(cart, cart.items.filter(updated_version__gt=since))
+                            if since < cart.version else [])
+        payload['removed'] = [
+            {'id': item_id, 'product_id': product_id}
+            for version, item_id, product_id in removals.get('entries', [])
+            if version > since
+        ]
+    else:
+        payload['items'] = _cart_items(cart)
+    return payload
+
+
+def _with_etag(response, cart):
+    response['ETag'] = cart_etag(cart)
+    return response
 
 
 class AddToCartAPIView(APIView):
     """
     POST /api/v1/cart/add/
-    Agrega un producto al carrito del usuario autenticado.
+    Agrega un producto al carrito del usuario autenticado o, sin sesión, al
+    carrito anónimo (sin escrituras en la base de datos; la respuesta trae
+    cart_token). Con sesión, ?since=<versión> devuelve solo el delta del
+    carrito (como en summary).
     Body: { "product_id": 1, "quantity": 1 }
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [AllowAny]
 
     def post(self, request):
-        product_id = request.data.get('product_id')
-        quantity   = int(request.data.get('quantity', 1))
+        # La cantidad se valida antes de los dos caminos: con sesión va a la
+        # base y sin sesión queda firmada en el token del carrito anónimo
+        serializer = AddToCartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_id = serializer.validated_data['product_id']
+        quantity   = serializer.validated_data['quantity']
 
         try:
             product = Product.objects.get(pk=product_id, is_active=True)
@@ -159,76 +231,91 @@ class AddToCartAPIView(APIView):
         except Exception:
             return Response({'error': 'Producto sin inventario'}, status=400)
 
+        if not request.user.is_authenticated:
+            return self._add_anonymous(request, product, quantity)
+
         cart, _ = Cart.objects.get_or_create(user=request.user)
 
         from apps.cart.models import CartItem
-        item, created = CartItem.objects.get_or_create(cart=cart, product=product)
+        # Una sola escritura (y una versión del carrito) por adición
+        item, created = CartItem.objects.get_or_create(cart=cart, product=product, defaults={'quantity': quantity})
         if not created:
             item.quantity += quantity
-        else:
-            item.quantity = quantity
-        item.save()
-
-        # Devolver carrito actualizado
-        items = []
-        for i in cart.items.select_related('product').all():
-            items.append({
-                'id': i.id,
-                'product_id': i.product.id,
-                'name': f'{i.product.brand} {i.product.model_name}',
-                'price': float(i.product.price),
-                'quantity': i.quantity,
-                'subtotal': float(i.product.price * i.quantity),
-            })
+            item.save(update_fields=['quantity'])
 
-        return Response({
+        # Devolver carrito actualizado (item.save() ya recalculó totales y versión)
+        cart.refresh_from_db(fields=['item_count', 'total', 'version', 'removals'])
+        return _with_etag(Response({
             'message': 'Producto agregado al carrito',
-            'cart': {
-                'items': items,
-                'total': float(cart.get_total()),
-                'count': cart.items.count(),
-            }
-        })
+            'cart': _cart_payload(cart, _since(request)),
+        }), cart)
+
+    @staticmethod
+    def _add_anonymous(request, product, quantity):
+        anonymous = AnonymousCart.from_request(request, create=True)
+        try:
+            anonymous.add(product.pk, quantity)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        response = Response({'message': 'Producto agregado al carrito', 'cart': anonymous.summary()})
+        anonymous.attach(response)
+        return response
 
 
 class GetCartAPIView(APIView):
-    """GET /api/v1/cart/summary/ — Resumen del carrito para el frontend."""
-    permission_classes = [IsAuthenticated]
+    """
+    GET /api/v1/cart/summary/ — Resumen del carrito para el frontend (también anónimo).
+
+    Con sesión, la respuesta lleva ETag (versión del carrito): un
+    If-None-Match vigente responde 304 tras leer solo la fila del carrito, y
+    ?since=<versión> devuelve solo las líneas cambiadas y las eliminadas.
+    """
+    permission_classes = [AllowAny]
 
     def get(self, request):
+        if not request.user.is_authenticated:
+            anonymous = AnonymousCart.from_request(request)
+            if anonymous is None:
+                return Response({'items': [], 'total': 0.0, 'count': 0})
+            return Response(anonymous.summary())
+
         cart, _ = Cart.objects.get_or_create(user=request.user)
-        items = []
-        for i in cart.items.select_related('product').all():
-            items.append({
-                'id': i.id,
-                'product_id': i.product.id,
-                'name': f'{i.product.brand} {i.product.model_name}',
-                'price': float(i.product.price),
-                'quantity': i.quantity,
-                'subtotal': float(i.product.price * i.quantity),
-            })
-        return Response({
-            'items': items,
-            'total': float(cart.get_total()),
-            'count': cart.items.count(),
-        })
+        if cart_etag(cart) in parse_etags(request.headers.get('If-None-Match', '')):
+            return _with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), cart)
+        return _with_etag(Response(_cart_payload(cart, _since(request))), cart)
 
 
 class RemoveCartItemAPIView(APIView):
-    """DELETE /api/v1/cart/remove/{item_id}/"""
-    permission_classes = [IsAuthenticated]
+    """
+    DELETE /api/v1/cart/remove/{item_id}/
+    En el carrito anónimo el id de cada ítem es el del producto. Con sesión,
+    ?since=<versión> agrega el delta del carrito (como en summary).
+    """
+    permission_classes = [AllowAny]
 
     def delete(self, request, item_id):
         from apps.cart.models import CartItem
+
+        if not request.user.is_authenticated:
+            anonymous = AnonymousCart.from_request(request)
+            if anonymous is None or not anonymous.remove(item_id):
+                return Response({'error': 'Item no encontrado'}, status=404)
+            summary = anonymous.summary()
+            response = Response({'message': 'Eliminado', 'total': summary['total'], 'count': summary['count']})
+            anonymous.attach(response)  # el token lleva el contenido: se reemite en cada cambio
+            return response
+
         try:
             item = CartItem.objects.get(pk=item_id, cart__user=request.user)
             item.delete()
         except CartItem.DoesNotExist:
             return Response({'error': 'Item no encontrado'}, status=404)
 
+        # Una fila: totales y versión ya se actualizaron en item.delete()
         cart = Cart.objects.get(user=request.user)
-        return Response({
-            'message': 'Eliminado',
-            'total': float(cart.get_total()),
-            'count': cart.items.count(),
-        })
+        response = {'message': 'Eliminado', 'version': cart.version,
+                    'total': float(cart.total), 'count': cart.item_count}
+        since = _since(request)
+        if since is not None:
+            response['cart'] = _cart_payload(cart, since)
+        return _with_etag(Response(response), cart)
@@ -0,0 +1,135 @@
+"""
+apps/orders/reservations.py
+
+Principio SRP: Solo vence las reservas de stock de órdenes y compras sin pagar.
+
+Una orden o compra 'pending' retiene su stock hasta reservation_expires_at
+(lo fijan OrderBuilder.build y Purchase.save; PSE y Nequi pueden quedar
+'pending' indefinidamente). El barrido toma las vencidas por el índice
+(status, reservation_expires_at) en lotes y, por lote y en una transacción:
+
+  1. cancela las órdenes (rechaza las compras) con un solo UPDATE
+     condicionado a 'pending';
+  2. suma las unidades por producto (una consulta);
+  3. las libera con un UPDATE por producto (no por item ni por orden).
+
+Con bloqueo de filas (SELECT ... FOR UPDATE SKIP LOCKED) ninguna fila del
+lote cambia entre la lectura y el UPDATE. Sin él (SQLite), si el UPDATE no
+alcanza todas las filas (alguna se pagó en el medio) se revierte y se repite
+fila por fila: cada UPDATE condicional dice cuáles canceló este barrido, y
+solo se libera el stock de esas.
+"""
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.inventory.services import StockReservationService
+
+from .models import Order, OrderItem, Purchase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class _Raced(Exception):
+    """El UPDATE del lote no alcanzó todas las filas: revierte el savepoint."""
+
+
+def expired_orders(now=None):
+    """Órdenes pendientes con la reserva vencida, las más antiguas primero."""
+    now = now or timezone.now()
+    return (Order.objects
+            .filter(status='pending', reservation_expires_at__lte=now)
+            .order_by('reservation_expires_at'))
+
+
+def expired_purchases(now=None):
+    """Compras pendientes con la reserva vencida, las más antiguas primero."""
+    now = now or timezone.now()
+    return (Purchase.objects
+            .filter(status='pending', reservation_expires_at__lte=now)
+            .order_by('reservation_expires_at'))
+
+
+def _claim(model, ids: list[int], changes: dict) -> list[int]:
+    """Pasa las filas `ids` de 'pending' a `changes`. Retorna las que cambió este barrido."""
+    try:
+        with transaction.atomic():
+            if model.objects.filter(pk__in=ids, status='pending').update(**changes) != len(ids):
+                raise _Raced
+        return ids
+    except _Raced:
+        return [pk for pk in ids if model.objects.filter(pk=pk, status='pending').update(**changes)]
+
+
+def _expire_batch(pending, changes: dict, units, reference: str, batch_size: int) -> tuple[int, int, int]:
+    """
+    Vence un lote de `pending`. `units(ids)` da {product_id: unidades} de las
+    filas canceladas. Retorna (encontradas, canceladas, unidades liberadas).
+    """
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            # Varios barredores en paralelo se reparten los lotes; una fila
+            # que se está pagando (bloqueada) queda para la próxima pasada
+            pending = pending.select_for_update(skip_locked=True, of=('self',))
+        ids = list(pending.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0, 0, 0
+        claimed = _claim(pending.model, ids, changes)
+        quantities = units(claimed) if claimed else {}
+        if quantities:
+            StockReservationService().release(quantities, strict=False, reference=reference)
+    return len(ids), len(claimed), sum(quantities.values())
+
+
+def release_expired_batch(now=None, batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int, int]:
+    """
+    Cancela un lote de órdenes vencidas y devuelve su stock.
+    Retorna (órdenes encontradas, canceladas, unidades liberadas); encontradas
+    es 0 cuando no quedan más.
+    """
+    now = now or timezone.now()
+    return _expire_batch(
+        expired_orders(now),
+        {'status': 'cancelled', 'reservation_expires_at': None, 'updated_at': now},
+        lambda ids: dict(OrderItem.objects.filter(order_id__in=ids)
+                         .values_list('product_id').annotate(units=Sum('quantity')).order_by()),
+        'order-expiry', batch_size,
+    )
+
+
+def release_expired_purchases_batch(now=None, batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int, int]:
+    """Como release_expired_batch, para compras rápidas: las vencidas quedan rechazadas."""
+    now = now or timezone.now()
+    return _expire_batch(
+        expired_purchases(now),
+        {'status': 'rejected', 'reservation_expires_at': None},
+        lambda ids: dict(Purchase.objects.filter(pk__in=ids)
+                         .values_list('product_id').annotate(units=Sum('quantity')).order_by()),
+        'purchase-expiry', batch_size,
+    )
+
+
+def release_expired_reservations(now=None, batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int, int]:
+    """
+    Barre todas las reservas vencidas hasta `now`, órdenes y compras.
+    Retorna (órdenes canceladas, compras rechazadas, unidades liberadas).
+    """
+    now = now or timezone.now()
+    totals = {}
+    for label, expire in (('órdenes', release_expired_batch), ('compras', release_expired_purchases_batch)):
+        cancelled = units = 0
+        while True:
+            # Se sigue mientras haya candidatas, aunque otro proceso haya
+            # pagado o cancelado todas las de un lote
+            found, batch_cancelled, released = expire(now, batch_size)
+            if not found:
+                break
+            cancelled += batch_cancelled
+            units += released
+            logger.info('Reservas vencidas: %d %s canceladas, %d unidades liberadas', batch_cancelled, label, released)
+        totals[label] = (cancelled, units)
+    return totals['órdenes'][0], totals['compras'][0], totals['órdenes'][1] + totals['compras'][1]
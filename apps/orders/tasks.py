@@ -0,0 +1,13 @@
+"""
+apps/orders/tasks.py
+
+Tareas periódicas de órdenes (ver core/scheduler.py).
+"""
+from core.scheduler import register
+
+from .reservations import release_expired_reservations
+
+
+@register('release-expired-reservations', interval=60)
+def release_expired_reservations_task():
+    return release_expired_reservations()
@@ -4,15 +4,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from core.pagination import KeysetModePagination
 from .models import Order
 from .serializers import OrderSerializer, CreateOrderSerializer, ChangeStatusSerializer
 from .services import OrderService
 
 
 class OrderListCreateView(generics.ListAPIView):
-    """GET /api/v1/orders/ — Historial de órdenes del usuario."""
+    """GET /api/v1/orders/ — Historial de órdenes del usuario (admite ?pagination=cursor)."""
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetModePagination
 
     def get_queryset(self):
         return Order.objects.filter(user=self.request.user).prefetch_related('items__product')
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.products'
+
+    def ready(self):
+        # Registrar los receptores de cambios del catálogo
+        from . import signals  # noqa: F401
@@ -0,0 +1,97 @@
+"""
+apps/products/catalog_entries.py
+
+Mantenimiento del read-model CatalogEntry.
+
+refresh_entries(ids) vuelve a calcular las entradas de los productos dados
+(una consulta con el JOIN a inventario + un upsert) y elimina las de los
+productos inactivos o borrados. Lo llaman las señales de Product/Inventory
+(en la misma transacción que la escritura) y las escrituras masivas que no
+emiten señales (import_catalog, build_image_variants, ...).
+"""
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+from .models import CatalogEntry, Product
+from .search import normalize_text
+
+BATCH_SIZE = 500
+UPDATE_FIELDS = [f.name for f in CatalogEntry._meta.concrete_fields if not f.primary_key]
+
+_SOURCE_FIELDS = (
+    'id', 'brand', 'model_name', 'price', 'image', 'image_variants', 'ram_gb',
+    'storage_gb', 'processor', 'battery_mah', 'camera_mp', 'screen_inches',
+    'os', 'created_at',
+)
+_os_labels = dict(Product.OS_CHOICES)
+
+
+def entry_fields(row: dict) -> dict:
+    """Campos de CatalogEntry a partir de una fila .values() de Product (con `stock`)."""
+    os = row['os'].lower()
+    return dict(
+        id=row['id'],
+        brand=row['brand'],
+        brand_key=row['brand'].lower(),
+        model_name=row['model_name'],
+        display_name=f"{row['brand']} {row['model_name']}",
+        price=row['price'],
+        image=row['image'] or '',
+        image_variants=row['image_variants'],
+        ram_gb=row['ram_gb'],
+        storage_gb=row['storage_gb'],
+        processor=row['processor'],
+        battery_mah=row['battery_mah'],
+        camera_mp=row['camera_mp'],
+        screen_inches=row['screen_inches'],
+        os=os,
+        os_label=_os_labels.get(os, row['os']),
+        created_at=row['created_at'],
+        stock=row['stock'],
+        in_stock=row['stock'] > 0,
+        search_text=normalize_text(f"{row['brand']} {row['model_name']} {row['processor']}"),
+    )
+
+
+def entry_from_row(row: dict) -> CatalogEntry:
+    return CatalogEntry(**entry_fields(row))
+
+
+def source_rows(queryset):
+    """
+    Filas de los productos activos de `queryset` con su stock, listas para
+    entry_fields (sirve también con el modelo histórico de una migración).
+    """
+    return queryset.filter(is_active=True).values(
+        *_SOURCE_FIELDS, stock=Coalesce(F('inventory__stock_available'), Value(0)),
+    )
+
+
+def refresh_entries(product_ids) -> None:
+    """Recalcula (upsert) o elimina las entradas de los productos dados."""
+    product_ids = sorted(set(product_ids))
+    for start in range(0, len(product_ids), BATCH_SIZE):
+        batch = product_ids[start:start + BATCH_SIZE]
+        entries = [entry_from_row(row) for row in source_rows(Product.objects.filter(pk__in=batch))]
+        CatalogEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=['id'], update_fields=UPDATE_FIELDS,
+        )
+        missing = set(batch) - {entry.id for entry in entries}
+        if missing:
+            CatalogEntry.objects.filter(pk__in=missing).delete()
+
+
+def rebuild_all(batch_size: int = BATCH_SIZE) -> int:
+    """Reconstruye la tabla completa por lotes. Retorna la cantidad de entradas."""
+    total, batch = 0, []
+    CatalogEntry.objects.exclude(pk__in=Product.objects.filter(is_active=True).values('pk')).delete()
+    for row in source_rows(Product.objects.order_by('id')).iterator(chunk_size=batch_size):
+        batch.append(entry_from_row(row))
+        if len(batch) >= batch_size:
+            CatalogEntry.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=['id'], update_fields=UPDATE_FIELDS,
+            )
+            total += len(batch)
+            batch = []
+    CatalogEntry.objects.bulk_create(batch, update_conflicts=True, unique_fields=['id'], update_fields=UPDATE_FIELDS)
+    return total + len(batch)
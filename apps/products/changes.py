@@ -0,0 +1,158 @@
+"""
+apps/products/changes.py
+
+Registro de cambios del catálogo.
+
+Cada escritura de Product o Inventory agrega una fila a CatalogChange con
+los productos que cambiaron; su id es la nueva versión global del catálogo.
+La versión vive en la base de datos (no en el caché, que puede ser local a
+cada proceso): un cambio hecho desde un comando o desde otro worker
+invalida los ETag y los índices de todos los procesos. Los índices en
+memoria de cada worker comparan su versión con la global y se actualizan
+solo con los productos modificados. Cada registro emite catalog_changed
+(los carritos que contienen esos productos cambian de versión, ver
+apps/cart/signals.py).
+"""
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from django.dispatch import Signal
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import CatalogChange
+
+MAX_REPLAY = 1000  # versiones máximas a reproducir antes de reconstruir
+
+EPOCH = datetime.fromtimestamp(0, tz=timezone.utc)
+
+# Tras registrar un cambio: product_ids (ordenados) y version
+catalog_changed = Signal()
+
+
+def _latest() -> tuple[int, datetime]:
+    """(versión, fecha) del último cambio registrado; (0, EPOCH) si no hay ninguno."""
+    latest = CatalogChange.objects.order_by('-id').values_list('id', 'created_at').first()
+    return latest or (0, EPOCH)
+
+
+def current_version() -> int:
+    """Versión actual del catálogo (una consulta por la clave primaria)."""
+    return _latest()[0]
+
+
+def record_change(product_ids) -> int:
+    """Registra que los productos dados cambiaron. Retorna la nueva versión."""
+    product_ids = sorted(set(product_ids))
+    version = CatalogChange.objects.create(product_ids=product_ids).pk
+    catalog_changed.send(sender=CatalogChange, product_ids=product_ids, version=version)
+    return version
+
+
+def changed_since(version: int) -> set | None:
+    """
+    Productos que cambiaron después de `version`.
+    Retorna None si el historial no alcanza (hay que reconstruir todo).
+    """
+    current = current_version()
+    if version == current:
+        return set()
+    if version > current or current - version > MAX_REPLAY:
+        return None
+
+    found = list(CatalogChange.objects.filter(id__gt=version, id__lte=current)
+                 .values_list('product_ids', flat=True))
+    # Faltan versiones (purgadas, o un INSERT concurrente aún sin confirmar)
+    if len(found) != current - version:
+        return None
+    return set().union(*found)
+
+
+# ── GET condicional ─────────────────────────────────────────────────────────
+# Las respuestas públicas del catálogo solo cambian cuando cambia la versión:
+# ETag y Last-Modified se derivan de ella y un If-None-Match vigente se
+# responde con 304 sin tocar el ORM ni serializar.
+
+def _etag(version: int, request) -> str:
+    accept = hashlib.sha1(request.headers.get('Accept', '').encode()).hexdigest()[:8]
+    return f'catalog-{version}-{accept}'
+
+
+def _request_latest(request) -> tuple[int, datetime]:
+    """_latest() leído una vez por petición: ETag y Last-Modified comparten la consulta."""
+    if not hasattr(request, '_catalog_latest'):
+        request._catalog_latest = _latest()
+    return request._catalog_latest
+
+
+def catalog_etag(request, *args, **kwargs) -> str:
+    """ETag fuerte: versión del catálogo + representación pedida (Accept)."""
+    return _etag(_request_latest(request)[0], request)
+
+
+def catalog_last_modified(request, *args, **kwargs) -> datetime:
+    """Fecha del último cambio registrado del catálogo."""
+    return _request_latest(request)[1]
+
+
+def catalog_conditional(view):
+    """
+    Decorador para vistas del catálogo: ETag/Last-Modified, 304 condicional y
+    Cache-Control: no-cache (el cliente guarda la respuesta pero revalida).
+    """
+    conditional = condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+    return cache_control(no_cache=True)(conditional(view))
+
+
+def with_version_validators(response, request, version: int, modified: datetime):
+    """
+    ETag/Last-Modified de una versión anterior a la actual, para respuestas
+    servidas desde un índice que se sincroniza con retraso (el trie de
+    sugerencias): los datos nunca quedan etiquetados con una versión más
+    nueva que la suya. catalog_conditional conserva los validadores que ya
+    trae la respuesta.
+    """
+    response['ETag'] = quote_etag(_etag(version, request))
+    response['Last-Modified'] = http_date(modified.timestamp())
+    return response
+
+
+class VersionedIndex:
+    """
+    Base para índices en memoria por proceso sincronizados con el catálogo.
+
+    Las subclases implementan _rebuild() y, si pueden actualizarse
+    parcialmente, _apply_changes(product_ids).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version: int | None = None
+        self.modified: datetime | None = None   # fecha del cambio `version`
+
+    def refresh(self) -> 'VersionedIndex':
+        """Sincroniza el índice con la versión actual del catálogo."""
+        current, modified = _latest()
+        if current == self.version:
+            return self
+
+        with self._lock:
+            if current == self.version:
+                return self
+            changed = None if self.version is None else changed_since(self.version)
+            if changed is None:
+                self._rebuild()
+            elif changed:
+                self._apply_changes(changed)
+            # La versión se leyó ANTES de cargar los datos: un cambio
+            # concurrente se volverá a aplicar en el siguiente refresh.
+            self.version, self.modified = current, modified
+        return self
+
+    def _rebuild(self) -> None:
+        raise NotImplementedError
+
+    def _apply_changes(self, product_ids: set) -> None:
+        self._rebuild()
@@ -0,0 +1,76 @@
+"""
+apps/products/export.py
+
+Exportación del catálogo activo completo en streaming (NDJSON o CSV).
+
+Las filas se leen con `.iterator(chunk_size=...)` (sin cachear el queryset)
+y se emiten por bloques: la memoria usada es la de un bloque, sin importar
+el tamaño del catálogo. Lo usan el endpoint /products/export/ y el comando
+`manage.py export_catalog`.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+
+from .serializers import serialize_product_row
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv':    'text/csv',
+}
+CSV_COLUMNS = [
+    'id', 'brand', 'model_name', 'description', 'price', 'image',
+    'ram_gb', 'storage_gb', 'processor', 'battery_mah', 'camera_mp',
+    'screen_inches', 'os', 'os_display', 'is_active', 'created_at', 'stock',
+]
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: write() retorna la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(request=None, chunk_size: int | None = None):
+    """Productos activos serializados (forma del listado + descripción), por id."""
+    from .models import Product
+    from .services import ProductService
+
+    chunk_size = chunk_size or settings.CATALOG_EXPORT_CHUNK_SIZE
+    rows = ProductService().as_list_rows(
+        Product.objects.filter(is_active=True).order_by('id'), 'description',
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        data = serialize_product_row(row, request)
+        data['description'] = row['description']
+        yield data
+
+
+def _blocks(lines, size: int):
+    """Agrupa las líneas en bloques de `size` para no emitir un write por fila."""
+    lines = iter(lines)
+    while block := ''.join(islice(lines, size)):
+        yield block
+
+
+def stream_export(fmt: str, request=None, chunk_size: int | None = None):
+    """Bloques de texto del catálogo en `fmt` ('ndjson' o 'csv')."""
+    chunk_size = chunk_size or settings.CATALOG_EXPORT_CHUNK_SIZE
+    rows = export_rows(request, chunk_size)
+
+    if fmt == 'ndjson':
+        lines = (json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+    else:
+        lines = _csv_lines(rows)
+    return _blocks(lines, chunk_size)
+
+
+def _csv_lines(rows):
+    # Las URLs de variantes (anidadas) solo van en NDJSON
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS, extrasaction='ignore')
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
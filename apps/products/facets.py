@@ -0,0 +1,96 @@
+"""
+apps/products/facets.py
+
+Conteos por faceta del catálogo (marca, SO, RAM, almacenamiento y precio).
+
+Principio SRP: Solo define los rangos de cada faceta y cómo contarlos.
+Todas las facetas se calculan en UNA consulta agregada: se agrupa por la
+combinación (marca, so, rango_ram, rango_almacenamiento, rango_precio) y
+los totales de cada faceta se acumulan en Python sobre ese resultado.
+"""
+from collections import Counter
+
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+
+# (clave, etiqueta, mínimo inclusivo, máximo inclusivo)
+RAM_BUCKETS = [
+    ('0-4',    'Hasta 4 GB',     0,  4),
+    ('5-8',    '5 a 8 GB',       5,  8),
+    ('9-16',   '9 a 16 GB',      9, 16),
+    ('17+',    'Más de 16 GB',  17, None),
+]
+STORAGE_BUCKETS = [
+    ('0-64',   'Hasta 64 GB',     0,  64),
+    ('65-128', '128 GB',         65, 128),
+    ('129-256','256 GB',        129, 256),
+    ('257+',   '512 GB o más',  257, None),
+]
+PRICE_BANDS = [
+    ('0-1M',   'Menos de $1.000.000',             0,   999999),
+    ('1M-2M',  '$1.000.000 a $2.000.000',   1000000,  2000000),
+    ('2M-4M',  '$2.000.000 a $4.000.000',   2000001,  4000000),
+    ('4M+',    'Más de $4.000.000',         4000001,  None),
+]
+
+RANGE_FACETS = {
+    'ram_gb':     ('ram_gb', RAM_BUCKETS),
+    'storage_gb': ('storage_gb', STORAGE_BUCKETS),
+    'price':      ('price', PRICE_BANDS),
+}
+
+
+def _bucket_expression(field: str, buckets: list) -> Case:
+    """CASE WHEN que asigna a cada fila el índice de su rango."""
+    whens = []
+    for index, (_key, _label, low, high) in enumerate(buckets):
+        condition = Q(**{f'{field}__gte': low})
+        if high is not None:
+            # Los límites son enteros; < high + 1 incluye decimales (precios)
+            condition &= Q(**{f'{field}__lt': high + 1})
+        whens.append(When(condition, then=Value(index)))
+    return Case(*whens, default=Value(None), output_field=IntegerField())
+
+
+def count_facets(queryset) -> dict:
+    """Cuenta todas las facetas del queryset filtrado en una sola consulta."""
+    annotations = {
+        f'{name}_bucket': _bucket_expression(field, buckets)
+        for name, (field, buckets) in RANGE_FACETS.items()
+    }
+    groups = (queryset
+        .order_by()
+        .annotate(**annotations)
+        .values('brand', 'os', *annotations)
+        .annotate(n=Count('id'))
+    )
+
+    total = 0
+    counters = {name: Counter() for name in ('brand', 'os', *RANGE_FACETS)}
+    for row in groups:
+        n = row['n']
+        total += n
+        counters['brand'][row['brand']] += n
+        counters['os'][row['os']] += n
+        for name in RANGE_FACETS:
+            counters[name][row[f'{name}_bucket']] += n
+
+    from .models import Product
+    os_labels = dict(Product.OS_CHOICES)
+
+    facets = {
+        'brand': [
+            {'value': brand, 'count': n}
+            for brand, n in sorted(counters['brand'].items(), key=lambda kv: (-kv[1], kv[0]))
+        ],
+        'os': [
+            {'value': os, 'label': os_labels.get(os, os), 'count': n}
+            for os, n in sorted(counters['os'].items(), key=lambda kv: (-kv[1], kv[0]))
+        ],
+    }
+    for name, (_field, buckets) in RANGE_FACETS.items():
+        facets[name] = [
+            {'value': key, 'label': label, 'min': low, 'max': high, 'count': counters[name][index]}
+            for index, (key, label, low, high) in enumerate(buckets)
+        ]
+
+    return {'total': total, 'facets': facets}
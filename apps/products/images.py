@@ -0,0 +1,258 @@
+"""
+apps/products/images.py
+
+Variantes precalculadas de la imagen de cada producto (Pillow).
+
+Por cada imagen subida se generan versiones redimensionadas en WebP y JPEG
+(tamaños en settings.PRODUCT_IMAGE_VARIANTS). El trabajo de Pillow corre en
+un pool de procesos: el decode/resize/encode no compite con el GIL de los
+workers web. Los nombres llevan el hash del contenido original y de los
+parámetros de la variante (tamaño, formato, calidad), así que son
+inmutables (cacheables para siempre por un CDN o el servidor de estáticos)
+y una imagen repetida reutiliza sus variantes.
+
+Las variantes nunca se generan dentro de una petición: al cambiar la imagen
+de un producto se descartan las anteriores (queda pendiente) y las genera
+el comando build_image_variants o la tarea build-image-variants de
+run_maintenance.
+
+Product.image_variants guarda:
+    {"source": "products/foto.jpg", "variants": {"thumb": {"webp": "...", "jpeg": "..."}, ...}}
+o, si la imagen no se pudo procesar (build_image_variants --force la reintenta):
+    {"source": "products/foto.jpg", "error": "..."}
+"""
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'products/variants'
+FORMATS = {
+    # formato → (extensión, opciones de Image.save)
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg',  {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+SAVE_BATCH_SIZE = 200
+RENDER_VERSION = 1  # incrementar al cambiar render_variants: invalida los nombres generados
+
+
+# ── Trabajo de Pillow (corre en los procesos del pool, sin Django) ─────────
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    """JPEG no admite transparencia: se aplana sobre fondo blanco."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variants(data: bytes, sizes: dict[str, int]) -> dict[str, dict[str, bytes]]:
+    """
+    Bytes de cada variante: {nombre: {formato: bytes}}. Cada tamaño es el lado
+    máximo en píxeles; nunca se amplía una imagen más chica.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    rendered = {}
+    # De mayor a menor: cada variante se reduce desde la anterior (más barato)
+    for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        rgb = _to_rgb(image)
+        rendered[name] = {}
+        for fmt, (_, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            (image if fmt == 'webp' else rgb).save(buffer, **options)
+            rendered[name][fmt] = buffer.getvalue()
+    return rendered
+
+
+# ── Orquestación (proceso de Django) ───────────────────────────────────────
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Pool de procesos compartido (spawn: los hijos no heredan conexiones ni hilos)."""
+    global _executor
+    if _executor is None:
+        from django.conf import settings
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PRODUCT_IMAGE_WORKERS, mp_context=get_context('spawn'),
+        )
+    return _executor
+
+
+def variant_name(digest: str, variant: str, size: int, fmt: str) -> str:
+    """
+    Nombre inmutable de una variante: hash del contenido original, del lado
+    máximo, del formato y de sus opciones de codificación (y de
+    RENDER_VERSION). Cambiar un tamaño o la calidad produce nombres nuevos en
+    lugar de reutilizar los archivos ya generados.
+    """
+    extension, options = FORMATS[fmt]
+    settings_key = f'{digest}:{size}:{fmt}:{sorted(options.items())}:{RENDER_VERSION}'
+    return f'{VARIANTS_DIR}/{hashlib.sha256(settings_key.encode()).hexdigest()[:16]}_{variant}.{extension}'
+
+
+def _read_source(image_name: str) -> bytes:
+    from django.core.files.storage import default_storage
+    with default_storage.open(image_name, 'rb') as source:
+        return source.read()
+
+
+def _store(image_name: str, digest: str, sizes: dict[str, int], rendered: dict) -> dict:
+    """Guarda las variantes que aún no existen y retorna el valor de image_variants."""
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+
+    variants = {}
+    for variant, formats in rendered.items():
+        variants[variant] = {}
+        for fmt, content in formats.items():
+            name = variant_name(digest, variant, sizes[variant], fmt)
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(content))
+            variants[variant][fmt] = name
+    return {'source': image_name, 'variants': variants}
+
+
+def build_variants(image_names, executor: ProcessPoolExecutor | None = None, window: int | None = None):
+    """
+    Genera las variantes de cada imagen en paralelo. Produce pares
+    (nombre de imagen, image_variants | excepción) en el orden de entrada.
+
+    Como mucho `window` imágenes están en vuelo a la vez, para no cargar en
+    memoria todo el directorio de media.
+    """
+    from django.conf import settings
+
+    executor = executor or get_executor()
+    sizes = settings.PRODUCT_IMAGE_VARIANTS
+    window = window or 2 * (settings.PRODUCT_IMAGE_WORKERS or os.cpu_count() or 1)
+    pending = {}
+    names = iter(image_names)
+
+    def submit_next() -> bool:
+        name = next(names, None)
+        if name is None:
+            return False
+        try:
+            data = _read_source(name)
+        except OSError as exc:
+            pending[name] = exc
+            return True
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        try:
+            pending[name] = (digest, executor.submit(render_variants, data, sizes))
+        except BrokenProcessPool as exc:
+            pending[name] = exc
+        return True
+
+    while len(pending) < window and submit_next():
+        pass
+
+    while pending:
+        name, job = next(iter(pending.items()))
+        del pending[name]
+        if isinstance(job, Exception):
+            yield name, job
+        else:
+            digest, future = job
+            try:
+                result = _store(name, digest, sizes, future.result())
+            except Exception as exc:  # imagen corrupta o formato no soportado
+                result = exc
+            yield name, result
+        submit_next()
+
+
+def pending_images(force: bool = False) -> dict[str, list[int]]:
+    """
+    {imagen: [ids de producto]} de los productos cuya imagen no tiene
+    variantes generadas (nueva o cambiada). Una imagen que ya falló queda
+    marcada ({'source': ..., 'error': ...}) y no se reintenta; todas, con
+    force=True.
+    """
+    from .models import Product
+
+    images = {}
+    for pk, image, variants in (Product.objects.exclude(image='').exclude(image__isnull=True)
+                                .values_list('id', 'image', 'image_variants').iterator()):
+        if force or (variants or {}).get('source') != image:
+            images.setdefault(image, []).append(pk)
+    return images
+
+
+def save_variants(batch: list[tuple[int, dict]]) -> None:
+    """Guarda image_variants de los pares (id de producto, variantes) en una transacción."""
+    from django.db import transaction
+
+    from .catalog_entries import refresh_entries
+    from .changes import record_change
+    from .models import Product
+
+    if not batch:
+        return
+    with transaction.atomic():
+        Product.objects.bulk_update([Product(pk=pk, image_variants=variants) for pk, variants in batch],
+                                    ['image_variants'])
+        # bulk_update no emite señales: las URLs nuevas van al read-model e
+        # invalidan el catálogo
+        refresh_entries([pk for pk, _ in batch])
+        transaction.on_commit(lambda: record_change([pk for pk, _ in batch]))
+
+
+def build_pending_variants(images: dict[str, list[int]], executor: ProcessPoolExecutor | None = None,
+                           window: int | None = None):
+    """
+    Genera y guarda (por lotes de SAVE_BATCH_SIZE productos) las variantes de
+    `images` ({imagen: [ids de producto]}, ver pending_images). Produce
+    (imagen, image_variants | excepción) a medida que cada una termina.
+    """
+    global _executor
+    batch = []
+    for image, result in build_variants(images, executor=executor, window=window):
+        if isinstance(result, BrokenProcessPool):
+            if executor is None:
+                # Un proceso murió: el pool compartido ya no sirve, la próxima pasada crea otro
+                _executor = None
+        else:
+            # Un error de la imagen (corrupta, ilegible) se marca: no se reintenta en cada pasada
+            value = {'source': image, 'error': str(result)} if isinstance(result, Exception) else result
+            batch.extend((pk, value) for pk in images[image])
+            if len(batch) >= SAVE_BATCH_SIZE:
+                save_variants(batch)
+                batch = []
+        yield image, result
+    save_variants(batch)
+
+
+def mark_variants_pending(product) -> bool:
+    """
+    Si la imagen del producto cambió (o se quitó), descarta sus variantes:
+    dejan de servirse las de la imagen anterior y el producto queda
+    pendiente para build_image_variants o la tarea de mantenimiento. Nunca
+    renderiza (corre dentro de la petición). Se escribe con .update(): no
+    vuelve a disparar post_save. Retorna True si lo marcó.
+    """
+    from .models import Product
+
+    current = product.image_variants
+    image_name = product.image.name if product.image else None
+    if not current or current.get('source') == image_name:
+        return False
+    Product.objects.filter(pk=product.pk).update(image_variants=None)
+    product.image_variants = None
+    return True
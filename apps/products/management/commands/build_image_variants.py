@@ -0,0 +1,55 @@
+"""
+apps/products/management/commands/build_image_variants.py
+
+Genera (en paralelo) las variantes de imagen de los productos existentes.
+
+Por defecto solo procesa los productos cuya imagen aún no tiene variantes
+o cambió desde la última generación (pendientes); --force las regenera
+todas, incluidas las que fallaron antes. La tarea build-image-variants de run_maintenance procesa las
+pendientes periódicamente.
+
+Uso:
+    python manage.py build_image_variants
+    python manage.py build_image_variants --workers 8 --force
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+
+from apps.products.images import build_pending_variants, pending_images
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes WebP/JPEG de las imágenes de producto en un pool de procesos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Procesos del pool (por defecto, núcleos disponibles)')
+        parser.add_argument('--force', action='store_true', help='Regenerar aunque ya existan o hayan fallado')
+
+    def handle(self, *args, **options):
+        images = pending_images(force=options['force'])
+        if not images:
+            self.stdout.write('No hay imágenes pendientes.')
+            return
+
+        self.stdout.write(f'Procesando {len(images)} imágenes...')
+        started = time.perf_counter()
+        done, failed = 0, 0
+
+        workers = options['workers']
+        window = 2 * workers if workers else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+            for image, result in build_pending_variants(images, executor=executor, window=window):
+                if isinstance(result, Exception):
+                    failed += 1
+                    self.stderr.write(f'  {image}: {result}')
+                else:
+                    done += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{done} imágenes procesadas, {failed} con error, en {elapsed:.1f}s '
+            f'({done / elapsed if elapsed else 0:.1f} imágenes/s)'
+        ))
@@ -0,0 +1,92 @@
+"""
+apps/products/management/commands/check_query_plans.py
+
+Verifica los planes de consulta del catálogo.
+
+Construye con ProductService/ProductQueryBuilder cada combinación de
+filtros (brand, os, rango de precio, RAM mínima, en stock, búsqueda) y cada
+orden permitido, ejecuta EXPLAIN (QuerySet.explain()) y falla si alguna
+consulta recorre la tabla de productos completa: sin índice, o leyendo un
+índice entero que no filtra ni da el orden pedido. Las combinaciones sin
+búsqueda se verifican también sobre el read-model CatalogEntry.
+
+Uso:
+    python manage.py check_query_plans
+    python manage.py check_query_plans -v2   # imprime cada plan
+"""
+import re
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.products.models import CatalogEntry, Product
+from apps.products.services import ProductService
+from core.builders.product_query_builder import ProductQueryBuilder
+
+# Valores de ejemplo de cada filtro del builder
+FILTERS = {
+    'brand':    {'brand': 'samsung'},
+    'os':       {'os': 'android'},
+    'price':    {'min_price': '500000', 'max_price': '2000000'},
+    'ram':      {'min_ram': '8'},
+    'in_stock': {'in_stock': 'true'},
+    'q':        {'q': 'galaxy'},
+}
+
+# Recorrido completo de una tabla en EXPLAIN QUERY PLAN de SQLite:
+# - "SCAN products_product" sin índice (la tabla FTS es virtual, no cuenta);
+# - "SCAN products_product USING INDEX ..." (recorre todo el índice) cuando
+#   además hace falta "USE TEMP B-TREE FOR ORDER BY": el índice no aporta ni
+#   filtro ni orden, así que se leen y ordenan todas las filas activas.
+SCAN = re.compile(r'\bSCAN (\w+)\b(?! VIRTUAL TABLE)( USING (?:COVERING )?INDEX)?')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+CHECKED_TABLES = {Product._meta.db_table, CatalogEntry._meta.db_table}
+
+
+def full_scans(plan: str) -> list[str]:
+    """Líneas del plan que recorren completa una de CHECKED_TABLES."""
+    sorts = TEMP_SORT in plan
+    return [
+        line.strip() for line in plan.splitlines()
+        if (match := SCAN.search(line))
+        and match.group(1) in CHECKED_TABLES
+        and (not match.group(2) or sorts)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Falla si alguna combinación de filtros del catálogo recorre completa la tabla de productos o el read-model.'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('El análisis de planes está implementado para SQLite (EXPLAIN QUERY PLAN).')
+
+        service = ProductService()
+        failures, checked = [], 0
+
+        for size in range(len(FILTERS) + 1):
+            for names in combinations(FILTERS, size):
+                params = {key: value for name in names for key, value in FILTERS[name].items()}
+                sources = [('products', service.get_filtered_products)]
+                if 'q' not in names:
+                    sources.append(('catalog', service.get_catalog_entries))
+                for ordering in ProductQueryBuilder.ALLOWED_ORDERINGS:
+                    if ordering == 'relevance' and 'q' not in names:
+                        continue
+                    for source, build in sources:
+                        plan = build({**params, 'ordering': ordering}).explain()
+                        checked += 1
+
+                        label = f'[{source}] {"+".join(names) or "(sin filtros)"} ordering={ordering}'
+                        if options['verbosity'] >= 2:
+                            self.stdout.write(f'{label}\n    ' + plan.replace('\n', '\n    '))
+                        scans = full_scans(plan)
+                        if scans:
+                            failures.append(f'{label}: {"; ".join(scans)}')
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} de {checked} consultas recorren la tabla completa:\n  ' + '\n  '.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS(f'{checked} planes verificados: todos usan índices.'))
@@ -0,0 +1,44 @@
+"""
+apps/products/management/commands/export_catalog.py
+
+Exporta el catálogo activo completo (con stock) en NDJSON o CSV, en
+streaming: la memoria usada no depende del tamaño del catálogo.
+
+Uso:
+    python manage.py export_catalog > catalog.ndjson
+    python manage.py export_catalog --fmt csv --output catalog.csv
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.export import EXPORT_FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Exporta el catálogo activo en NDJSON o CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fmt', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help='Archivo de salida (por defecto, stdout)')
+        parser.add_argument('--chunk-size', type=int, help='Filas por bloque del cursor')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        blocks = stream_export(options['fmt'], chunk_size=options['chunk_size'])
+        size = 0
+
+        if not options['output']:
+            for block in blocks:
+                self.stdout.write(block, ending='')
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for block in blocks:
+                output.write(block)
+                size += len(block)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Catálogo exportado a {options["output"]}: {size / 1_000_000:.1f} MB en {elapsed:.1f}s'
+        ))
@@ -0,0 +1,301 @@
+"""
+apps/products/management/commands/import_catalog.py
+
+Importación masiva del catálogo desde un feed de proveedor (CSV o JSONL).
+
+El archivo se lee en streaming y se procesa por lotes: cada lote se valida,
+se hace upsert de Product (clave: brand + model_name) e Inventory con
+bulk_create/bulk_update dentro de una transacción, y se guarda un
+checkpoint con el byte donde termina el lote. Si la importación falla,
+--resume salta directo a ese byte y continúa desde el último lote
+confirmado, sin volver a leer las filas anteriores.
+
+Uso:
+    python manage.py import_catalog feed.csv
+    python manage.py import_catalog feed.jsonl --batch-size 5000
+    python manage.py import_catalog feed.csv --resume
+
+Columnas: brand, model_name, price, description, ram_gb, storage_gb,
+processor, battery_mah, camera_mp, screen_inches, os y, opcionales,
+stock (stock disponible) e is_active.
+"""
+import csv
+import json
+import os
+import time
+from functools import partial
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.cart.totals import refresh_totals_for_products
+from apps.inventory.ledger import record_adjustments
+from apps.inventory.models import Inventory
+from apps.products.catalog_entries import refresh_entries
+from apps.products.changes import record_change
+from apps.products.models import Product
+
+PRODUCT_FIELDS = (
+    'brand', 'model_name', 'price', 'description', 'ram_gb', 'storage_gb',
+    'processor', 'battery_mah', 'camera_mp', 'screen_inches', 'os',
+)
+MAX_REPORTED_ERRORS = 20
+UPDATE_BATCH_SIZE = 500
+
+
+class _Lines:
+    """
+    Líneas del archivo (abierto en binario) decodificadas una a una, con el
+    byte donde termina la última entregada: el offset del checkpoint.
+    """
+
+    def __init__(self, feed, offset: int = 0):
+        feed.seek(offset)
+        self.feed = feed
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        raw = self.feed.readline()
+        if not raw:
+            raise StopIteration
+        self.offset += len(raw)
+        return raw.decode('utf-8')
+
+
+def _read_rows(path: str, fmt: str, offset: int = 0):
+    """
+    Filas del archivo una a una (sin cargarlo completo) junto al byte donde
+    termina cada una: dicts en CSV, líneas sin parsear en JSONL (una línea
+    corrupta se reporta como fila inválida). Con offset la lectura salta
+    directo a ese byte; en CSV el encabezado se lee primero.
+    """
+    with open(path, 'rb') as feed:
+        if fmt == 'csv':
+            header = next(csv.reader(_Lines(feed)), None)
+            if header is None:
+                return
+            # csv pide las líneas de a una: tras cada fila, el offset es su final
+            lines = _Lines(feed, offset or feed.tell())
+            rows = csv.DictReader(lines, fieldnames=header)
+        else:
+            lines = _Lines(feed, offset)
+            rows = (line for line in lines if line.strip())
+        for row in rows:
+            yield row, lines.offset
+
+
+class Command(BaseCommand):
+    help = 'Importa productos e inventario desde un archivo CSV o JSONL por lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo .csv o .jsonl')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Por defecto, según la extensión')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--checkpoint', help='Archivo de checkpoint (por defecto <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Continuar desde el último checkpoint')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe el archivo {path}')
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size debe ser positivo')
+        self.checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+
+        state = {'path': os.path.abspath(path), 'position': 0, 'offset': 0,
+                 'created': 0, 'updated': 0, 'invalid': 0}
+        if options['resume'] and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as checkpoint:
+                saved = json.load(checkpoint)
+            if saved.get('path') != state['path']:
+                raise CommandError('El checkpoint corresponde a otro archivo')
+            if not isinstance(saved.get('offset'), int):
+                raise CommandError('Checkpoint inválido: falta el offset')
+            state = saved
+            self.stdout.write(f'Reanudando desde la fila {state["position"]}')
+
+        self.errors_reported = 0
+        rows = _read_rows(path, fmt, state['offset'])
+        started = time.perf_counter()
+        processed = 0
+
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            state['offset'] = batch[-1][1]
+            batch = [row for row, _ in batch]
+            valid, invalid = self._validate(batch, first_row=state['position'] + 1)
+            created, updated = self._import_batch(valid)
+
+            state['position'] += len(batch)
+            state['created'] += created
+            state['updated'] += updated
+            state['invalid'] += invalid
+            self._save_checkpoint(state)
+
+            processed += len(batch)
+            if options['verbosity'] >= 2:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'  {state["position"]} filas — {processed / elapsed:,.0f} filas/s')
+
+        elapsed = time.perf_counter() - started
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación completa: {state["created"]} creados, {state["updated"]} actualizados, '
+            f'{state["invalid"]} inválidos. {processed} filas en {elapsed:.1f}s '
+            f'({processed / elapsed if elapsed else 0:,.0f} filas/s)'
+        ))
+
+    # ── Validación ──────────────────────────────────────────────────────────
+
+    def _validate(self, batch: list, first_row: int) -> tuple[dict, int]:
+        """
+        Filas válidas del lote indexadas por (brand, model_name) — si una clave
+        se repite en el lote, gana la última — y cantidad de filas inválidas.
+        """
+        valid, invalid = {}, 0
+        for number, row in enumerate(batch, start=first_row):
+            try:
+                data, stock = self._clean_row(row)
+            except (ValidationError, ValueError, TypeError) as exc:
+                invalid += 1
+                self._report_error(number, exc)
+                continue
+            valid[(data['brand'], data['model_name'])] = (data, stock)
+        return valid, invalid
+
+    @staticmethod
+    def _clean_row(row) -> tuple[dict, int | None]:
+        if isinstance(row, str):
+            row = json.loads(row)
+            if not isinstance(row, dict):
+                raise ValueError('se esperaba un objeto JSON')
+        missing = [name for name in PRODUCT_FIELDS if row.get(name) in (None, '')]
+        if missing:
+            raise ValueError(f'faltan columnas: {", ".join(missing)}')
+
+        data = {}
+        for name in PRODUCT_FIELDS:
+            value = row[name].strip() if isinstance(row[name], str) else row[name]
+            if name == 'os':
+                value = value.lower()
+            data[name] = Product._meta.get_field(name).clean(value, None)
+
+        if row.get('is_active') not in (None, ''):
+            data['is_active'] = str(row['is_active']).strip().lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+        stock = None
+        if row.get('stock') not in (None, ''):
+            stock = int(row['stock'])
+            if stock < 0:
+                raise ValueError('stock negativo')
+        return data, stock
+
+    def _report_error(self, number: int, exc: Exception) -> None:
+        self.errors_reported += 1
+        if self.errors_reported <= MAX_REPORTED_ERRORS:
+            message = '; '.join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+            self.stderr.write(f'  Fila {number} inválida: {message}')
+        elif self.errors_reported == MAX_REPORTED_ERRORS + 1:
+            self.stderr.write('  (más filas inválidas omitidas)')
+
+    # ── Upsert ──────────────────────────────────────────────────────────────
+
+    @transaction.atomic
+    def _import_batch(self, valid: dict[tuple, tuple[dict, int | None]]) -> tuple[int, int]:
+        """Upsert de productos e inventario del lote. Retorna (creados, actualizados)."""
+        if not valid:
+            return 0, 0
+
+        brands = {brand for brand, _ in valid}
+        models = {model for _, model in valid}
+        existing = {
+            (p.brand, p.model_name): p
+            for p in Product.objects.filter(Q(brand__in=brands) & Q(model_name__in=models))
+        }
+
+        to_create, to_update, unchanged, update_fields = [], [], [], set()
+        repriced = []
+        for key, (data, _) in valid.items():
+            product = existing.get(key)
+            if product is None:
+                to_create.append(Product(**data))
+                continue
+            changed = [name for name, value in data.items() if getattr(product, name) != value]
+            for name in changed:
+                setattr(product, name, data[name])
+            update_fields.update(changed)
+            if 'price' in changed:
+                repriced.append(product.pk)
+            (to_update if changed else unchanged).append(product)
+
+        Product.objects.bulk_create(to_create)
+        if to_update:
+            # Lotes acotados: cada lote es un UPDATE con un CASE por campo
+            Product.objects.bulk_update(to_update, sorted(update_fields), batch_size=UPDATE_BATCH_SIZE)
+
+        products = {(p.brand, p.model_name): p for p in [*to_create, *to_update, *unchanged]}
+        changed_ids = {p.pk for p in [*to_create, *to_update]}
+        changed_ids |= self._upsert_inventory(products, valid, new_ids={p.pk for p in to_create})
+
+        # bulk_* no emite señales: se actualiza el read-model en la transacción
+        # del lote y se registra el cambio tras el commit
+        if changed_ids:
+            refresh_entries(changed_ids)
+            transaction.on_commit(partial(record_change, changed_ids))
+        # Los carritos con productos que cambiaron de precio recalculan su total
+        refresh_totals_for_products(repriced)
+        return len(to_create), len(to_update)
+
+    @staticmethod
+    def _upsert_inventory(products: dict, valid: dict, new_ids: set) -> set:
+        """Upsert del stock del lote. Retorna los ids de producto con inventario modificado."""
+        inventories = {
+            inv.product_id: inv
+            for inv in Inventory.objects.filter(product_id__in=[p.pk for p in products.values()])
+        }
+        previous = {pk: (inv.stock_available, inv.stock_reserved) for pk, inv in inventories.items()}
+        to_create, to_update, now = [], [], timezone.now()
+        for key, product in products.items():
+            stock = valid[key][1]
+            inventory = inventories.get(product.pk)
+            if inventory is None:
+                # Todo producto nuevo nace con su inventario (igual que seed_data)
+                if stock is not None or product.pk in new_ids:
+                    to_create.append(Inventory(product=product, stock_available=stock or 0))
+            elif inventory.is_striped:
+                # En modo franjas el stock no se sobrescribe: se ajusta desde el admin
+                continue
+            elif stock is not None and stock != inventory.stock_available:
+                inventory.stock_available = stock
+                inventory.updated_at = now  # bulk_update no aplica auto_now
+                to_update.append(inventory)
+
+        Inventory.objects.bulk_create(to_create)
+        Inventory.objects.bulk_update(to_update, ['stock_available', 'updated_at'], batch_size=UPDATE_BATCH_SIZE)
+        # Libro de movimientos: un ajuste por la diferencia con el stock anterior
+        record_adjustments([
+            (inventory.product_id, previous.get(inventory.product_id, (0, 0)),
+             (inventory.stock_available, inventory.stock_reserved))
+            for inventory in [*to_create, *to_update]
+        ], reference='import')
+        return {inventory.product_id for inventory in [*to_create, *to_update]}
+
+    def _save_checkpoint(self, state: dict) -> None:
+        # Escritura atómica: un fallo a mitad nunca deja un checkpoint corrupto
+        tmp = f'{self.checkpoint_path}.tmp'
+        with open(tmp, 'w') as checkpoint:
+            json.dump(state, checkpoint)
+        os.replace(tmp, self.checkpoint_path)
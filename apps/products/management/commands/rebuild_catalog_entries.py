@@ -0,0 +1,33 @@
+"""
+apps/products/management/commands/rebuild_catalog_entries.py
+
+Reconstruye el read-model CatalogEntry desde Product + Inventory.
+
+Las señales y las escrituras masivas lo mantienen al día; este comando es
+la reconciliación para escrituras que los saltan (SQL manual, .update()
+sobre inventario, restauración de un respaldo).
+
+Uso:
+    python manage.py rebuild_catalog_entries
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.products.catalog_entries import rebuild_all
+from apps.products.changes import record_change
+from apps.products.models import CatalogEntry
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla CatalogEntry (read-model del listado) desde los productos.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            total = rebuild_all()
+            ids = list(CatalogEntry.objects.values_list('id', flat=True))
+            transaction.on_commit(lambda: record_change(ids))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'{total} entradas reconstruidas en {elapsed:.1f}s.'))
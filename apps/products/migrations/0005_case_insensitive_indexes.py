@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 21:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('brand'), models.F('created_at'), models.F('id'), condition=models.Q(('is_active', True)), name='product_active_brand_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('os'), models.F('created_at'), models.F('id'), condition=models.Q(('is_active', True)), name='product_active_os_ci_idx'),
+        ),
+    ]
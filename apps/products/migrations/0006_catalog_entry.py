@@ -0,0 +1,61 @@
+# Generated by Django 6.0.2 on 2026-10-18 22:05
+
+from django.db import migrations, models
+
+
+def backfill_catalog_entries(apps, schema_editor):
+    from apps.products.catalog_entries import BATCH_SIZE, source_rows, entry_fields
+
+    Product = apps.get_model('products', 'Product')
+    CatalogEntry = apps.get_model('products', 'CatalogEntry')
+    batch = []
+    for row in source_rows(Product.objects.order_by('id')).iterator(chunk_size=BATCH_SIZE):
+        batch.append(CatalogEntry(**entry_fields(row)))
+        if len(batch) >= BATCH_SIZE:
+            CatalogEntry.objects.bulk_create(batch)
+            batch = []
+    CatalogEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_case_insensitive_indexes'),
+        # El backfill lee inventory__stock_available
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('brand', models.CharField(max_length=100)),
+                ('brand_key', models.CharField(max_length=100)),
+                ('model_name', models.CharField(max_length=100)),
+                ('display_name', models.CharField(max_length=201)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('image', models.CharField(blank=True, max_length=100)),
+                ('image_variants', models.JSONField(blank=True, null=True)),
+                ('ram_gb', models.PositiveIntegerField()),
+                ('storage_gb', models.PositiveIntegerField()),
+                ('processor', models.CharField(max_length=150)),
+                ('battery_mah', models.PositiveIntegerField()),
+                ('camera_mp', models.PositiveIntegerField()),
+                ('screen_inches', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('os', models.CharField(max_length=20)),
+                ('os_label', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('in_stock', models.BooleanField(default=False)),
+                ('search_text', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Entrada de catálogo',
+                'verbose_name_plural': 'Entradas de catálogo',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at', 'id'], name='catalog_created_idx'), models.Index(fields=['price', 'id'], name='catalog_price_idx'), models.Index(fields=['brand', 'id'], name='catalog_brand_idx'), models.Index(fields=['ram_gb', 'id'], name='catalog_ram_idx'), models.Index(fields=['brand_key', 'created_at', 'id'], name='catalog_brand_key_idx'), models.Index(fields=['os', 'created_at', 'id'], name='catalog_os_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_catalog_entries, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,9 @@ apps/products/models.py
 Principio SRP: Solo representa el dominio de Producto.
 """
 from django.db import models
+from django.db.models.functions import Lower
+
+from .search import Match
 
 
 class Product(models.Model):
@@ -21,6 +24,9 @@ class Product(models.Model):
     is_active    = models.BooleanField(default=True)
     created_at   = models.DateTimeField(auto_now_add=True)
 
+    # Variantes redimensionadas de `image` (ver apps/products/images.py)
+    image_variants = models.JSONField(null=True, blank=True, editable=False)
+
     # Especificaciones técnicas
     ram_gb        = models.PositiveIntegerField(verbose_name='RAM (GB)')
     storage_gb    = models.PositiveIntegerField(verbose_name='Almacenamiento (GB)')
@@ -34,6 +40,19 @@ class Product(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Producto'
         verbose_name_plural = 'Productos'
+        # Un índice (campo, id) por cada orden del catálogo, parcial sobre los
+        # productos activos: sirven el listado y la paginación keyset en ambos
+        # sentidos. (En SQLite `is_active=True` se compila como `WHERE is_active`,
+        # que solo aprovecha índices parciales, no una columna is_active inicial.)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='product_active_created_idx'),
+            models.Index(fields=['price', 'id'],      condition=models.Q(is_active=True), name='product_active_price_idx'),
+            models.Index(fields=['brand', 'id'],      condition=models.Q(is_active=True), name='product_active_brand_idx'),
+            models.Index(fields=['ram_gb', 'id'],     condition=models.Q(is_active=True), name='product_active_ram_idx'),
+            # Filtros sin distinción de mayúsculas (LOWER(campo) = valor) + orden por defecto
+            models.Index(Lower('brand'), 'created_at', 'id', condition=models.Q(is_active=True), name='product_active_brand_ci_idx'),
+            models.Index(Lower('os'), 'created_at', 'id',    condition=models.Q(is_active=True), name='product_active_os_ci_idx'),
+        ]
 
     def __str__(self):
         return f"{self.brand} {self.model_name}"
@@ -56,3 +75,94 @@ class Product(models.Model):
             raise ValueError("El precio debe ser positivo")
         self.price = new_price
         self.save(update_fields=['price'])
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Vista de solo lectura sobre el índice full-text (tabla virtual FTS5).
+
+    No la gestiona Django: la crea la migración 0002 y la mantienen
+    sincronizada los triggers definidos en apps/products/search.py.
+    """
+    product  = models.OneToOneField(
+        Product, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', db_constraint=False, related_name='search_document',
+    )
+    document = models.TextField(db_column='products_product_fts')
+    rank     = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'products_product_fts'
+
+
+ProductSearchDocument._meta.get_field('document').register_lookup(Match)
+
+
+class CatalogChange(models.Model):
+    """
+    Registro de cambios del catálogo (apps/products/changes.py). El id es la
+    versión del catálogo: se guarda en la base de datos para que todos los
+    procesos (workers, comandos, mantenimiento) vean la misma. Las filas
+    antiguas se purgan en run_maintenance; siempre queda la última.
+    """
+    id          = models.BigAutoField(primary_key=True)
+    product_ids = models.JSONField(default=list)
+    created_at  = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Cambio de catálogo'
+        verbose_name_plural = 'Cambios de catálogo'
+
+    def __str__(self):
+        return f'v{self.id}: {len(self.product_ids)} productos'
+
+
+class CatalogEntry(models.Model):
+    """
+    Read-model del catálogo: una fila por producto ACTIVO con todo lo que
+    muestra el listado ya resuelto (nombre, etiqueta de SO, stock, texto de
+    búsqueda). El listado lee solo esta tabla, sin JOIN a inventario ni
+    formateo por fila.
+
+    `id` es el id del producto (sin FK: la tabla es derivada). La mantienen
+    las señales de Product/Inventory dentro de la misma transacción y
+    apps/products/catalog_entries.py en las escrituras masivas.
+    """
+    id             = models.BigIntegerField(primary_key=True)
+    brand          = models.CharField(max_length=100)
+    brand_key      = models.CharField(max_length=100)   # brand en minúscula
+    model_name     = models.CharField(max_length=100)
+    display_name   = models.CharField(max_length=201)   # str(product)
+    price          = models.DecimalField(max_digits=12, decimal_places=2)
+    image          = models.CharField(max_length=100, blank=True)
+    image_variants = models.JSONField(null=True, blank=True)
+    ram_gb         = models.PositiveIntegerField()
+    storage_gb     = models.PositiveIntegerField()
+    processor      = models.CharField(max_length=150)
+    battery_mah    = models.PositiveIntegerField()
+    camera_mp      = models.PositiveIntegerField()
+    screen_inches  = models.DecimalField(max_digits=4, decimal_places=2)
+    os             = models.CharField(max_length=20)    # en minúscula
+    os_label       = models.CharField(max_length=50)    # get_os_display()
+    created_at     = models.DateTimeField()
+    stock          = models.PositiveIntegerField(default=0)
+    in_stock       = models.BooleanField(default=False)
+    search_text    = models.TextField()                 # marca + modelo + procesador normalizados
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Entrada de catálogo'
+        verbose_name_plural = 'Entradas de catálogo'
+        # Solo hay productos activos: los índices no necesitan condición
+        indexes = [
+            models.Index(fields=['created_at', 'id'],              name='catalog_created_idx'),
+            models.Index(fields=['price', 'id'],                   name='catalog_price_idx'),
+            models.Index(fields=['brand', 'id'],                   name='catalog_brand_idx'),
+            models.Index(fields=['ram_gb', 'id'],                  name='catalog_ram_idx'),
+            models.Index(fields=['brand_key', 'created_at', 'id'], name='catalog_brand_key_idx'),
+            models.Index(fields=['os', 'created_at', 'id'],        name='catalog_os_idx'),
+        ]
+
+    def __str__(self):
+        return self.display_name
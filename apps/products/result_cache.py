@@ -0,0 +1,92 @@
+"""
+apps/products/result_cache.py
+
+Caché de resultados del listado del catálogo (por proceso).
+
+Guarda, por conjunto de filtros normalizado, la lista ordenada de ids del
+resultado (el total es su longitud). La clave incluye la versión del
+catálogo: cualquier escritura de Product/Inventory invalida la caché
+completa, así que nunca se sirve un resultado con stock desactualizado.
+
+- LRU acotada a `max_entries` y TTL como límite superior de vida.
+- Protección contra estampidas: si varias peticiones piden la misma clave
+  a la vez, solo una calcula el resultado; las demás esperan y lo reutilizan.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+WAIT_TIMEOUT = 10  # segundos máximos esperando a la petición que calcula
+
+
+class QueryResultCache:
+    """LRU + TTL de listas de ids indexadas por filtros normalizados."""
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries: OrderedDict[str, tuple[float, list | None]] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._version: int | None = None
+
+    def get_or_compute(self, version: int, params: dict, compute):
+        """
+        Ids cacheados para `params` en `version`; si no hay, llama a compute().
+        compute() puede retornar None (resultado no cacheable): también se
+        recuerda, para no recalcularlo en cada petición.
+        """
+        key = json.dumps(params, sort_keys=True)
+
+        while True:
+            with self._lock:
+                if version != self._version:
+                    # Cambió el catálogo: todo lo cacheado quedó obsoleto
+                    self._entries.clear()
+                    self._version = version
+
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+
+                event = self._inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = self._inflight[key] = threading.Event()
+
+            if leader:
+                break
+            event.wait(WAIT_TIMEOUT)
+
+        ids = None
+        try:
+            ids = compute()
+            return ids
+        finally:
+            with self._lock:
+                if version == self._version:
+                    self._entries[key] = (time.monotonic() + self.timeout, ids)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                self._inflight.pop(key, None)
+            event.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: QueryResultCache | None = None
+
+
+def get_result_cache() -> QueryResultCache:
+    """Caché de resultados del proceso (configurada con CATALOG_RESULT_CACHE_*)."""
+    global _cache
+    if _cache is None:
+        _cache = QueryResultCache(settings.CATALOG_RESULT_CACHE_SIZE, settings.CATALOG_RESULT_CACHE_TIMEOUT)
+    return _cache
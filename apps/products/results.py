@@ -0,0 +1,52 @@
+"""
+apps/products/results.py
+
+Resultado de catálogo resuelto como lista ordenada de ids.
+
+Se comporta como un queryset para el paginador (count(), len(), slicing):
+solo la página pedida se consulta en la base de datos, con un único
+`pk__in` que respeta el orden de la lista.
+"""
+
+
+def _row_id(row):
+    return row['id'] if isinstance(row, dict) else row.pk
+
+
+class ProductIdList:
+    """Secuencia ordenada de ids de producto respaldada por un queryset."""
+
+    def __init__(self, ids, queryset):
+        self._ids = ids
+        self._queryset = queryset
+
+    @property
+    def model(self):
+        return self._queryset.model
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            page = self[index:index + 1] if index >= 0 else self[index:][:1]
+            if not page:
+                raise IndexError(index)
+            return page[0]
+
+        page_ids = [int(pk) for pk in self._ids[index]]
+        if not page_ids:
+            return []
+        rows = {_row_id(row): row for row in self._queryset.filter(pk__in=page_ids)}
+        # Un producto puede desaparecer entre el cálculo de ids y la consulta
+        return [rows[pk] for pk in page_ids if pk in rows]
+
+    def values(self, *fields, **expressions) -> 'ProductIdList':
+        """Misma lista de ids, pero las filas se obtienen como dicts."""
+        return ProductIdList(self._ids, self._queryset.values(*fields, **expressions))
@@ -0,0 +1,115 @@
+"""
+apps/products/search.py
+
+Índice full-text del catálogo (SQLite FTS5).
+
+Principio SRP: Solo sabe crear el índice y traducir búsquedas a expresiones MATCH.
+La tabla virtual es "external content": no duplica los datos de products_product,
+y se mantiene sincronizada con triggers de la base de datos en cada
+INSERT/UPDATE/DELETE de Product (incluye bulk_create/bulk_update).
+"""
+import re
+import unicodedata
+
+from django.db import models
+
+
+FTS_TABLE = 'products_product_fts'
+SOURCE_TABLE = 'products_product'
+MAX_TERMS = 8
+
+# Pesos bm25 por columna: model_name, brand, description
+RANK_FUNCTION = 'bm25(10.0, 5.0, 1.0)'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_available: dict[str, bool] = {}
+
+
+class Match(models.Lookup):
+    """Lookup `__match`: compila a `<columna> MATCH <expresión>` (FTS5)."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+def build_match_expression(query: str) -> str:
+    """
+    Convierte el texto del usuario en una expresión FTS5 segura.
+
+    Cada término se cita (sin operadores del usuario) y se busca por prefijo:
+        'galaxy s2' → '"galaxy"* "s2"*'
+    """
+    terms = _TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin tildes y solo letras, dígitos y espacios simples."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return ' '.join(text.split())
+
+
+def is_available(connection) -> bool:
+    """True si la base de datos tiene el índice FTS5 instalado."""
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [FTS_TABLE],
+            )
+            _available[connection.alias] = cursor.fetchone() is not None
+    return _available[connection.alias]
+
+
+def create_index(connection) -> None:
+    """Crea la tabla FTS5 y sus triggers (idempotente) y la reconstruye."""
+    if connection.vendor != 'sqlite':
+        return
+    columns = 'new.id, new.model_name, new.brand, new.description'
+    old_columns = 'old.id, old.model_name, old.brand, old.description'
+    statements = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                model_name, brand, description,
+                content='{SOURCE_TABLE}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {SOURCE_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, model_name, brand, description)
+                VALUES ({columns});
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {SOURCE_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, model_name, brand, description)
+                VALUES ('delete', {old_columns});
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+                AFTER UPDATE OF model_name, brand, description ON {SOURCE_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, model_name, brand, description)
+                VALUES ('delete', {old_columns});
+                INSERT INTO {FTS_TABLE}(rowid, model_name, brand, description)
+                VALUES ({columns});
+            END""",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', '{RANK_FUNCTION}')",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+    _available.pop(connection.alias, None)
+
+
+def drop_index(connection) -> None:
+    """Elimina la tabla FTS5 y sus triggers."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _available.pop(connection.alias, None)
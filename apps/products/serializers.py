@@ -2,18 +2,33 @@
 apps/products/serializers.py
 Principio SRP: Solo serializa/deserializa datos de productos.
 """
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Product
 
 
+def variant_urls(image_variants, request=None) -> dict | None:
+    """{variante: {formato: URL}} a partir de Product.image_variants (None si falló)."""
+    if not image_variants or 'variants' not in image_variants:
+        return None
+    urls = {}
+    for variant, formats in image_variants['variants'].items():
+        urls[variant] = {}
+        for fmt, name in formats.items():
+            url = default_storage.url(name)
+            urls[variant][fmt] = request.build_absolute_uri(url) if request is not None else url
+    return urls
+
+
 class ProductSerializer(serializers.ModelSerializer):
     os_display = serializers.CharField(source='get_os_display', read_only=True)
     stock = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
-            'id', 'brand', 'model_name', 'price', 'description', 'image',
+            'id', 'brand', 'model_name', 'price', 'description', 'image', 'image_variants',
             'ram_gb', 'storage_gb', 'processor', 'battery_mah',
             'camera_mp', 'screen_inches', 'os', 'os_display',
             'is_active', 'created_at', 'stock',
@@ -21,7 +36,67 @@ class ProductSerializer(serializers.ModelSerializer):
 
     def get_stock(self, obj) -> int:
         inventory = getattr(obj, 'inventory', None)
-        return inventory.stock_available if inventory else 0
+        return inventory.available_stock() if inventory else 0
+
+    def get_image_variants(self, obj) -> dict | None:
+        return variant_urls(obj.image_variants, self.context.get('request'))
+
+
+class ProductListSerializer(ProductSerializer):
+    """Forma de cada fila del listado: sin `description`."""
+
+    class Meta(ProductSerializer.Meta):
+        fields = [f for f in ProductSerializer.Meta.fields if f != 'description']
+
+
+# ── Listado rápido ──────────────────────────────────────────────────────────
+# El listado no instancia modelos ni ModelSerializer por fila: proyecta solo
+# estas columnas con .values() (inventario unido en la misma consulta) y
+# formatea cada dict reutilizando los campos DRF de ProductSerializer.
+
+PRODUCT_LIST_VALUES = [
+    'id', 'brand', 'model_name', 'price', 'image', 'image_variants',
+    'ram_gb', 'storage_gb', 'processor', 'battery_mah',
+    'camera_mp', 'screen_inches', 'os', 'is_active', 'created_at',
+]
+
+_price_field    = serializers.DecimalField(max_digits=12, decimal_places=2)
+_screen_field   = serializers.DecimalField(max_digits=4, decimal_places=2)
+_datetime_field = serializers.DateTimeField()
+_os_labels      = dict(Product.OS_CHOICES)
+
+
+def serialize_product_row(row: dict, request=None) -> dict:
+    """Convierte una fila .values() (con `stock`) a la forma de ProductListSerializer."""
+    image = row['image']
+    if image:
+        image = default_storage.url(image)
+        if request is not None:
+            image = request.build_absolute_uri(image)
+    return {
+        'id':            row['id'],
+        'brand':         row['brand'],
+        'model_name':    row['model_name'],
+        'price':         _price_field.to_representation(row['price']),
+        'image':         image or None,
+        'image_variants': variant_urls(row['image_variants'], request),
+        'ram_gb':        row['ram_gb'],
+        'storage_gb':    row['storage_gb'],
+        'processor':     row['processor'],
+        'battery_mah':   row['battery_mah'],
+        'camera_mp':     row['camera_mp'],
+        'screen_inches': _screen_field.to_representation(row['screen_inches']),
+        'os':            row['os'],
+        'os_display':    row.get('os_display') or _os_labels.get(row['os'], row['os']),
+        'is_active':     row['is_active'],
+        'created_at':    _datetime_field.to_representation(row['created_at']),
+        'stock':         row['stock'],
+    }
+
+
+def serialize_product_rows(rows, request=None) -> list[dict]:
+    """serialize_product_row para cada fila."""
+    return [serialize_product_row(row, request) for row in rows]
 
 
 class ProductSpecsSerializer(serializers.Serializer):
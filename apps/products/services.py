@@ -4,7 +4,72 @@ apps/products/services.py
 Principio SRP: Lógica de negocio de productos separada de las vistas.
 Principio DIP: Las vistas dependen de este servicio, no de los modelos directamente.
 """
-from core.builders.product_query_builder import ProductQueryBuilder
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+from core.builders.product_query_builder import CatalogEntryQueryBuilder, ProductQueryBuilder
+from .changes import current_version
+from .facets import count_facets
+from .result_cache import get_result_cache
+from .results import ProductIdList
+
+
+def _present(params, key: str) -> bool:
+    return params.get(key) not in (None, '')
+
+
+def normalize_params(params) -> dict:
+    """
+    Forma canónica de los filtros del catálogo.
+
+    Dos peticiones equivalentes (?brand=Samsung&min_ram=08 y ?min_ram=8&brand=samsung)
+    producen el mismo dict: textos en minúscula, números parseados y los
+    filtros inválidos descartados (igual que los ignora get_filtered_products).
+    """
+    normalized = {}
+
+    for key in ('brand', 'os'):
+        value = (params.get(key) or '').strip()
+        if value:
+            normalized[key] = value.lower()
+
+    if _present(params, 'min_price') and _present(params, 'max_price'):
+        try:
+            normalized['min_price'] = float(params['min_price'])
+            normalized['max_price'] = float(params['max_price'])
+        except (ValueError, TypeError):
+            normalized.pop('min_price', None)
+
+    if _present(params, 'min_ram'):
+        try:
+            normalized['min_ram'] = int(params['min_ram'])
+        except (ValueError, TypeError):
+            pass
+
+    query = ' '.join((params.get('q') or '').lower().split())
+    if query:
+        normalized['q'] = query
+
+    if params.get('in_stock'):
+        normalized['in_stock'] = True
+
+    # Con búsqueda, el orden por defecto es la relevancia del índice full-text
+    normalized['ordering'] = params.get('ordering') or ('relevance' if query else '-created_at')
+
+    return normalized
+
+
+def cache_key(prefix: str, normalized: dict) -> str:
+    """Clave de caché estable para un conjunto de filtros normalizado."""
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    return f'{prefix}:{digest}'
 
 
 class ProductService:
@@ -15,43 +80,162 @@ class ProductService:
 
     def get_filtered_products(self, params: dict):
         """Aplica filtros usando el ProductQueryBuilder."""
-        builder = ProductQueryBuilder()
+        return self._build(ProductQueryBuilder(), normalize_params(params))
 
-        if params.get('brand'):
+    def get_catalog_entries(self, params: dict):
+        """Los mismos filtros sobre el read-model CatalogEntry (CatalogEntryQueryBuilder)."""
+        return self._build(CatalogEntryQueryBuilder(), normalize_params(params))
+
+    def uses_read_model(self, normalized: dict) -> bool:
+        """
+        True si el listado puede servirse desde CatalogEntry: está activado y
+        no hay búsqueda full-text que ordenar por relevancia (esa consulta
+        necesita el índice FTS de Product).
+        """
+        if not settings.CATALOG_READ_MODEL_ENABLED:
+            return False
+        from . import search
+        return 'q' not in normalized or not search.is_available(connection)
+
+    def get_listing_queryset(self, params: dict):
+        """Queryset del listado: read-model si aplica (y el orden es uno permitido), si no Product."""
+        normalized = normalize_params(params)
+        if normalized['ordering'] in ProductQueryBuilder.ALLOWED_ORDERINGS and self.uses_read_model(normalized):
+            return self.get_catalog_entries(normalized)
+        return self.get_filtered_products(normalized)
+
+    @staticmethod
+    def _build(builder: ProductQueryBuilder, params: dict):
+        """Aplica los filtros normalizados y el orden al builder dado."""
+        if 'brand' in params:
             builder.by_brand(params['brand'])
 
-        if params.get('os'):
+        if 'os' in params:
             builder.by_os(params['os'])
 
-        if params.get('min_price') and params.get('max_price'):
-            try:
-                builder.by_price_range(
-                    float(params['min_price']),
-                    float(params['max_price'])
-                )
-            except (ValueError, TypeError):
-                pass
-
-        if params.get('min_ram'):
-            try:
-                builder.by_ram(int(params['min_ram']))
-            except (ValueError, TypeError):
-                pass
-
-        if params.get('q'):
+        if 'min_price' in params:
+            builder.by_price_range(params['min_price'], params['max_price'])
+
+        if 'min_ram' in params:
+            builder.by_ram(params['min_ram'])
+
+        if 'q' in params:
             builder.with_search(params['q'])
 
         if params.get('in_stock'):
             builder.in_stock()
 
-        order = params.get('ordering', '-created_at')
         try:
-            builder.ordered_by(order)
+            builder.ordered_by(params['ordering'])
         except ValueError:
             builder.ordered_by('-created_at')
 
         return builder.build()
 
+    def list_products(self, params: dict):
+        """
+        Listado del catálogo.
+
+        El resultado (ids ordenados) se cachea por combinación de filtros
+        normalizada y versión del catálogo; solo la página pedida se consulta
+        en la base de datos. Si CATALOG_SNAPSHOT_ENABLED está activo y los
+        filtros lo permiten, los ids se resuelven en el snapshot en memoria.
+        Sin búsqueda full-text, ids y filas salen del read-model CatalogEntry.
+        """
+        from .models import CatalogEntry, Product
+
+        normalized = normalize_params(params)
+        if normalized['ordering'] not in ProductQueryBuilder.ALLOWED_ORDERINGS:
+            # Orden libre: lo aplica el OrderingFilter de la vista sobre el queryset
+            return self.get_filtered_products(normalized)
+
+        if settings.CATALOG_RESULT_CACHE_SIZE:
+            ids = get_result_cache().get_or_compute(
+                current_version(), normalized, lambda: self._resolve_ids(normalized),
+            )
+        else:
+            ids = self._snapshot_ids(normalized)
+
+        if ids is None:
+            return self.get_listing_queryset(normalized)
+        if self.uses_read_model(normalized):
+            return ProductIdList(ids, CatalogEntry.objects.all())
+        return ProductIdList(ids, Product.objects.filter(is_active=True))
+
+    def _snapshot_ids(self, normalized: dict):
+        """Ids resueltos en el snapshot, o None si no está activo o no aplica."""
+        if not settings.CATALOG_SNAPSHOT_ENABLED:
+            return None
+        from .snapshot import get_snapshot
+        snapshot = get_snapshot()
+        return snapshot.select(normalized) if snapshot.supports(normalized) else None
+
+    def _resolve_ids(self, normalized: dict):
+        """Ids ordenados del resultado completo; None si supera el máximo cacheable."""
+        limit = settings.CATALOG_RESULT_CACHE_MAX_IDS
+        ids = self._snapshot_ids(normalized)
+        if ids is None:
+            products = self.get_listing_queryset(normalized)
+            ids = tuple(products.values_list('id', flat=True)[:limit + 1])
+        return ids if len(ids) <= limit else None
+
+    def as_list_rows(self, products, *extra_fields):
+        """
+        Proyección del listado: solo las columnas de PRODUCT_LIST_VALUES (más
+        `extra_fields`) y el stock (LEFT JOIN a inventario) como dicts, en una
+        única consulta. Sobre CatalogEntry el stock y la etiqueta del SO ya
+        están en la fila.
+        """
+        from .models import CatalogEntry
+        from .serializers import PRODUCT_LIST_VALUES
+
+        if products.model is CatalogEntry:
+            fields = [name for name in (*PRODUCT_LIST_VALUES, *extra_fields) if name != 'is_active']
+            return products.values(*fields, 'stock', is_active=Value(True), os_display=F('os_label'))
+        return products.values(
+            *PRODUCT_LIST_VALUES, *extra_fields,
+            stock=Coalesce(F('inventory__stock_available'), Value(0)),
+        )
+
+    def get_facets(self, params: dict) -> dict:
+        """
+        Conteos por faceta para el conjunto de filtros actual.
+        Una consulta agregada por combinación de filtros; el resultado se cachea.
+        """
+        normalized = {k: v for k, v in normalize_params(params).items() if k != 'ordering'}
+        # La versión del catálogo en la clave: cualquier cambio invalida los conteos
+        key = cache_key(f'catalog:facets:{current_version()}', normalized)
+
+        result = cache.get(key)
+        if result is None:
+            result = count_facets(self.get_listing_queryset(normalized))
+            cache.set(key, result, settings.CATALOG_FACETS_CACHE_TIMEOUT)
+        return result
+
+    def get_similar_products(self, product_id: int, limit: int) -> ProductIdList:
+        """
+        Productos activos con especificaciones más parecidas a `product_id`,
+        del más al menos parecido (índice de vecinos en memoria).
+        """
+        from .models import Product
+        from .similarity import get_similarity_index
+
+        neighbours = get_similarity_index().nearest([product_id], limit).get(product_id, [])
+        return ProductIdList(neighbours, Product.objects.filter(is_active=True))
+
+    def suggest(self, prefix: str, limit: int) -> tuple[list[dict], tuple[int, datetime]]:
+        """
+        Autocompletado desde el trie en memoria: no consulta la base de datos.
+        Retorna las sugerencias y (versión, fecha) del catálogo con que se
+        construyó el trie, que puede ir detrás de la actual.
+        """
+        from .suggest import get_suggest_index
+        index = get_suggest_index()
+        # Se lee antes de consultar: una reconstrucción concurrente deja
+        # datos más nuevos que la versión, nunca al revés
+        built = (index.version, index.modified)
+        return index.suggest(prefix, limit), built
+
     def compare_products(self, product_ids: list) -> list:
         """Devuelve especificaciones de varios productos para comparar."""
         from .models import Product
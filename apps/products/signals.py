@@ -0,0 +1,42 @@
+"""
+apps/products/signals.py
+
+Mantiene el registro de cambios del catálogo (apps/products/changes.py)
+ante cualquier escritura de Product o Inventory, el read-model CatalogEntry
+(apps/products/catalog_entries.py) en la misma transacción que la escritura,
+y marca pendientes las variantes de imagen (apps/products/images.py) cuando
+cambia la imagen de un producto.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog_entries import refresh_entries
+from .changes import record_change
+from .images import mark_variants_pending
+from .models import Product
+
+
+def _record_after_commit(product_id, using) -> None:
+    # Tras el commit: ningún worker debe recargar datos aún no confirmados
+    transaction.on_commit(partial(record_change, [product_id]), using=using)
+
+
+# Se conecta antes que product_changed: el read-model ya lee las variantes descartadas
+@receiver(post_save, sender=Product)
+def product_image_changed(sender, instance, **kwargs):
+    mark_variants_pending(instance)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, using, **kwargs):
+    refresh_entries([instance.pk])
+    _record_after_commit(instance.pk, using)
+
+
+@receiver([post_save, post_delete], sender='inventory.Inventory')
+def inventory_changed(sender, instance, using, **kwargs):
+    refresh_entries([instance.product_id])
+    _record_after_commit(instance.product_id, using)
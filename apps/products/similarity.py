@@ -0,0 +1,133 @@
+"""
+apps/products/similarity.py
+
+Índice de vecinos más cercanos sobre las especificaciones del catálogo (NumPy).
+
+Cada producto activo es un vector con las especificaciones que expone
+Product.get_specifications: ram_gb, storage_gb, battery_mah, camera_mp,
+screen_inches, price y os (one-hot). Las columnas numéricas se llevan a
+escala logarítmica y se estandarizan (media 0, desviación 1) sobre el
+catálogo completo, para que ninguna domine la distancia por su magnitud.
+
+Las consultas calculan la distancia euclídea contra toda la matriz en
+operaciones vectorizadas; no hay bucles de Python por producto. El índice
+se actualiza de forma incremental con el registro de cambios del catálogo.
+"""
+import numpy as np
+
+from .changes import VersionedIndex
+
+NUMERIC_FEATURES = ('ram_gb', 'storage_gb', 'battery_mah', 'camera_mp', 'screen_inches', 'price')
+OS_VALUES = ('android', 'ios', 'other')
+OS_WEIGHT = 1.0     # peso del SO frente a una desviación estándar de una especificación
+BATCH_ROWS = 256    # consultas por lote en nearest()
+
+_FIELDS = ('id', *NUMERIC_FEATURES, 'os')
+
+
+class SimilarityIndex(VersionedIndex):
+    """
+    Matriz de características normalizada del catálogo activo.
+
+    `_data` = (ids ordenados, características crudas, matriz normalizada); se
+    reemplaza completo en cada actualización para que los lectores nunca vean
+    un estado a medias.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._data: tuple[np.ndarray, np.ndarray, np.ndarray] = self._build(
+            np.empty(0, dtype=np.int64), np.empty((0, len(NUMERIC_FEATURES) + 1)),
+        )
+
+    # ── Carga ───────────────────────────────────────────────────────────────
+
+    def _load(self, product_ids=None) -> tuple[np.ndarray, np.ndarray]:
+        from .models import Product
+        queryset = Product.objects.filter(is_active=True)
+        if product_ids is not None:
+            queryset = queryset.filter(pk__in=product_ids)
+        rows = list(queryset.values_list(*_FIELDS))
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        raw = np.array(
+            [[float(v) for v in row[1:-1]] + [self._os_code(row[-1])] for row in rows],
+            dtype=np.float64,
+        ).reshape(len(rows), len(NUMERIC_FEATURES) + 1)
+        return ids, raw
+
+    @staticmethod
+    def _os_code(value: str) -> int:
+        value = (value or '').lower()
+        return OS_VALUES.index(value) if value in OS_VALUES else OS_VALUES.index('other')
+
+    @staticmethod
+    def _build(ids: np.ndarray, raw: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Ordena por id y normaliza las características crudas."""
+        order = np.argsort(ids, kind='stable')
+        ids, raw = ids[order], raw[order]
+
+        numeric = np.log1p(np.maximum(raw[:, :-1], 0))
+        if len(ids):
+            std = numeric.std(axis=0)
+            numeric = (numeric - numeric.mean(axis=0)) / np.where(std > 0, std, 1)
+        os_onehot = np.eye(len(OS_VALUES))[raw[:, -1].astype(np.int64)] * OS_WEIGHT
+        matrix = np.hstack([numeric, os_onehot]).astype(np.float32)
+        return ids, raw, matrix
+
+    def _rebuild(self) -> None:
+        self._data = self._build(*self._load())
+
+    def _apply_changes(self, product_ids: set) -> None:
+        ids, raw, _ = self._data
+        fresh_ids, fresh_raw = self._load(product_ids)
+        keep = ~np.isin(ids, np.fromiter(product_ids, dtype=np.int64))
+        # La normalización depende de todo el catálogo: se recalcula (vectorizada)
+        self._data = self._build(
+            np.concatenate([ids[keep], fresh_ids]),
+            np.concatenate([raw[keep], fresh_raw]),
+        )
+
+    # ── Consulta ────────────────────────────────────────────────────────────
+
+    def nearest(self, product_ids, k: int) -> dict[int, list[int]]:
+        """
+        Los k productos más parecidos a cada uno de `product_ids` (excluido él
+        mismo), del más al menos parecido. Los ids que no están en el índice
+        (inactivos o inexistentes) se omiten del resultado.
+        """
+        ids, _, matrix = self._data
+        if not len(ids):
+            return {}
+        query_ids = np.asarray(list(product_ids), dtype=np.int64)
+        positions = np.minimum(np.searchsorted(ids, query_ids), len(ids) - 1)
+        found = ids[positions] == query_ids
+        query_ids, positions = query_ids[found], positions[found]
+
+        k = min(k, len(ids) - 1)
+        if k <= 0:
+            return {int(pk): [] for pk in query_ids}
+
+        squared_norms = (matrix * matrix).sum(axis=1)
+        result = {}
+        for start in range(0, len(positions), BATCH_ROWS):
+            batch = positions[start:start + BATCH_ROWS]
+            # ‖a − b‖² = ‖a‖² + ‖b‖² − 2·a·b para todo el lote en una multiplicación
+            distances = squared_norms[batch, None] + squared_norms[None, :] - 2 * (matrix[batch] @ matrix.T)
+            distances[np.arange(len(batch)), batch] = np.inf
+            candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+            # Desempate por id para un orden estable
+            order = np.lexsort((ids[candidates], candidate_distances))
+            ranked = np.take_along_axis(candidates, order, axis=1)
+            for position, neighbours in zip(batch, ranked):
+                result[int(ids[position])] = ids[neighbours].tolist()
+        return result
+
+
+_index = SimilarityIndex()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Índice del proceso, sincronizado con la versión actual del catálogo."""
+    return _index.refresh()
@@ -0,0 +1,149 @@
+"""
+apps/products/snapshot.py
+
+Snapshot columnar del catálogo en memoria (NumPy), uno por worker.
+
+Los filtros by_brand, by_os, by_price_range, by_ram e in_stock y los órdenes
+permitidos por ProductQueryBuilder se evalúan con máscaras vectorizadas y
+argsort sobre columnas numéricas; la base de datos solo se consulta para
+traer la página de productos pedida.
+
+El snapshot se invalida de forma incremental con el registro de cambios
+del catálogo: solo se recargan las filas de los productos modificados.
+"""
+from datetime import timezone
+
+import numpy as np
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+from .changes import VersionedIndex
+
+# Órdenes soportados → (columna, descendente)
+ORDERINGS = {
+    'price':       ('price', False),
+    '-price':      ('price', True),
+    'created_at':  ('created_at', False),
+    '-created_at': ('created_at', True),
+    'brand':       ('brand_rank', False),
+    'ram_gb':      ('ram_gb', False),
+}
+SUPPORTED_FILTERS = {'brand', 'os', 'min_price', 'max_price', 'min_ram', 'in_stock', 'ordering'}
+
+_FIELDS = ('id', 'price', 'ram_gb', 'storage_gb', 'os', 'brand', 'created_at', 'stock')
+
+
+def _timestamp(value) -> int:
+    return int(value.astimezone(timezone.utc).timestamp() * 1_000_000)
+
+
+class CatalogSnapshot(VersionedIndex):
+    """
+    Columnas del catálogo activo:
+    id, price, ram_gb, storage_gb, os (código), brand (código en minúscula),
+    brand_rank (orden alfabético), stock y created_at (µs desde epoch).
+    """
+
+    def __init__(self):
+        super().__init__()
+        # (columnas, códigos de marca, códigos de SO): se reemplaza completo en
+        # cada actualización para que los lectores nunca vean un estado a medias
+        self._data: tuple[dict, dict, dict] = ({}, {}, {})
+        self._brands: list[str] = []
+
+    # ── Carga ───────────────────────────────────────────────────────────────
+
+    def _load_rows(self, product_ids=None) -> list[tuple]:
+        from .models import Product
+        queryset = Product.objects.filter(is_active=True)
+        if product_ids is not None:
+            queryset = queryset.filter(pk__in=product_ids)
+        return list(queryset
+            .annotate(stock=Coalesce(F('inventory__stock_available'), Value(0)))
+            .values_list(*_FIELDS)
+        )
+
+    def _to_columns(self, rows: list[tuple], brand_codes: dict, os_codes: dict) -> dict[str, np.ndarray]:
+        ids, prices, ram, storage, oses, brands, created, stock = zip(*rows) if rows else ([],) * 8
+        return {
+            'id':         np.array(ids, dtype=np.int64),
+            'price':      np.array([float(p) for p in prices], dtype=np.float64),
+            'ram_gb':     np.array(ram, dtype=np.int64),
+            'storage_gb': np.array(storage, dtype=np.int64),
+            'os':         np.array([os_codes[o.lower()] for o in oses], dtype=np.int32),
+            'brand':      np.array([brand_codes[b.lower()] for b in brands], dtype=np.int32),
+            'brand_rank': self._brand_ranks(brands),
+            'created_at': np.array([_timestamp(c) for c in created], dtype=np.int64),
+            'stock':      np.array(stock, dtype=np.int64),
+        }
+
+    def _brand_ranks(self, brands) -> np.ndarray:
+        ranks = {brand: rank for rank, brand in enumerate(self._brands)}
+        return np.array([ranks[b] for b in brands], dtype=np.int32)
+
+    def _rebuild(self) -> None:
+        rows = self._load_rows()
+        self._brands = sorted({row[5] for row in rows})
+        brand_codes = {b: i for i, b in enumerate(sorted({b.lower() for b in self._brands}))}
+        os_codes = {o: i for i, o in enumerate(sorted({row[4].lower() for row in rows}))}
+        self._data = (self._to_columns(rows, brand_codes, os_codes), brand_codes, os_codes)
+
+    def _apply_changes(self, product_ids: set) -> None:
+        rows = self._load_rows(product_ids)
+        columns, brand_codes, os_codes = self._data
+        known_brands = set(self._brands)
+        if any(row[5] not in known_brands or row[4].lower() not in os_codes for row in rows):
+            # Marca o SO nuevos: los códigos cambian, se reconstruye todo
+            self._rebuild()
+            return
+
+        keep = ~np.isin(columns['id'], np.fromiter(product_ids, dtype=np.int64))
+        fresh = self._to_columns(rows, brand_codes, os_codes)
+        merged = {
+            name: np.concatenate([column[keep], fresh[name]])
+            for name, column in columns.items()
+        }
+        self._data = (merged, brand_codes, os_codes)
+
+    # ── Consulta ────────────────────────────────────────────────────────────
+
+    def supports(self, params: dict) -> bool:
+        return set(params) <= SUPPORTED_FILTERS and params.get('ordering') in ORDERINGS
+
+    def select(self, params: dict) -> np.ndarray:
+        """Ids de los productos que cumplen los filtros, en el orden pedido."""
+        columns, brand_codes, os_codes = self._data
+        mask = np.ones(len(columns['id']), dtype=bool)
+
+        if 'brand' in params:
+            code = brand_codes.get(params['brand'].lower())
+            mask &= columns['brand'] == (-1 if code is None else code)
+
+        if 'os' in params:
+            code = os_codes.get(params['os'].lower())
+            mask &= columns['os'] == (-1 if code is None else code)
+
+        if 'min_price' in params:
+            mask &= (columns['price'] >= params['min_price']) & (columns['price'] <= params['max_price'])
+
+        if 'min_ram' in params:
+            mask &= columns['ram_gb'] >= params['min_ram']
+
+        if params.get('in_stock'):
+            mask &= columns['stock'] > 0
+
+        selected = np.flatnonzero(mask)
+        field, descending = ORDERINGS[params['ordering']]
+        key = columns[field][selected]
+        ids = columns['id'][selected]
+        # Desempate por id en la misma dirección que el campo
+        order = np.lexsort((-ids, -key) if descending else (ids, key))
+        return ids[order]
+
+
+_snapshot = CatalogSnapshot()
+
+
+def get_snapshot() -> CatalogSnapshot:
+    """Snapshot del proceso, sincronizado con la versión actual del catálogo."""
+    return _snapshot.refresh()
@@ -0,0 +1,175 @@
+"""
+apps/products/suggest.py
+
+Autocompletado del buscador: trie en memoria (por proceso) sobre marca y
+modelo, tolerante a errores de tipeo.
+
+Cada sugerencia ("Samsung Galaxy S24 Ultra") se indexa por el inicio de
+cada una de sus palabras ("samsung galaxy...", "galaxy s24...", "s24
+ultra", "ultra"), así que "s24" o "galaxy" también la encuentran. Cada nodo
+guarda las TOP_K sugerencias más populares (unidades vendidas) de su
+subárbol: un prefijo exacto se responde recorriendo len(prefijo) nodos.
+Con errores de tipeo se recorre el trie con la matriz de Levenshtein,
+podando las ramas que ya superan la distancia permitida.
+
+El índice se reconstruye completo y de forma perezosa cuando cambia la
+versión del catálogo; nunca más de una vez cada
+CATALOG_SUGGEST_REBUILD_INTERVAL segundos (los cambios de stock de cada
+venta no fuerzan una reconstrucción por petición).
+"""
+import time
+
+from django.conf import settings
+
+from .changes import VersionedIndex
+from .search import normalize_text
+
+TOP_K = 10            # sugerencias guardadas por nodo (límite máximo de resultados)
+MAX_KEY_LENGTH = 32   # caracteres indexados desde el inicio de cada palabra
+
+
+def max_edits(prefix: str) -> int:
+    """Errores de tipeo tolerados según el largo del prefijo."""
+    if len(prefix) < 3:
+        return 0
+    return 1 if len(prefix) < 6 else 2
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children: dict[str, '_Node'] = {}
+        self.top: list[int] = []   # índices de sugerencia, de más a menos popular
+
+
+class SuggestIndex(VersionedIndex):
+    """Trie de sugerencias (marca + modelo) con el top por popularidad en cada nodo."""
+
+    def __init__(self):
+        super().__init__()
+        # (raíz, sugerencias): se reemplaza completo en cada reconstrucción
+        self._data: tuple[_Node, list[dict]] = (_Node(), [])
+        self._built_at = 0.0
+
+    def refresh(self) -> 'SuggestIndex':
+        if self.version is not None and time.monotonic() - self._built_at < settings.CATALOG_SUGGEST_REBUILD_INTERVAL:
+            return self
+        return super().refresh()
+
+    # ── Construcción ────────────────────────────────────────────────────────
+
+    def _load(self) -> list[dict]:
+        """Una sugerencia por marca + modelo (el producto más vendido de ese nombre)."""
+        from apps.orders.models import OrderItem, Purchase
+        from django.db.models import Sum
+
+        from .models import Product
+
+        sold: dict[int, int] = {}
+        for model, exclude in ((OrderItem, {'order__status': 'cancelled'}), (Purchase, {'status': 'rejected'})):
+            rows = model.objects.exclude(**exclude).values('product_id').annotate(units=Sum('quantity'))
+            for row in rows:
+                sold[row['product_id']] = sold.get(row['product_id'], 0) + row['units']
+
+        suggestions: dict[str, dict] = {}
+        for pk, brand, model_name in Product.objects.filter(is_active=True).values_list('id', 'brand', 'model_name'):
+            text = f'{brand} {model_name}'
+            key = normalize_text(text)
+            popularity = sold.get(pk, 0)
+            current = suggestions.get(key)
+            if current is None:
+                suggestions[key] = {'id': pk, 'text': text, 'brand': brand, 'model_name': model_name,
+                                    'popularity': popularity, 'key': key}
+            else:
+                current['popularity'] += popularity
+                if popularity > sold.get(current['id'], 0):
+                    current['id'] = pk
+        # Más populares primero; a igual popularidad, orden alfabético
+        return sorted(suggestions.values(), key=lambda s: (-s['popularity'], s['key']))
+
+    def _rebuild(self) -> None:
+        suggestions = self._load()
+        root = _Node()
+        for index, suggestion in enumerate(suggestions):
+            words = suggestion.pop('key').split(' ')
+            for start in range(len(words)):
+                key = ' '.join(words[start:])[:MAX_KEY_LENGTH]
+                node = root
+                for char in key:
+                    node = node.children.setdefault(char, _Node())
+                    # Se inserta en orden de popularidad: el top de cada nodo
+                    # queda ordenado sin pasos extra
+                    if len(node.top) < TOP_K and (not node.top or node.top[-1] != index):
+                        node.top.append(index)
+        self._data = (root, suggestions)
+        self._built_at = time.monotonic()
+
+    # ── Consulta ────────────────────────────────────────────────────────────
+
+    def suggest(self, prefix: str, limit: int = TOP_K) -> list[dict]:
+        """Sugerencias para `prefix`: primero las exactas, luego por distancia y popularidad."""
+        root, suggestions = self._data
+        prefix = normalize_text(prefix)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+
+        best: dict[int, int] = {}   # sugerencia → menor distancia encontrada
+        for node, distance in self._matches(root, prefix, max_edits(prefix)):
+            for index in node.top:
+                if distance < best.get(index, distance + 1):
+                    best[index] = distance
+            if distance == 0 and len(best) >= limit:
+                break  # las exactas llenan el límite: las aproximadas irían después
+
+        # El índice de sugerencia ya refleja la popularidad (0 = más popular)
+        ranked = sorted(best, key=lambda index: (best[index], index))[:limit]
+        return [
+            {key: suggestions[index][key] for key in ('id', 'text', 'brand', 'model_name')}
+            for index in ranked
+        ]
+
+    @staticmethod
+    def _matches(root: _Node, prefix: str, budget: int):
+        """
+        Nodos cuyo camino desde la raíz está a ≤ `budget` ediciones de `prefix`
+        (distancia de Levenshtein), primero la coincidencia exacta. No se
+        desciende bajo un nodo que ya coincide: su top cubre el subárbol.
+        Con errores se exige la primera letra correcta (los errores de tipeo
+        casi nunca están ahí), lo que poda la mayor parte del trie.
+        """
+        node = root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            yield node, 0
+
+        start = root.children.get(prefix[0])
+        if budget == 0 or start is None:
+            return
+
+        # Fila de Levenshtein del camino de un carácter (prefix[0]) contra el prefijo
+        first_row = [1] + [column - 1 for column in range(1, len(prefix) + 1)]
+        stack = [(child, char, first_row) for char, child in start.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for column in range(1, len(prefix) + 1):
+                cost = 0 if prefix[column - 1] == char else 1
+                row.append(min(row[column - 1] + 1, previous[column] + 1, previous[column - 1] + cost))
+
+            if row[-1] <= budget:
+                if row[-1] > 0:  # la exacta ya se entregó arriba
+                    yield node, row[-1]
+            elif min(row) <= budget:
+                stack.extend((child, next_char, row) for next_char, child in node.children.items())
+
+
+_index = SuggestIndex()
+
+
+def get_suggest_index() -> SuggestIndex:
+    """Índice del proceso, sincronizado (de forma perezosa) con el catálogo."""
+    return _index.refresh()
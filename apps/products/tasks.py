@@ -0,0 +1,55 @@
+"""
+apps/products/tasks.py
+
+Tareas periódicas del catálogo (ver core/scheduler.py):
+
+- purga del registro de cambios (CatalogChange) con más de
+  CATALOG_CHANGES_RETENTION segundos. La última fila se conserva siempre:
+  es la versión actual del catálogo;
+- variantes de imagen de los productos pendientes (imagen nueva o
+  cambiada), fuera de las peticiones web.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.purge import DEFAULT_BATCH_SIZE, delete_in_batches, summarize
+from core.scheduler import register
+
+from .images import build_pending_variants, pending_images
+from .models import CatalogChange
+
+logger = logging.getLogger(__name__)
+
+
+def expired_changes(now=None):
+    """Cambios fuera de la retención, los más antiguos primero (clave primaria)."""
+    latest = CatalogChange.objects.order_by('-id').values_list('id', flat=True).first()
+    if latest is None:
+        return CatalogChange.objects.none()
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.CATALOG_CHANGES_RETENTION)
+    return CatalogChange.objects.filter(id__lt=latest, created_at__lt=cutoff).order_by('id')
+
+
+def purge_catalog_changes(now=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Genera un PurgeBatch por lote de cambios borrado."""
+    return delete_in_batches(expired_changes(now), batch_size)
+
+
+@register('purge-catalog-changes', interval=lambda: settings.MAINTENANCE_PURGE_INTERVAL)
+def purge_catalog_changes_task():
+    return summarize(purge_catalog_changes())
+
+
+@register('build-image-variants', interval=lambda: settings.PRODUCT_IMAGE_BUILD_INTERVAL)
+def build_image_variants_task():
+    done = failed = 0
+    for image, result in build_pending_variants(pending_images()):
+        if isinstance(result, Exception):
+            failed += 1
+            logger.error('No se pudieron generar las variantes de %s: %s', image, result)
+        else:
+            done += 1
+    return done, failed
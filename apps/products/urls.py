@@ -10,3 +10,4 @@ urlpatterns = router.urls
 #   GET /api/v1/products/{id}/         → detalle
 #   GET /api/v1/products/{id}/specs/   → especificaciones
 #   GET /api/v1/products/compare/      → comparar modelos
+#   GET /api/v1/products/facets/       → conteos por faceta
@@ -3,17 +3,43 @@ apps/products/views.py
 
 Principio SRP: Las vistas solo manejan HTTP. Delegan en ProductService.
 """
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from core.pagination import KeysetModePagination, wants_keyset
+
+from .changes import catalog_conditional, with_version_validators
+from .export import EXPORT_FORMATS, stream_export
+from .suggest import TOP_K as SUGGEST_MAX_LIMIT
 from .models import Product
-from .serializers import ProductSerializer, ProductSpecsSerializer
+from .serializers import (
+    ProductSerializer, ProductListSerializer, ProductSpecsSerializer, serialize_product_rows,
+)
+from .results import ProductIdList
 from .services import ProductService
 
 
+CATALOG_FILTER_PARAMETERS = [
+    OpenApiParameter('q',         str,   description='Búsqueda full-text por prefijo (nombre/marca/descripción)'),
+    OpenApiParameter('brand',     str,   description='Filtrar por marca'),
+    OpenApiParameter('os',        str,   description='android | ios'),
+    OpenApiParameter('min_price', float, description='Precio mínimo'),
+    OpenApiParameter('max_price', float, description='Precio máximo'),
+    OpenApiParameter('min_ram',   int,   description='RAM mínima en GB'),
+    OpenApiParameter('in_stock',  bool,  description='Solo productos disponibles'),
+]
+
+SIMILAR_DEFAULT_LIMIT = 6
+SIMILAR_MAX_LIMIT = 24
+SUGGEST_DEFAULT_LIMIT = 8
+
+
+@method_decorator(catalog_conditional, name='dispatch')
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet de productos — solo lectura (catálogo público).
@@ -21,28 +47,53 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     list:   GET /api/v1/products/          — Listado con filtros
     detail: GET /api/v1/products/{id}/     — Detalle
     specs:  GET /api/v1/products/{id}/specs/ — Especificaciones técnicas
+    similar:GET /api/v1/products/{id}/similar/ — Productos parecidos
     compare:GET /api/v1/products/compare/  — Comparar modelos
+    facets: GET /api/v1/products/facets/   — Conteos por faceta
+    suggest:GET /api/v1/products/suggest/  — Autocompletado (sin consultar la base de datos)
+    export: GET /api/v1/products/export/   — Catálogo completo en streaming (NDJSON/CSV)
+
+    Todas las respuestas llevan ETag/Last-Modified de la versión del catálogo
+    (suggest, la versión con que se construyó el trie) y responden 304 a un
+    If-None-Match vigente.
     """
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetModePagination
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.service = ProductService()  # DIP: depende del servicio, no del ORM
 
     @extend_schema(parameters=[
-        OpenApiParameter('q',         str,   description='Búsqueda por nombre/marca'),
-        OpenApiParameter('brand',     str,   description='Filtrar por marca'),
-        OpenApiParameter('os',        str,   description='android | ios'),
-        OpenApiParameter('min_price', float, description='Precio mínimo'),
-        OpenApiParameter('max_price', float, description='Precio máximo'),
-        OpenApiParameter('min_ram',   int,   description='RAM mínima en GB'),
-        OpenApiParameter('in_stock',  bool,  description='Solo productos disponibles'),
-        OpenApiParameter('ordering',  str,   description='price | -price | created_at | ram_gb'),
+        *CATALOG_FILTER_PARAMETERS,
+        OpenApiParameter('ordering',  str,   description='price | -price | created_at | ram_gb | relevance'),
     ])
     def get_queryset(self):
+        if self.action == 'list':
+            if wants_keyset(self.request):
+                return self.service.get_listing_queryset(self.request.query_params)
+            return self.service.list_products(self.request.query_params)
         return self.service.get_filtered_products(self.request.query_params)
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ProductListSerializer
+        return ProductSerializer
+
+    def list(self, request, *args, **kwargs):
+        """Listado: filas .values() con inventario unido, sin serializar modelos."""
+        rows = self.service.as_list_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_product_rows(page, request))
+        return Response(serialize_product_rows(rows, request))
+
+    def filter_queryset(self, queryset):
+        if isinstance(queryset, ProductIdList):
+            return queryset  # filtros y orden ya resueltos por el servicio
+        return super().filter_queryset(queryset)
+
     @extend_schema(responses=ProductSpecsSerializer)
     @action(detail=True, methods=['get'], url_path='specs')
     def specs(self, request, pk=None):
@@ -54,6 +105,24 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             'specifications': product.get_specifications(),
         })
 
+    @extend_schema(
+        parameters=[OpenApiParameter('limit', int, description=f'Cantidad de resultados (máx. {SIMILAR_MAX_LIMIT})')],
+        responses=ProductListSerializer(many=True),
+    )
+    @action(detail=True, methods=['get'], url_path='similar')
+    def similar(self, request, pk=None):
+        """GET /api/v1/products/{id}/similar/?limit=6 — Productos con especificaciones parecidas."""
+        product = self.get_object()
+        try:
+            limit = int(request.query_params.get('limit', SIMILAR_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, SIMILAR_MAX_LIMIT))
+
+        similar = self.service.get_similar_products(product.pk, limit)
+        rows = self.service.as_list_rows(similar)[:]
+        return Response(serialize_product_rows(rows, request))
+
     @extend_schema(parameters=[
         OpenApiParameter('ids', str, description='IDs separados por coma: 1,2,3')
     ])
@@ -71,3 +140,43 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
 
         comparison = self.service.compare_products(product_ids)
         return Response(comparison)
+
+    @extend_schema(parameters=CATALOG_FILTER_PARAMETERS)
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """GET /api/v1/products/facets/?brand=Samsung — Conteos por faceta para los filtros dados."""
+        return Response(self.service.get_facets(request.query_params))
+
+    @extend_schema(parameters=[
+        OpenApiParameter('prefix', str, description='Texto escrito en el buscador'),
+        OpenApiParameter('limit',  int, description=f'Cantidad de sugerencias (máx. {SUGGEST_MAX_LIMIT})'),
+    ])
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        """GET /api/v1/products/suggest/?prefix=galx — Sugerencias de marca/modelo tolerantes a errores."""
+        try:
+            limit = int(request.query_params.get('limit', SUGGEST_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+        suggestions, (version, modified) = self.service.suggest(request.query_params.get('prefix', ''), limit)
+        # El trie se reconstruye con retraso: validadores de la versión con que se construyó
+        return with_version_validators(Response(suggestions), request, version, modified)
+
+    @extend_schema(
+        parameters=[OpenApiParameter('fmt', str, enum=[*EXPORT_FORMATS], description='ndjson (por defecto) | csv')],
+        responses={(200, media_type): str for media_type in EXPORT_FORMATS.values()},
+    )
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        GET /api/v1/products/export/?fmt=ndjson|csv — Catálogo activo completo
+        con stock, en streaming (sin paginación ni COUNT).
+        """
+        fmt = request.query_params.get('fmt', 'ndjson')
+        if fmt not in EXPORT_FORMATS:
+            return Response({'error': 'fmt debe ser ndjson o csv'}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(stream_export(fmt, request), content_type=EXPORT_FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="cellhub-catalog.{fmt}"'
+        return response
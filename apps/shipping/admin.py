@@ -5,5 +5,5 @@ from .models import Address
 @admin.register(Address)
 class AddressAdmin(admin.ModelAdmin):
     list_display  = ['user', 'full_name', 'city', 'department', 'street', 'is_default']
-    list_filter   = ['city', 'department', 'is_default']
+    list_filter   = ['city', 'department', 'is_default', 'is_provisional']
     search_fields = ['user__username', 'full_name', 'city', 'street']
@@ -13,9 +13,17 @@ class Address(models.Model):
     phone       = models.CharField(max_length=20, verbose_name='Teléfono de contacto')
     is_default  = models.BooleanField(default=False)
 
+    # Dirección creada por el checkout rápido: si ninguna orden la usa, la
+    # purga la elimina (apps/shipping/tasks.py)
+    is_provisional = models.BooleanField(default=False, editable=False)
+    created_at     = models.DateTimeField(auto_now_add=True)
+
     class Meta:
         verbose_name = 'Dirección'
         verbose_name_plural = 'Direcciones'
+        indexes = [
+            models.Index(fields=['is_provisional', 'created_at'], name='address_provisional_idx'),
+        ]
 
     def __str__(self):
         return f"{self.street}, {self.neighborhood}, {self.city}"
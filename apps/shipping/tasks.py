@@ -0,0 +1,40 @@
+"""
+apps/shipping/tasks.py
+
+Tareas periódicas de envíos (ver core/scheduler.py): purga de direcciones
+provisionales (las crea el checkout rápido) que ninguna orden usa, con más
+de ADDRESS_PROVISIONAL_RETENTION_HOURS horas de antigüedad. La antigüedad
+mínima protege a los checkouts en curso, que crean la dirección antes que
+la orden.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.purge import DEFAULT_BATCH_SIZE, delete_in_batches, summarize
+from core.scheduler import register
+
+from .models import Address
+
+
+def orphaned_provisional_addresses(now=None):
+    """Direcciones provisionales sin orden, las más antiguas primero (índice address_provisional_idx)."""
+    from apps.orders.models import Order
+
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.ADDRESS_PROVISIONAL_RETENTION_HOURS)
+    return (Address.objects
+            .filter(is_provisional=True, created_at__lt=cutoff)
+            .filter(~Exists(Order.objects.filter(shipping_address=OuterRef('pk'))))
+            .order_by('created_at'))
+
+
+def purge_provisional_addresses(now=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Genera un PurgeBatch por lote de direcciones borrado."""
+    return delete_in_batches(orphaned_provisional_addresses(now), batch_size)
+
+
+@register('purge-provisional-addresses', interval=lambda: settings.MAINTENANCE_PURGE_INTERVAL)
+def purge_provisional_addresses_task():
+    return summarize(purge_provisional_addresses())
@@ -8,7 +8,10 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
+
+from apps.cart.anonymous import merge_request_cart
 from .serializers import RegisterSerializer, UserProfileSerializer
 
 
@@ -37,5 +40,19 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
 
 class LoginView(TokenObtainPairView):
-    """POST /api/v1/users/login/ — Login, devuelve access + refresh JWT."""
+    """
+    POST /api/v1/users/login/ — Login, devuelve access + refresh JWT.
+    Si la petición trae un carrito anónimo, se fusiona con el del usuario.
+    """
     permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        response = Response(serializer.validated_data, status=status.HTTP_200_OK)
+        merge_request_cart(request, serializer.user, response)
+        return response
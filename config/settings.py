@@ -4,6 +4,8 @@ CellHub - Configuración Django
 from pathlib import Path
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-cellhub-change-this-in-production-123456'
@@ -74,6 +76,14 @@ DATABASES = {
     }
 }
 
+# Caché (memoria local en desarrollo; en producción usar Redis/Memcached)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cellhub',
+    }
+}
+
 # Modelo de usuario personalizado
 AUTH_USER_MODEL = 'users.User'
 
@@ -108,14 +118,62 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
 }
 
+# Catálogo
+CATALOG_FACETS_CACHE_TIMEOUT = 60  # segundos
+# Registro de cambios (versión del catálogo en la base de datos): retención
+# de los cambios que los índices en memoria pueden reproducir
+CATALOG_CHANGES_RETENTION = 60 * 60  # segundos
+# Snapshot columnar en memoria (NumPy) para filtrar/ordenar el listado sin SQL
+CATALOG_SNAPSHOT_ENABLED = False
+# Caché de resultados del listado (ids por combinación de filtros, por proceso)
+CATALOG_RESULT_CACHE_SIZE = 256        # entradas (0 la desactiva)
+CATALOG_RESULT_CACHE_TIMEOUT = 300     # segundos
+CATALOG_RESULT_CACHE_MAX_IDS = 5000    # resultados más grandes no se cachean
+# Exportación en streaming: filas leídas por bloque del cursor
+CATALOG_EXPORT_CHUNK_SIZE = 2000
+# Autocompletado: intervalo mínimo entre reconstrucciones del trie (segundos)
+CATALOG_SUGGEST_REBUILD_INTERVAL = 30
+# Listado servido desde el read-model CatalogEntry (sin JOIN ni formateo por fila)
+CATALOG_READ_MODEL_ENABLED = True
+# Consulta de stock por lotes: máximo de ids por petición y TTL de la caché por producto
+INVENTORY_STOCK_BATCH_MAX_IDS = 500
+INVENTORY_STOCK_CACHE_TIMEOUT = 5  # segundos
+# Inventario por franjas (productos muy demandados, se activa desde el admin)
+INVENTORY_STRIPE_COUNT = 8
+INVENTORY_STRIPE_SYNC_INTERVAL = 2  # segundos entre copias de la suma a Inventory
+# Órdenes pendientes: vigencia de la reserva de stock hasta que llegue el pago
+ORDER_RESERVATION_TIMEOUT = 30 * 60  # segundos
+# Carrito anónimo (contenido en un token firmado): vigencia y máximo de productos distintos
+ANONYMOUS_CART_TIMEOUT = 7 * 24 * 60 * 60  # segundos
+ANONYMOUS_CART_MAX_ITEMS = 50
+# Cambios del carrito por lotes: máximo de operaciones por petición
+CART_BATCH_MAX_OPERATIONS = 100
+# Eliminaciones recordadas por carrito para las respuestas ?since=<versión>
+CART_REMOVALS_LOG_SIZE = 100
+# Purga (purge_stale_data / run_maintenance): carritos sin actividad y
+# direcciones provisionales del checkout rápido que ninguna orden usa
+CART_STALE_AFTER_DAYS = 30
+ADDRESS_PROVISIONAL_RETENTION_HOURS = 24
+MAINTENANCE_PURGE_INTERVAL = 60 * 60  # segundos entre purgas de run_maintenance
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'x-cart-token')  # token del carrito anónimo
 
 # Archivos estáticos y media
 STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Variantes de imagen de producto: nombre → lado máximo en píxeles
+PRODUCT_IMAGE_VARIANTS = {
+    'thumb':  160,
+    'card':   480,
+    'detail': 1080,
+}
+PRODUCT_IMAGE_WORKERS = None  # procesos del pool (None = núcleos disponibles)
+PRODUCT_IMAGE_BUILD_INTERVAL = 60  # segundos entre pasadas de build-image-variants (run_maintenance)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LANGUAGE_CODE = 'es-co'
@@ -77,6 +77,13 @@ class OrderBuilder:
         Si falla la reserva, la orden NO se crea.
         """
         # Import aquí para evitar importaciones circulares
+        from datetime import timedelta
+
+        from django.conf import settings
+        from django.db import transaction
+        from django.utils import timezone
+
+        from apps.inventory.services import InsufficientStock, StockReservationService, merge_quantities
         from apps.orders.models import Order, OrderItem
 
         self._validate()
@@ -86,30 +93,36 @@ class OrderBuilder:
             for item in self._items
         )
 
-        # Primero: Intentar reservar stock para todos los items
-        # Si falla cualquiera, levantamos error ANTES de crear la orden
-        for item_data in self._items:
-            product = item_data['product']
-            quantity = item_data['quantity']
+        # Reserva, orden e items son una sola transacción: si falla cualquier
+        # paso, ni el stock ni la orden quedan a medias. El número de
+        # sentencias no crece con las líneas: un INSERT de la orden, la
+        # reserva (un UPDATE por lotes, ver apps/inventory/services.py) y un
+        # INSERT de todos los items
+        with transaction.atomic():
+            # Primero: Crear la orden
+            order = Order.objects.create(
+                user=self._user,
+                shipping_address=self._shipping_address,
+                payment_method=self._payment_method,
+                total=total,
+                notes=self._notes,
+                status='pending',
+                # Si el pago no llega a tiempo, release_expired_reservations
+                # cancela la orden y devuelve el stock
+                reservation_expires_at=timezone.now() + timedelta(seconds=settings.ORDER_RESERVATION_TIMEOUT),
+            )
+
+            # Segundo: reservar stock para todos los items. Si falla
+            # cualquiera, se revierte todo, también la orden
+            products = {item['product'].pk: item['product'] for item in self._items}
+            quantities = merge_quantities((item['product'].pk, item['quantity']) for item in self._items)
             try:
-                product.inventory.reserve_stock(quantity)
-            except ValueError as e:
+                StockReservationService().reserve(quantities, reference=f'order:{order.pk}')
+            except InsufficientStock as e:
+                product = products[e.product_id]
                 raise ValueError(f"No hay stock para {product.brand} {product.model_name}: {str(e)}")
-            except Exception as e:
-                raise ValueError(f"Error al reservar stock de {product.brand}: {str(e)}")
-
-        # Segundo: Crear la orden
-        order = Order.objects.create(
-            user=self._user,
-            shipping_address=self._shipping_address,
-            payment_method=self._payment_method,
-            total=total,
-            notes=self._notes,
-            status='pending',
-        )
 
-        # Tercero: Crear los items de la orden
-        for item_data in self._items:
-            OrderItem.objects.create(order=order, **item_data)
+            # Tercero: Crear los items de la orden en un solo INSERT
+            OrderItem.objects.bulk_create([OrderItem(order=order, **item_data) for item_data in self._items])
 
         return order
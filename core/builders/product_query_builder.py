@@ -4,7 +4,8 @@ core/builders/product_query_builder.py
 Patrón Builder para construir consultas de productos de forma progresiva.
 Permite agregar filtros de manera flexible sin complicar las vistas.
 """
-from django.db import models as django_models
+from django.db import connections, models as django_models
+from django.db.models.functions import Lower
 
 
 class ProductQueryBuilder:
@@ -21,14 +22,20 @@ class ProductQueryBuilder:
             .build()
         )
     """
+    ALLOWED_ORDERINGS = ('price', '-price', 'created_at', '-created_at', 'brand', 'ram_gb', 'relevance')
 
     def __init__(self):
+        self._queryset = self._base_queryset()
+        self._searching = False
+
+    def _base_queryset(self):
         # Import aquí para evitar importaciones circulares
         from apps.products.models import Product
-        self._queryset = Product.objects.filter(is_active=True)
+        return Product.objects.filter(is_active=True)
 
     def by_brand(self, brand: str) -> 'ProductQueryBuilder':
-        self._queryset = self._queryset.filter(brand__iexact=brand)
+        # LOWER(brand) = 'x' (no iexact, que en SQLite es LIKE): usa el índice por expresión
+        self._queryset = self._queryset.alias(brand_lower=Lower('brand')).filter(brand_lower=brand.lower())
         return self
 
     def by_price_range(self, min_price: float, max_price: float) -> 'ProductQueryBuilder':
@@ -43,15 +50,31 @@ class ProductQueryBuilder:
         return self
 
     def by_os(self, os: str) -> 'ProductQueryBuilder':
-        self._queryset = self._queryset.filter(os__iexact=os)
+        self._queryset = self._queryset.alias(os_lower=Lower('os')).filter(os_lower=os.lower())
         return self
 
     def with_search(self, query: str) -> 'ProductQueryBuilder':
-        self._queryset = self._queryset.filter(
-            django_models.Q(model_name__icontains=query) |
-            django_models.Q(brand__icontains=query) |
-            django_models.Q(description__icontains=query)
-        )
+        """
+        Búsqueda full-text por prefijo sobre el índice FTS5.
+        Si la base de datos no tiene el índice, usa el filtro icontains.
+        """
+        from apps.products import search
+
+        if not search.is_available(connections[self._queryset.db]):
+            self._queryset = self._queryset.filter(
+                django_models.Q(model_name__icontains=query) |
+                django_models.Q(brand__icontains=query) |
+                django_models.Q(description__icontains=query)
+            )
+            return self
+
+        expression = search.build_match_expression(query)
+        if not expression:
+            self._queryset = self._queryset.none()
+            return self
+
+        self._queryset = self._queryset.filter(search_document__document__match=expression)
+        self._searching = True
         return self
 
     def in_stock(self) -> 'ProductQueryBuilder':
@@ -61,11 +84,56 @@ class ProductQueryBuilder:
         return self
 
     def ordered_by(self, field: str) -> 'ProductQueryBuilder':
-        allowed_fields = ['price', '-price', 'created_at', '-created_at', 'brand', 'ram_gb']
-        if field not in allowed_fields:
+        if field not in self.ALLOWED_ORDERINGS:
             raise ValueError(f"Campo de orden '{field}' no permitido")
+        if field == 'relevance':
+            if not self._searching:
+                raise ValueError("El orden por relevancia requiere una búsqueda")
+            # rank (bm25) es menor cuanto más relevante
+            self._queryset = self._queryset.order_by('search_document__rank', '-created_at')
+            return self
         self._queryset = self._queryset.order_by(field)
         return self
 
+    def build(self):
+        # El inventario se une en la misma consulta (stock en el serializer)
+        return self._queryset.select_related('inventory')
+
+
+class CatalogEntryQueryBuilder(ProductQueryBuilder):
+    """
+    Mismos filtros y órdenes sobre el read-model CatalogEntry (solo productos
+    activos, ya con stock y claves en minúscula): sin JOIN a inventario ni
+    funciones sobre columnas. La búsqueda usa el texto precalculado
+    (todas las palabras, sin relevancia); la búsqueda full-text con ranking
+    sigue en ProductQueryBuilder.
+    """
+
+    def _base_queryset(self):
+        from apps.products.models import CatalogEntry
+        return CatalogEntry.objects.all()
+
+    def by_brand(self, brand: str) -> 'CatalogEntryQueryBuilder':
+        self._queryset = self._queryset.filter(brand_key=brand.lower())
+        return self
+
+    def by_os(self, os: str) -> 'CatalogEntryQueryBuilder':
+        self._queryset = self._queryset.filter(os=os.lower())
+        return self
+
+    def with_search(self, query: str) -> 'CatalogEntryQueryBuilder':
+        from apps.products.search import normalize_text
+
+        words = normalize_text(query).split()
+        if not words:
+            self._queryset = self._queryset.none()
+        for word in words:
+            self._queryset = self._queryset.filter(search_text__contains=word)
+        return self
+
+    def in_stock(self) -> 'CatalogEntryQueryBuilder':
+        self._queryset = self._queryset.filter(in_stock=True)
+        return self
+
     def build(self):
         return self._queryset
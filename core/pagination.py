@@ -0,0 +1,206 @@
+"""
+core/pagination.py
+
+Paginación por cursor (keyset) para listados grandes.
+
+Con OFFSET, la página N obliga a la base de datos a recorrer y descartar
+las N-1 anteriores, y además se calcula un COUNT(*) en cada petición.
+Con keyset, el cursor guarda los valores de orden de la última fila
+entregada y la siguiente página es un `WHERE (campo, id) > (valor, id)`
+servido por un índice compuesto: la página N cuesta lo mismo que la 1.
+
+Uso:
+    GET /api/v1/products/?pagination=cursor&ordering=-price
+    → {"next": ".../?pagination=cursor&ordering=-price&cursor=...", "previous": null, "results": [...]}
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+MODE_QUERY_PARAM = 'pagination'
+CURSOR_QUERY_PARAM = 'cursor'
+TIEBREAK_FIELD = 'id'
+
+
+def wants_keyset(request) -> bool:
+    """True si el cliente pidió paginación por cursor."""
+    params = request.query_params
+    return params.get(MODE_QUERY_PARAM) == 'cursor' or CURSOR_QUERY_PARAM in params
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _row_value(row, field: str):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación keyset sobre el orden del queryset + desempate por id.
+
+    Campos de orden admitidos: los de `keyset_fields`. El primer campo del
+    order_by del queryset (o de Meta.ordering) define la dirección; el id
+    desempata en la misma dirección, de modo que un índice (campo, id)
+    sirve la consulta en ambos sentidos.
+    """
+    page_size = api_settings.PAGE_SIZE
+    keyset_fields = ('price', 'created_at', 'brand', 'ram_gb')
+
+    @classmethod
+    def get_ordering(cls, queryset) -> list[str] | None:
+        """Orden keyset del queryset, o None si no es paginable por cursor."""
+        if not isinstance(queryset, QuerySet):
+            return None
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering or not isinstance(ordering[0], str):
+            return None
+        field = ordering[0].lstrip('-')
+        if field not in cls.keyset_fields:
+            return None
+        prefix = '-' if ordering[0].startswith('-') else ''
+        return [f'{prefix}{field}', f'{prefix}{TIEBREAK_FIELD}']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        if self.ordering is None:
+            raise NotFound('Este listado no admite paginación por cursor con ese orden.')
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        if reverse:
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = self._position(rows[-1]) if rows and has_next else None
+        self.previous_position = self._position(rows[0]) if rows and has_previous else None
+        return rows
+
+    def _position(self, row) -> list:
+        return [_encode_value(_row_value(row, f.lstrip('-'))) for f in self.ordering]
+
+    @staticmethod
+    def _after(ordering: list[str], position: list) -> Q:
+        """(f1, f2, ...) estrictamente después de `position` según `ordering`."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    # ── Cursor ──────────────────────────────────────────────────────────────
+
+    def decode_cursor(self, request) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(CURSOR_QUERY_PARAM)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = payload['p'], bool(payload.get('r'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            raise NotFound('Cursor inválido.')
+        return position, reverse
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = replace_query_param(self.request.build_absolute_uri(), MODE_QUERY_PARAM, 'cursor')
+        return replace_query_param(url, CURSOR_QUERY_PARAM, encoded)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class KeysetModePagination(PageNumberPagination):
+    """
+    PageNumberPagination por defecto; keyset si se pide ?pagination=cursor
+    (o llega un ?cursor=) y el orden del listado lo permite.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if wants_keyset(request) and KeysetPagination.get_ordering(queryset) is not None:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': MODE_QUERY_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': '"cursor" para paginación keyset (sin COUNT ni OFFSET)',
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            {
+                'name': CURSOR_QUERY_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor opaco devuelto en next/previous',
+                'schema': {'type': 'string'},
+            },
+        ]
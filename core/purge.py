@@ -0,0 +1,71 @@
+"""
+core/purge.py
+
+Borrado por lotes de filas obsoletas (carritos abandonados, direcciones
+provisionales huérfanas).
+
+Cada lote es una transacción corta: lee hasta `batch_size` ids en el orden
+de un índice, borra solo esos (volviendo a aplicar el filtro, por si alguna
+fila dejó de cumplirlo entre la lectura y el DELETE) y confirma. Ninguna
+transacción bloquea más de un lote, así el tráfico normal no espera a la
+purga.
+"""
+import logging
+import time
+from typing import Iterator, NamedTuple
+
+from django.db import transaction
+from django.db.models import ProtectedError, QuerySet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class PurgeBatch(NamedTuple):
+    rows: int                   # filas borradas en total (incluye cascadas)
+    per_model: dict[str, int]   # {'app.Modelo': filas}
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f'{self.rows} filas, {self.rows_per_second:.0f} filas/s'
+
+
+def delete_in_batches(queryset: QuerySet, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[PurgeBatch]:
+    """
+    Borra las filas de `queryset` (ordenado por una columna indexada) en
+    lotes de `batch_size`, una transacción por lote. Genera un PurgeBatch
+    por lote confirmado.
+    """
+    while True:
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    return
+                rows, per_model = queryset.filter(pk__in=ids).delete()
+        except ProtectedError as error:
+            # Una fila pasó a estar referenciada durante el lote (ej: una orden
+            # tomó la dirección): el lote se revierte y la purga sigue en la
+            # próxima pasada, cuando el filtro ya la excluye
+            logger.warning('Purga de %s interrumpida: %s', queryset.model._meta.label, error)
+            return
+        yield PurgeBatch(rows, per_model, time.perf_counter() - started)
+        if len(ids) < batch_size:
+            return
+
+
+def summarize(batches) -> PurgeBatch:
+    """Consume los lotes y retorna el total (filas, filas por modelo, segundos)."""
+    rows, per_model, seconds = 0, {}, 0.0
+    for batch in batches:
+        rows += batch.rows
+        seconds += batch.seconds
+        for label, count in batch.per_model.items():
+            per_model[label] = per_model.get(label, 0) + count
+    return PurgeBatch(rows, per_model, seconds)
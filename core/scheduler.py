@@ -0,0 +1,82 @@
+"""
+core/scheduler.py
+
+Registro de tareas periódicas de mantenimiento.
+
+Cada app declara sus tareas en un módulo `tasks.py` con el decorador
+register(); el comando run_maintenance las descubre y ejecuta las que
+vencieron (una pasada para cron, o --loop como proceso continuo):
+
+    # apps/orders/tasks.py
+    @register('release-expired-reservations', interval=60)
+    def release_expired():
+        ...
+
+El intervalo se controla con cache.add (igual que la sincronización de
+franjas): con un caché compartido (Redis/Memcached), varios procesos de
+mantenimiento no ejecutan la misma tarea dentro del mismo intervalo.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from django.core.cache import cache
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+LAST_RUN_KEY = 'scheduler:task:{}'
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable[[], object]
+    interval: Callable[[], float]   # segundos; se evalúa en cada pasada (puede venir de settings)
+
+
+_registry: dict[str, Task] = {}
+
+
+def register(name: str, interval: float | Callable[[], float]):
+    """Decorador: registra `func` para ejecutarse cada `interval` segundos."""
+    def decorator(func):
+        _registry[name] = Task(name, func, interval if callable(interval) else (lambda: interval))
+        return func
+    return decorator
+
+
+def tasks() -> dict[str, Task]:
+    """Tareas registradas (importa los módulos tasks.py de las apps instaladas)."""
+    autodiscover_modules('tasks')
+    return dict(_registry)
+
+
+def run_task(task: Task) -> tuple[object, float]:
+    """Ejecuta una tarea. Retorna (resultado, segundos)."""
+    started = time.perf_counter()
+    result = task.func()
+    return result, time.perf_counter() - started
+
+
+def run_due(names=None) -> dict[str, tuple[object, float] | Exception]:
+    """
+    Ejecuta las tareas vencidas (todas, o solo `names`). Un fallo se
+    registra y no detiene a las demás; la tarea fallida se reintenta en la
+    próxima pasada. Retorna {nombre: (resultado, segundos) o excepción}.
+    """
+    results = {}
+    for name, task in tasks().items():
+        if names and name not in names:
+            continue
+        key = LAST_RUN_KEY.format(name)
+        if not cache.add(key, True, task.interval()):
+            continue
+        try:
+            results[name] = run_task(task)
+        except Exception as error:
+            cache.delete(key)
+            logger.exception('La tarea de mantenimiento %s falló', name)
+            results[name] = error
+    return results